@@ -0,0 +1,48 @@
+"""
+Import helper shared by the benchmarks.
+
+The sovl_* framework modules import each other in cycles (sovl_error -> sovl_state ->
+sovl_curiosity -> sovl_error, sovl_utils -> sovl_memory -> ...), so most of them only
+import inside the running system. Each benchmark exercises a single class, so it imports
+that class's module with the framework modules it does not exercise replaced by inert
+stand-ins: any name imported from a stand-in is an empty class that works as a type
+hint, base class or exception. Modules that are already imported are left untouched.
+"""
+import importlib
+import os
+import sys
+import types
+
+SOVL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SOVL_DIR not in sys.path:
+    sys.path.insert(0, SOVL_DIR)
+
+
+class StandIn(Exception):
+    """Base of every placeholder name; get_instance() returns None like an unconfigured singleton."""
+
+    @classmethod
+    def get_instance(cls, *args, **kwargs):
+        return None
+
+
+def _stand_in_module(name: str) -> types.ModuleType:
+    module = types.ModuleType(name)
+
+    def __getattr__(attr: str):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        placeholder = type(attr, (StandIn,), {"__module__": name})
+        setattr(module, attr, placeholder)
+        return placeholder
+
+    module.__getattr__ = __getattr__
+    return module
+
+
+def import_isolated(name: str, stand_ins: tuple = ()) -> types.ModuleType:
+    """Import sovl module `name`, first registering stand-ins for the modules in `stand_ins`."""
+    for dependency in stand_ins:
+        if dependency not in sys.modules:
+            sys.modules[dependency] = _stand_in_module(dependency)
+    return importlib.import_module(name)
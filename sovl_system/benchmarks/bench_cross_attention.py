@@ -0,0 +1,81 @@
+"""
+Compare CrossAttentionLayer attention backends on CPU.
+
+Times the fused scaled_dot_product_attention path against the chunked path for a
+prefill-sized and a decode-sized query, and checks that both produce the same output.
+
+Usage (from sovl_system/):
+    python benchmarks/bench_cross_attention.py --hidden-size 768 --num-heads 12
+"""
+import argparse
+import time
+
+import torch
+
+from _bootstrap import import_isolated
+
+# sovl_scaffold cannot be imported on its own; see _bootstrap
+CrossAttentionLayer = import_isolated("sovl_scaffold", stand_ins=("sovl_error", "sovl_memory", "sovl_engram")).CrossAttentionLayer
+
+
+class _QuietLogger:
+    """Drops layer events so they do not skew timings."""
+
+    def record_event(self, *args, **kwargs):
+        pass
+
+    def log_error(self, *args, **kwargs):
+        pass
+
+
+def build_layer(backend: str, hidden_size: int, num_heads: int, chunk_size: int) -> CrossAttentionLayer:
+    torch.manual_seed(0)
+    config = {'attention_backend': backend, 'attention_chunk_size': chunk_size}
+    return CrossAttentionLayer(config, _QuietLogger(), hidden_size=hidden_size, num_heads=num_heads).eval()
+
+
+def time_forward(layer: CrossAttentionLayer, hidden: torch.Tensor, cross: torch.Tensor, iters: int, warmup: int = 3) -> float:
+    with torch.no_grad():
+        for _ in range(warmup):
+            layer(hidden, cross)
+        start = time.perf_counter()
+        for _ in range(iters):
+            layer(hidden, cross)
+    return (time.perf_counter() - start) / iters * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark CrossAttentionLayer attention backends on CPU",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--batch-size", type=int, default=2)
+    parser.add_argument("--query-len", type=int, default=512, help="Query length for the prefill case")
+    parser.add_argument("--scaffold-len", type=int, default=512, help="Scaffold (key/value) length")
+    parser.add_argument("--hidden-size", type=int, default=768)
+    parser.add_argument("--num-heads", type=int, default=12)
+    parser.add_argument("--chunk-size", type=int, default=128)
+    parser.add_argument("--iters", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=None, help="torch.set_num_threads value")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    layers = {backend: build_layer(backend, args.hidden_size, args.num_heads, args.chunk_size) for backend in ('chunked', 'sdpa')}
+    cross = torch.randn(args.batch_size, args.scaffold_len, args.hidden_size)
+
+    print(f"torch {torch.__version__}, {torch.get_num_threads()} threads, hidden={args.hidden_size}, heads={args.num_heads}")
+    print(f"{'case':<10}{'query_len':>10}{'chunked ms':>12}{'sdpa ms':>10}{'speedup':>9}{'max |diff|':>12}")
+    for case, query_len in (('prefill', args.query_len), ('decode', 1)):
+        hidden = torch.randn(args.batch_size, query_len, args.hidden_size)
+        with torch.no_grad():
+            diff = (layers['chunked'](hidden, cross) - layers['sdpa'](hidden, cross)).abs().max().item()
+        timings = {backend: time_forward(layer, hidden, cross, args.iters) for backend, layer in layers.items()}
+        print(
+            f"{case:<10}{query_len:>10}{timings['chunked']:>12.2f}{timings['sdpa']:>10.2f}"
+            f"{timings['chunked'] / timings['sdpa']:>8.2f}x{diff:>12.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
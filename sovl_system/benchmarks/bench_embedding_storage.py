@@ -0,0 +1,106 @@
+"""
+Measure size and recall of LongTermMemory embedding storage types.
+
+Fills a throwaway database per storage type (float32, float16, int8), then reports the
+SQLite file size, the serialized FAISS index size and recall@k of unfiltered queries
+against exact float32 search over the original vectors.
+
+Usage (from sovl_system/):
+    python benchmarks/bench_embedding_storage.py --rows 50000 --dim 128
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import faiss
+import numpy as np
+
+from _bootstrap import import_isolated
+
+# sovl_recaller cannot be imported on its own; see _bootstrap
+sovl_recaller = import_isolated("sovl_recaller", stand_ins=("sovl_error", "sovl_memory", "sovl_viber"))
+EMBEDDING_STORAGE_TYPES, LongTermMemory = sovl_recaller.EMBEDDING_STORAGE_TYPES, sovl_recaller.LongTermMemory
+
+
+class _QuietLogger:
+    def record_event(self, *args, **kwargs):
+        pass
+
+    def log_error(self, *args, **kwargs):
+        pass
+
+
+class _Config:
+    """Minimal stand-in for ConfigManager.get over the memory section."""
+
+    def __init__(self, values):
+        self._values = values
+
+    def get(self, key, default=None):
+        return self._values.get(key.split(".", 1)[-1], default)
+
+
+def clustered_embeddings(rows: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Gaussian clusters, closer to sentence embeddings than isotropic noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, rows // 200), dim)).astype(np.float32)
+    labels = rng.integers(0, len(centers), rows)
+    return centers[labels] + 0.3 * rng.standard_normal((rows, dim)).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark LongTermMemory embedding storage types",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--index-type", default="flat", choices=["auto", "flat", "hnsw", "ivfpq"])
+    args = parser.parse_args()
+
+    embeddings = clustered_embeddings(args.rows, args.dim)
+    rng = np.random.default_rng(1)
+    queries = embeddings[rng.choice(args.rows, args.queries, replace=False)] + 0.05 * rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+    _, exact = faiss.knn(queries, embeddings, args.top_k)
+    exact_ids = exact + 1  # SQLite row ids start at 1
+
+    print(f"{args.rows} rows, dim={args.dim}, index type={args.index_type}, recall@{args.top_k} vs exact float32")
+    print(f"{'storage':>8}{'codec':>9}{'db MB':>9}{'index MB':>10}{'recall':>8}{'query ms':>10}")
+    baseline = None
+    for storage in EMBEDDING_STORAGE_TYPES:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "bench.db")
+            config = _Config({"embedding_storage": storage, "faiss_index_type": args.index_type})
+            memory = LongTermMemory(db_path, args.dim, "bench", logger=_QuietLogger(), config_manager=config)
+            memory.add_many([
+                {"role": "user", "content": f"message {i}", "embedding": emb, "timestamp_unix": float(i), "user_id": "bench"}
+                for i, emb in enumerate(embeddings)
+            ])
+            memory.flush()
+            if memory._promotion_thread is not None:
+                memory._promotion_thread.join()
+            memory._db_conn.execute("VACUUM")
+            # The memory store runs in WAL mode; fold the log back in before sizing the file.
+            memory._db_conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            db_mb = os.path.getsize(db_path) / 1e6
+            index_mb = faiss.serialize_index(memory.faiss_index).nbytes / 1e6
+            start = time.perf_counter()
+            hits = 0
+            for query, expected in zip(queries, exact_ids):
+                found = [row["id"] for row in memory.query(query, top_k=args.top_k)]
+                hits += len(set(found) & set(expected.tolist()))
+            query_ms = (time.perf_counter() - start) / len(queries) * 1000.0
+            recall = hits / (len(queries) * args.top_k)
+            baseline = baseline or (db_mb, index_mb)
+            print(
+                f"{storage:>8}{memory._index_codec:>9}{db_mb:>9.1f}{index_mb:>10.1f}{recall:>8.4f}{query_ms:>10.3f}"
+                f"   ({baseline[0] / db_mb:.1f}x db, {baseline[1] / index_mb:.1f}x index)"
+            )
+            memory.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Measure LongTermMemory query time against the size of the min_timestamp_unix window.
+
+Fills a throwaway SQLite database with random embeddings (one row per second), then
+times unfiltered queries and recency-bounded queries over growing windows. The
+"legacy" column reproduces the previous approach (re-read the window's embeddings
+with an IN (...) list and search a temporary IndexFlatL2) for comparison.
+
+Usage (from sovl_system/):
+    python benchmarks/bench_memory_time_filter.py --rows 200000 --index-type auto
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+import faiss
+import numpy as np
+
+from _bootstrap import import_isolated
+
+# sovl_recaller cannot be imported on its own; see _bootstrap
+LongTermMemory = import_isolated("sovl_recaller", stand_ins=("sovl_error", "sovl_memory", "sovl_viber")).LongTermMemory
+
+
+class _QuietLogger:
+    def record_event(self, *args, **kwargs):
+        pass
+
+    def log_error(self, *args, **kwargs):
+        pass
+
+
+class _Config:
+    """Minimal stand-in for ConfigManager.get over the memory section."""
+
+    def __init__(self, values):
+        self._values = values
+
+    def get(self, key, default=None):
+        return self._values.get(key.split(".", 1)[-1], default)
+
+
+def fill_database(db_path: str, rows: int, dim: int, session_id: str, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((rows, dim)).astype(np.float32)
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS conversations (id INTEGER PRIMARY KEY AUTOINCREMENT, role TEXT, content TEXT, "
+        "embedding BLOB, timestamp_unix REAL, user_id TEXT, session_id TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO conversations (role, content, embedding, timestamp_unix, user_id, session_id) VALUES (?, ?, ?, ?, ?, ?)",
+        (("user", f"message {i}", emb.tobytes(), float(i), "bench", session_id) for i, emb in enumerate(embeddings))
+    )
+    conn.commit()
+    conn.close()
+    return embeddings
+
+
+def legacy_window_query(memory: LongTermMemory, query: np.ndarray, min_ts: float, k: int):
+    ids = [mid for mid, ts in memory.message_timestamps.items() if ts >= min_ts]
+    cursor = memory._db_conn.cursor()
+    rows = []
+    # SQLite caps bound parameters, so the old IN (...) query is issued in slices
+    for i in range(0, len(ids), 30000):
+        chunk = ids[i:i + 30000]
+        cursor.execute(f"SELECT id, embedding FROM conversations WHERE id IN ({','.join('?' for _ in chunk)})", chunk)
+        rows.extend(cursor.fetchall())
+    temp_index = faiss.IndexFlatL2(memory.embedding_dim)
+    temp_index.add(np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows]))
+    temp_index.search(query.reshape(1, -1), min(k, len(rows)))
+
+
+def time_call(fn, queries, repeats: int) -> float:
+    start = time.perf_counter()
+    for i in range(repeats):
+        fn(queries[i % len(queries)])
+    return (time.perf_counter() - start) / repeats * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark time-filtered LongTermMemory queries",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--index-type", default="flat", choices=["auto", "flat", "hnsw", "ivfpq"])
+    parser.add_argument("--skip-legacy", action="store_true", help="Skip the slow temporary-index baseline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        embeddings = fill_database(db_path, args.rows, args.dim, "bench")
+        config = _Config({"faiss_index_type": args.index_type})
+        memory = LongTermMemory(db_path, args.dim, "bench", logger=_QuietLogger(), config_manager=config)
+        if memory._promotion_thread is not None:
+            memory._promotion_thread.join()
+        queries = embeddings[np.random.default_rng(1).choice(args.rows, 32, replace=False)] + 0.01
+
+        print(f"{args.rows} rows, dim={args.dim}, index tier={memory._faiss_tier} (search param {memory._faiss_search_param}), top_k={args.top_k}")
+        print(f"{'window rows':>12}{'query ms':>10}{'legacy ms':>11}")
+        unfiltered = time_call(lambda q: memory.query(q, top_k=args.top_k), queries, args.repeats)
+        print(f"{'unfiltered':>12}{unfiltered:>10.3f}{'':>11}")
+        for fraction in (0.001, 0.01, 0.1, 0.5, 1.0):
+            window = max(1, int(args.rows * fraction))
+            min_ts = float(args.rows - window)
+            filtered = time_call(lambda q: memory.query(q, top_k=args.top_k, min_timestamp_unix=min_ts), queries, args.repeats)
+            legacy = ""
+            if not args.skip_legacy:
+                legacy_ms = time_call(lambda q: legacy_window_query(memory, q, min_ts, args.top_k), queries, max(1, args.repeats // 10))
+                legacy = f"{legacy_ms:.3f}"
+            print(f"{window:>12}{filtered:>10.3f}{legacy:>11}")
+        memory.close()
+
+
+if __name__ == "__main__":
+    main()
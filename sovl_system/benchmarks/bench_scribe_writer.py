@@ -0,0 +1,110 @@
+"""
+Measure scribe journal throughput of JsonlWriter per durability mode.
+
+Writes the same scribe-shaped entries in groups of --group lines (the Scriber's
+scribe_batch_size) through JsonlWriter.write_many for every durability mode, plus the
+previous per-line write()/flush() loop on a buffered text file as a baseline, and
+reports entries/s, MB/s and the mean commit latency per group.
+
+Usage (from sovl_system/):
+    python benchmarks/bench_scribe_writer.py --entries 100000 --group 20
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from _bootstrap import import_isolated
+
+# sovl_io cannot be imported on its own; see _bootstrap
+sovl_io = import_isolated("sovl_io", stand_ins=("sovl_error",))
+SCRIBE_DURABILITY_MODES, JsonlWriter = sovl_io.SCRIBE_DURABILITY_MODES, sovl_io.JsonlWriter
+
+
+class _QuietErrors:
+    def handle_error(self, *args, **kwargs):
+        pass
+
+
+class _Config:
+    """Minimal stand-in for ConfigManager.get over the scribed_config section."""
+
+    def __init__(self, values):
+        self._values = values
+
+    def get(self, key, default=None):
+        return self._values.get(key.split(".", 1)[-1], default)
+
+
+def scribe_lines(count: int, memory_chars: int) -> list:
+    """JSON strings shaped like Scriber output."""
+    filler = ("the quick brown fox jumps over the lazy dog " * (memory_chars // 44 + 1))[:memory_chars]
+    return [json.dumps({"memory": f"{i} {filler}", "weight": 0.5 + (i % 5) / 10}) for i in range(count)]
+
+
+def legacy_write(path: str, lines: list, group: int) -> None:
+    """The pre-group-commit loop: one write() per line, flush() and tell() per group."""
+    with open(path, "a", encoding="utf-8") as f:
+        for start in range(0, len(lines), group):
+            for entry in lines[start:start + group]:
+                f.write(entry + "\n")
+            f.flush()
+            f.tell()
+
+
+def writer_write(path: str, lines: list, group: int, durability: str, interval_ms: int) -> None:
+    config = _Config({
+        "durability": durability,
+        "fsync_interval_ms": interval_ms,
+        "buffer_size": group,
+        "max_file_size_mb": 1 << 20,
+    })
+    writer = JsonlWriter(config, _QuietErrors(), None, file_path=path)
+    for start in range(0, len(lines), group):
+        writer.write_many(lines[start:start + group])
+    writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark JsonlWriter group commit and durability modes",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--group", type=int, default=20, help="Lines per write_many() call")
+    parser.add_argument("--memory-chars", type=int, default=200, help="Length of each entry's memory text")
+    parser.add_argument("--fsync-entries", type=int, default=2000, help="Entries for the fsync mode, which is disk-bound")
+    parser.add_argument("--fsync-interval-ms", type=int, default=1000)
+    parser.add_argument("--dir", default=None, help="Directory to write in (default: a temporary directory)")
+    args = parser.parse_args()
+
+    lines = scribe_lines(args.entries, args.memory_chars)
+    print(f"{args.entries} entries of ~{len(lines[0]) + 1} bytes, groups of {args.group}")
+    print(f"{'mode':>16}{'entries':>9}{'entries/s':>12}{'MB/s':>9}{'us/group':>10}")
+    runs = [("legacy", None)] + [(mode, mode) for mode in SCRIBE_DURABILITY_MODES]
+    baseline = None
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        for name, durability in runs:
+            count = args.fsync_entries if durability == "fsync" else args.entries
+            subset = lines[:count]
+            path = os.path.join(tmp, f"{name}.jsonl")
+            start = time.perf_counter()
+            if durability is None:
+                legacy_write(path, subset, args.group)
+            else:
+                writer_write(path, subset, args.group, durability, args.fsync_interval_ms)
+            elapsed = time.perf_counter() - start
+            with open(path, "rb") as f:
+                assert sum(1 for _ in f) == count, f"{name}: line count mismatch"
+            rate = count / elapsed
+            baseline = baseline or rate
+            groups = -(-count // args.group)
+            print(
+                f"{name:>16}{count:>9}{rate:>12.0f}{os.path.getsize(path) / elapsed / 1e6:>9.1f}"
+                f"{elapsed / groups * 1e6:>10.1f}   ({rate / baseline:.2f}x legacy)"
+            )
+
+
+if __name__ == "__main__":
+    main()
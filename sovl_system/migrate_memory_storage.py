@@ -0,0 +1,54 @@
+"""
+Re-encode the embeddings of an existing long-term memory database.
+
+Converts every row of the conversations table to float32, float16 or int8 storage
+(see memory.embedding_storage) and compacts the file. Set memory.embedding_storage to
+the same value afterwards; persisted FAISS indexes are rebuilt on the next start.
+Stop SOVL before running it.
+
+Usage (from sovl_system/):
+    python migrate_memory_storage.py --storage float16
+    python migrate_memory_storage.py --db conversations.db --dim 128 --storage int8
+"""
+import argparse
+import json
+import os
+import sys
+
+from sovl_recaller import EMBEDDING_STORAGE_TYPES, migrate_embedding_storage
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-encode long-term memory embeddings",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--config", default="sovl_config.json", help="Config file providing memory.db_path and memory.embedding_dim")
+    parser.add_argument("--db", default=None, help="Database path (overrides the config)")
+    parser.add_argument("--dim", type=int, default=None, help="Embedding dimension (overrides the config)")
+    parser.add_argument("--storage", required=True, choices=EMBEDDING_STORAGE_TYPES)
+    parser.add_argument("--batch-size", type=int, default=4096)
+    parser.add_argument("--no-vacuum", action="store_true", help="Skip VACUUM, leaving the file at its old size")
+    args = parser.parse_args()
+
+    memory_config = {}
+    if os.path.exists(args.config):
+        with open(args.config, "r", encoding="utf-8") as f:
+            memory_config = json.load(f).get("memory", {})
+    db_path = args.db or memory_config.get("db_path", "conversations.db")
+    dim = args.dim or memory_config.get("embedding_dim", 128)
+    if not os.path.exists(db_path):
+        print(f"Database not found: {db_path}")
+        sys.exit(1)
+
+    size_before = os.path.getsize(db_path)
+    rewritten = migrate_embedding_storage(db_path, dim, args.storage, batch_size=args.batch_size, vacuum=not args.no_vacuum)
+    size_after = os.path.getsize(db_path)
+    print(f"Re-encoded {rewritten} embeddings in {db_path} as {args.storage} (dim={dim})")
+    print(f"File size: {size_before / 1e6:.1f} MB -> {size_after / 1e6:.1f} MB")
+    if memory_config.get("embedding_storage", "float32") != args.storage:
+        print(f"Remember to set memory.embedding_storage to \"{args.storage}\" in {args.config}")
+
+
+if __name__ == "__main__":
+    main()
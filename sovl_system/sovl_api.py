@@ -1,6 +1,6 @@
 from sovl_conductor import SOVLOrchestrator
 from sovl_main import SOVLSystem, SystemContext
-from typing import Any, Callable, Optional, List, Dict
+from typing import Any, Callable, Optional, List, Dict, Iterator
 import os
 import json
 import shutil
@@ -22,7 +22,7 @@ OVERVIEW
 KEY FEATURES
 -------------------------------------------------------------------------------
 - Lifecycle control: Start, stop, pause, resume, and reload the SOVL system.
-- Input/Output: Send input (text, commands, or structured data) and retrieve output.
+- Input/Output: Send input (text, commands, or structured data) and retrieve output, or stream output as it is generated.
 - Command execution: Execute system commands programmatically (mirroring CLI functionality).
 - Plugin/Hook registration: Register plugins or hooks for extensibility and custom integration.
 - System state and metrics: Access system state, metrics, and recent events for monitoring or advanced control.
@@ -122,6 +122,23 @@ class SOVLAPI:
             return self.system.get_last_output()
         raise NotImplementedError("System does not support get_last_output.")
 
+    def stream_output(self, prompt: str, **kwargs) -> Iterator[str]:
+        """
+        Generate a response and yield text chunks as tokens are decoded.
+        Args:
+            prompt: User prompt text
+            **kwargs: Generation parameters (max_new_tokens, temperature, top_k, do_sample, ...)
+        Returns:
+            Iterator over decoded text chunks
+        Raises:
+            NotImplementedError: If the system does not support streaming generation.
+            Exception: For any system-level error.
+        """
+        generation_manager = getattr(self.system, "generation_manager", None)
+        if generation_manager is not None and hasattr(generation_manager, "stream_text"):
+            return generation_manager.stream_text(prompt, **kwargs)
+        raise NotImplementedError("System does not support streaming generation.")
+
     def execute_command(self, command: str, args: Optional[List[Any]] = None) -> Any:
         """
         Execute a command in the SOVL system (mirrors CLI functionality).
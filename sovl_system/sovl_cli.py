@@ -1935,12 +1935,12 @@ class CommandHandler(cmd.Cmd):
         return []
 
     def get_recent_scribe_events(self, n=8):
-        """Load the last n scribe events from the scribe JSONL file."""
+        """Load the last n scribe events from the scribe journal."""
         try:
             # Use the scribe path from the Scriber instance
+            from sovl_io import ScribeJournal
             scribe_path = getattr(self.sovl_system.scriber, 'scribe_path', 'scribe/sovl_scribe.jsonl')
-            events = self.jsonl_loader.load_jsonl(scribe_path)
-            return events[-n:] if events else []
+            return ScribeJournal.get_instance(scribe_path).tail(n)
         except Exception as e:
             print(f"Error loading scribe events: {e}")
             return []
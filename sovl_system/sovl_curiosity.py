@@ -1,8 +1,12 @@
+import hashlib
+import os
 import time
+import weakref
 from typing import Any, Dict, List, Optional, Deque, Tuple
 from collections import deque, defaultdict, Counter
 import traceback
 import threading
+import numpy as np
 import torch
 from torch import nn
 from datetime import datetime
@@ -17,6 +21,11 @@ from dataclasses import dataclass
 from sovl_utils import cosine_similarity
 from sovl_recaller import DialogueContextManager
 
+try:
+    import faiss  # Optional: inner-product search for novelty scoring
+except ImportError:
+    faiss = None
+
 # Unified output function for all utterances (user or system)
 def output_response(text: str):
     """Outputs a response to the user. Replace with UI logic as needed."""
@@ -34,6 +43,290 @@ class CuriosityConfig:
         # Optional: add validation logic here
         pass
 
+class NoveltyIndex:
+    """
+    Persistent store of L2-normalised memory embeddings for novelty scoring.
+
+    Rows live in a float32 np.memmap (or an in-memory array when no path is given) with a
+    JSON sidecar recording dim/count/capacity, so the matrix survives restarts and is never
+    rebuilt from Python tensors. Novelty lookups are blocked matrix-vector products over the
+    stored rows, or an inner-product search when the FAISS backend is active. Once
+    max_rows is reached the oldest slots are overwritten in ring order. ``sync`` also drops
+    rows whose memory is no longer present, so forgotten memories stop counting as seen.
+    """
+
+    SCAN_BLOCK_ROWS = 16384  # rows per matrix-vector product when scanning with numpy
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_rows: int = 100000,
+        backend: str = "auto",
+        logger: Optional[Any] = None
+    ):
+        self.path = path
+        self.meta_path = f"{path}.json" if path else None
+        self.max_rows = max(1, int(max_rows))
+        self.logger = logger
+        backend = str(backend).lower()
+        if backend not in ("auto", "numpy", "faiss"):
+            backend = "auto"
+        if backend == "faiss" and faiss is None and logger:
+            logger.record_event(
+                event_type="novelty_index_faiss_unavailable",
+                message="faiss is not installed; novelty index falls back to numpy.",
+                level="warning"
+            )
+        self.use_faiss = backend in ("auto", "faiss") and faiss is not None
+        self.lock = threading.RLock()
+        self.dim = 0
+        self.count = 0
+        self.next_slot = 0
+        self._matrix: Optional[np.ndarray] = None
+        self._faiss_index = None
+        self._digests = {}  # row digest -> slot, so re-synced embeddings are not stored twice
+        self._seen = {}  # id(tensor) -> (weakref, row digest) for tensors already ingested, skipped without touching their data
+        if self.path:
+            self._load()
+
+    def __len__(self) -> int:
+        return self.count
+
+    @staticmethod
+    def _digest(row: np.ndarray) -> bytes:
+        return hashlib.blake2b(row.tobytes(), digest_size=16).digest()
+
+    def _load(self) -> None:
+        """Reopen a persisted store; a missing or inconsistent store starts empty."""
+        if not (os.path.exists(self.path) and os.path.exists(self.meta_path)):
+            return
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            dim, count, capacity = int(meta["dim"]), int(meta["count"]), int(meta["capacity"])
+            if dim <= 0 or not 0 <= count <= capacity or os.path.getsize(self.path) < capacity * dim * 4:
+                raise ValueError(f"store metadata {meta} does not match {self.path}")
+            self.dim = dim
+            self.count = min(count, self.max_rows)
+            self.next_slot = int(meta.get("next_slot", count)) % self.max_rows
+            if self.next_slot >= self.count and self.count < self.max_rows:
+                self.next_slot = self.count
+            self._matrix = np.memmap(self.path, dtype=np.float32, mode="r+", shape=(capacity, dim))
+            rows = self._matrix[:self.count]
+            self._digests = {self._digest(row): slot for slot, row in enumerate(rows)}
+            if self.use_faiss:
+                self._faiss_index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+                if self.count:
+                    self._faiss_index.add_with_ids(np.ascontiguousarray(rows), np.arange(self.count, dtype=np.int64))
+            if self.logger:
+                self.logger.record_event(
+                    event_type="novelty_index_loaded",
+                    message=f"Loaded {self.count} novelty embeddings from {self.path}",
+                    level="info",
+                    additional_info={"dim": dim, "count": self.count, "faiss": self.use_faiss}
+                )
+        except Exception as e:
+            if self.logger:
+                self.logger.log_error(
+                    error_msg=f"Failed to load novelty index from {self.path}, starting empty: {str(e)}",
+                    error_type="novelty_index_error",
+                    stack_trace=traceback.format_exc()
+                )
+            self._reset(0)
+
+    def _reset(self, dim: int) -> None:
+        self.dim = dim
+        self.count = 0
+        self.next_slot = 0
+        self._matrix = None
+        self._digests = {}
+        self._seen = {}
+        self._faiss_index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim)) if self.use_faiss and dim else None
+
+    def _ensure_capacity(self, needed: int) -> None:
+        """Grow the backing matrix geometrically (capped at max_rows) to hold `needed` rows."""
+        capacity = 0 if self._matrix is None else self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = min(self.max_rows, max(needed, 2 * capacity, 1024))
+        if self.path:
+            if self._matrix is not None:
+                self._matrix.flush()
+            self._matrix = None
+            mode = "r+" if os.path.exists(self.path) and capacity else "w+"
+            if mode == "r+":
+                with open(self.path, "r+b") as f:
+                    f.truncate(new_capacity * self.dim * 4)
+            self._matrix = np.memmap(self.path, dtype=np.float32, mode=mode, shape=(new_capacity, self.dim))
+        else:
+            grown = np.zeros((new_capacity, self.dim), dtype=np.float32)
+            if self._matrix is not None:
+                grown[:self.count] = self._matrix[:self.count]
+            self._matrix = grown
+
+    def add(self, embeddings: List[Any]) -> int:
+        """Normalise and store embeddings not already present; returns the number of rows written."""
+        return self._add(embeddings)[0]
+
+    def sync(self, embeddings: List[Any]) -> Tuple[int, int]:
+        """Make the store match the current memory embeddings.
+
+        New embeddings are added and rows matching none of them are dropped. Returns
+        (rows written, rows removed).
+        """
+        written, live = self._add(embeddings)
+        with self.lock:
+            stale = [slot for digest, slot in self._digests.items() if digest not in live]
+            if stale:
+                self._remove_slots(stale)
+        return written, len(stale)
+
+    def _add(self, embeddings: List[Any]) -> Tuple[int, set]:
+        """Store new embeddings; returns (rows written, digests of every embedding given)."""
+        fresh = []
+        fresh_refs = []
+        live = set()
+        for emb in embeddings:
+            if emb is None:
+                continue
+            ref = None
+            if isinstance(emb, torch.Tensor):
+                seen = self._seen.get(id(emb))
+                if seen is not None and seen[0]() is emb:
+                    if seen[1] is not None:
+                        live.add(seen[1])
+                    continue
+                ref = weakref.ref(emb)
+                self._seen[id(emb)] = (ref, None)
+                emb = emb.detach().to("cpu", torch.float32).numpy()
+            fresh.append(np.asarray(emb, dtype=np.float32).reshape(-1))
+            fresh_refs.append(ref)
+        if len(self._seen) > 2 * self.max_rows:
+            self._seen = {key: entry for key, entry in self._seen.items() if entry[0]() is not None}
+        if not fresh:
+            return 0, live
+        with self.lock:
+            dims = {vec.shape[0] for vec in fresh}
+            if len(dims) != 1:
+                dim = max(dims, key=lambda d: sum(vec.shape[0] == d for vec in fresh))
+                fresh_refs = [ref for ref, vec in zip(fresh_refs, fresh) if vec.shape[0] == dim]
+                fresh = [vec for vec in fresh if vec.shape[0] == dim]
+            dim = fresh[0].shape[0]
+            if dim != self.dim:
+                if self.count and self.logger:
+                    self.logger.record_event(
+                        event_type="novelty_index_dim_changed",
+                        message=f"Embedding dim changed from {self.dim} to {dim}; novelty index reset.",
+                        level="warning"
+                    )
+                self._reset(dim)
+            rows = np.stack(fresh)
+            norms = np.linalg.norm(rows, axis=1, keepdims=True)
+            nonzero = norms[:, 0] > 1e-8
+            rows = rows[nonzero] / norms[nonzero]
+            fresh_refs = [ref for ref, keep in zip(fresh_refs, nonzero) if keep]
+            written = 0
+            slots = []
+            for ref, row in zip(fresh_refs, rows):
+                digest = self._digest(row)
+                live.add(digest)
+                if ref is not None and ref() is not None:
+                    self._seen[id(ref())] = (ref, digest)
+                if digest in self._digests:
+                    continue
+                if self.count < self.max_rows:
+                    slot = self.count
+                    self._ensure_capacity(slot + 1)
+                    self.count += 1
+                    self.next_slot = self.count % self.max_rows
+                else:
+                    slot = self.next_slot
+                    self._digests.pop(self._digest(self._matrix[slot]), None)
+                    self.next_slot = (slot + 1) % self.max_rows
+                self._matrix[slot] = row
+                self._digests[digest] = slot
+                slots.append(slot)
+                written += 1
+            if written:
+                if self._faiss_index is not None:
+                    ids = np.asarray(slots, dtype=np.int64)
+                    self._faiss_index.remove_ids(ids)
+                    self._faiss_index.add_with_ids(np.ascontiguousarray(self._matrix[ids]), ids)
+                self._persist()
+            return written, live
+
+    def _remove_slots(self, slots: List[int]) -> None:
+        """Drop rows and pack the survivors into the leading slots; caller holds the lock."""
+        dropped = np.zeros(self.count, dtype=bool)
+        dropped[slots] = True
+        keep = np.flatnonzero(~dropped)
+        new_slot = np.cumsum(~dropped) - 1
+        self._matrix[:len(keep)] = self._matrix[keep]
+        self._digests = {digest: int(new_slot[slot]) for digest, slot in self._digests.items() if not dropped[slot]}
+        self.count = len(keep)
+        self.next_slot = self.count % self.max_rows
+        rows = self._matrix[:self.count]
+        if self._faiss_index is not None:
+            self._faiss_index.reset()
+            if self.count:
+                self._faiss_index.add_with_ids(np.ascontiguousarray(rows), np.arange(self.count, dtype=np.int64))
+        self._persist()
+
+    def max_similarity(self, query: Any, early_exit: Optional[float] = None) -> Optional[float]:
+        """Highest cosine similarity between the query and any stored row, or None if there is nothing to compare.
+
+        With early_exit, the numpy backend scans the rows in blocks and stops at the first
+        block whose best match reaches it (the result is then only known to be >= early_exit).
+        The FAISS backend always answers with one search.
+        """
+        if isinstance(query, torch.Tensor):
+            query = query.detach().to("cpu", torch.float32).numpy()
+        query = np.asarray(query, dtype=np.float32)
+        with self.lock:
+            if not self.count or query.size % self.dim:
+                return None
+            queries = query.reshape(-1, self.dim)
+            norms = np.linalg.norm(queries, axis=1, keepdims=True)
+            queries = queries / np.maximum(norms, 1e-8)
+            if self._faiss_index is not None:
+                scores, _ = self._faiss_index.search(np.ascontiguousarray(queries), 1)
+                return float(scores.max())
+            best = -1.0
+            for start in range(0, self.count, self.SCAN_BLOCK_ROWS):
+                block = self._matrix[start:min(start + self.SCAN_BLOCK_ROWS, self.count)]
+                best = max(best, float((block @ queries.T).max()))
+                if early_exit is not None and best >= early_exit:
+                    break
+            return best
+
+    def _persist(self) -> None:
+        if not self.path or self._matrix is None:
+            return
+        try:
+            self._matrix.flush()
+            tmp_path = f"{self.meta_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "dim": self.dim,
+                    "count": self.count,
+                    "capacity": int(self._matrix.shape[0]),
+                    "next_slot": self.next_slot
+                }, f)
+            os.replace(tmp_path, self.meta_path)
+        except Exception as e:
+            if self.logger:
+                self.logger.log_error(
+                    error_msg=f"Failed to persist novelty index: {str(e)}",
+                    error_type="novelty_index_error",
+                    stack_trace=traceback.format_exc()
+                )
+
+    def close(self) -> None:
+        with self.lock:
+            self._persist()
+            self._matrix = None
+            self._faiss_index = None
+
 class Curiosity:
     """Computes curiosity scores based on ignorance and novelty."""
     
@@ -59,6 +352,9 @@ class Curiosity:
         self.similarity_early_exit_threshold = config_manager.get("curiosity_config.similarity_early_exit_threshold", 0.99)
         self.adaptive_batch_min = config_manager.get("curiosity_config.adaptive_batch_min", 8)
         self.adaptive_batch_max = config_manager.get("curiosity_config.adaptive_batch_max", 128)
+        self.novelty_store_path = config_manager.get("curiosity_config.novelty_store_path", "")
+        self.novelty_store_max_rows = config_manager.get("curiosity_config.novelty_store_max_rows", 100000)
+        self.novelty_index_backend = config_manager.get("curiosity_config.novelty_index_backend", "auto")
         
         self._validate_weights(self.weight_ignorance, self.weight_novelty)
         self.logger = logger
@@ -75,6 +371,13 @@ class Curiosity:
         self.embedding_cache = {}
         self.lock = threading.RLock()
         self.curiosity_score = 0.0  # For external nudges
+        # Pre-normalised memory embeddings; an empty novelty_store_path keeps the store in memory
+        self.novelty_index = NoveltyIndex(
+            path=self.novelty_store_path or None,
+            max_rows=self.novelty_store_max_rows,
+            backend=self.novelty_index_backend,
+            logger=logger
+        )
         # For incremental/background pruning
         self._prune_in_progress = False
         self._prune_event = threading.Event()
@@ -283,6 +586,11 @@ class Curiosity:
         if self._prune_thread is not None:
             self._prune_thread.join()
 
+    def close(self):
+        """Stop background pruning and flush the novelty store."""
+        self.shutdown_prune_thread()
+        self.novelty_index.close()
+
     def _compress_tensor(self, tensor: torch.Tensor) -> torch.Tensor:
         """Compress tensor to reduce memory usage, using GPU manager if available."""
         try:
@@ -315,10 +623,10 @@ class Curiosity:
     ) -> float:
         """Compute curiosity score based on novelty only."""
         try:
-            memory_embeddings = self._get_valid_memory_embeddings(state)
+            self._sync_novelty_index(state)
             novelty = (
-                self._compute_novelty_score(memory_embeddings, query_embedding, device)
-                if memory_embeddings and query_embedding is not None
+                self._compute_novelty_score(query_embedding)
+                if query_embedding is not None
                 else 0.0
             )
             final_score = novelty
@@ -329,7 +637,7 @@ class Curiosity:
                 additional_info={
                     "final_score": final_score,
                     "novelty": novelty,
-                    "memory_embeddings_count": len(memory_embeddings)
+                    "memory_embeddings_count": len(self.novelty_index)
                 }
             )
             return self._clamp_score(final_score)
@@ -337,46 +645,21 @@ class Curiosity:
             self._log_error(f"Curiosity computation failed: {str(e)}")
             return 0.5
 
-    def _get_valid_memory_embeddings(self, state) -> List[torch.Tensor]:
-        """Get valid memory embeddings with memory constraints."""
+    def _sync_novelty_index(self, state) -> None:
+        """Add memory embeddings the novelty index has not seen yet and drop forgotten ones."""
         try:
-            valid_embeddings = []
-            batch_size = self.batch_size
-
-            embeddings = state.embeddings
-
-            for i in range(0, len(embeddings), batch_size):
-                batch = embeddings[i:i + batch_size]
-                valid_embeddings.extend(batch)
-
-            return valid_embeddings
+            self.novelty_index.sync(state.embeddings)
         except Exception as e:
-            self._log_error(f"Failed to get valid memory embeddings: {str(e)}")
-            return []
+            self._log_error(f"Failed to sync novelty index: {str(e)}")
 
-    def _compute_novelty_score(
-        self,
-        memory_embeddings: List[torch.Tensor],
-        query_embedding: torch.Tensor,
-        device: torch.device
-    ) -> float:
-        """Compute novelty component of curiosity score using batched processing, with early exit and adaptive batch size."""
+    def _compute_novelty_score(self, query_embedding: torch.Tensor) -> float:
+        """Novelty is one minus the best cosine match in the novelty index, stopping early once a match reaches similarity_early_exit_threshold."""
         try:
-            query_embedding = query_embedding.to(device)
-            max_similarity = 0.0
-            batch_size = self._estimate_adaptive_batch_size()
-            for i in range(0, len(memory_embeddings), batch_size):
-                batch = memory_embeddings[i:i + batch_size]
-                batch_tensors = torch.stack([emb.to(device) for emb in batch])
-                similarities = self.cosine_similarity(
-                    query_embedding.unsqueeze(0),
-                    batch_tensors
-                )
-                batch_max = similarities.max().item()
-                max_similarity = max(max_similarity, batch_max)
-                # Early exit if high enough similarity is found
-                if max_similarity >= self.similarity_early_exit_threshold:
-                    break
+            max_similarity = self.novelty_index.max_similarity(
+                query_embedding, early_exit=self.similarity_early_exit_threshold
+            )
+            if max_similarity is None:
+                return 0.0
             return self._clamp_score(1.0 - max_similarity)
         except Exception as e:
             self._log_error(f"Novelty score computation failed: {str(e)}")
@@ -386,6 +669,16 @@ class Curiosity:
         """Clamp score between 0.0 and 1.0."""
         return max(0.0, min(1.0, score))
 
+    def _log_event(self, event_type: str, message: str, level: str = "info", **kwargs) -> None:
+        """Log event with standardized format."""
+        if self.logger:
+            self.logger.record_event(
+                event_type=event_type,
+                message=message,
+                level=level,
+                **kwargs
+            )
+
     def _log_error(self, message: str, **kwargs) -> None:
         """Log error with standardized format."""
         if self.logger:
@@ -1391,6 +1684,10 @@ class CuriosityManager():
             )
             return 0.5  # Default fallback
 
+    def close(self) -> None:
+        """Stop background pruning and flush the novelty store; called on system shutdown."""
+        self.curiosity.close()
+
     def is_initialized(self) -> bool:
         """Check if CuriosityManager is properly initialized."""
         return all(hasattr(self, attr) for attr in ["config_manager", "logger", "error_manager", "state_manager"])
@@ -7,7 +7,7 @@ from typing import List, Dict, Optional, Any
 from functools import wraps
 from copy import deepcopy
 import hashlib
-from sovl_io import JSONLLoader
+from sovl_io import ScribeJournal
 from sovl_config import ConfigManager
 from sovl_logger import Logger
 from sovl_error import ErrorManager, ScaffoldError
@@ -244,27 +244,11 @@ class DreamEventSelector:
         self.selection_strategy = config_manager.get("dreamer_config.selection_strategy")
 
     def extract_last_active_period(self) -> List[Dict]:
-        """Efficiently extract only the last N events since the last 'wake', using generator-based streaming and a two-pass approach."""
+        """Extract the last N events since the last 'wake', reading only the journal segments after it."""
         try:
-            loader = JSONLLoader(self.config_manager, self.logger, self.error_manager)
-            # First pass: count events since last 'wake'
-            event_count = 0
-            for entry in loader.stream_jsonl(self.scribe_path):
-                if entry.get("event_type") == "wake":
-                    event_count = 0
-                else:
-                    event_count += 1
-            # Second pass: yield only the last N events
-            max_events = self.max_dreams
-            buffer = []
-            for entry in loader.stream_jsonl(self.scribe_path):
-                if entry.get("event_type") == "wake":
-                    buffer = []
-                else:
-                    buffer.append(entry)
-                    if len(buffer) > max_events:
-                        buffer.pop(0)
-            return buffer
+            # The manifest records where each segment's last 'wake' ends, so this is a single
+            # forward read of the newest segments instead of two passes over the whole journal
+            return ScribeJournal.get_instance(self.scribe_path).read_since_last_wake(self.max_dreams)
         except Exception as e:
             error_type = f"dreamer_extract_last_active_period_error"
             context = {"function": "extract_last_active_period"}
@@ -521,11 +505,9 @@ class DreamAlbumGenerator:
         """Load memories from scribe journal."""
         palette = []
         try:
-            with open(self.scribe_path, "r") as f:
-                for line in f:
-                    entry = json.loads(line)
-                    if "memory" in entry:
-                        palette.append(entry["memory"])
+            for entry in ScribeJournal.get_instance(self.scribe_path).iter_entries():
+                if "memory" in entry:
+                    palette.append(entry["memory"])
         except Exception as e:
             raise ScaffoldError(
                 message=f"Failed to load scribe journal: {str(e)}",
@@ -701,11 +683,9 @@ class DreamAlbumGenerator:
         if not hasattr(self, "_cached_scribe_memories"):
             self._cached_scribe_memories = []
             try:
-                with open(self.scribe_path, "r") as f:
-                    for line in f:
-                        entry = json.loads(line)
-                        if "memory" in entry:
-                            self._cached_scribe_memories.append(entry["memory"])
+                for entry in ScribeJournal.get_instance(self.scribe_path).iter_entries():
+                    if "memory" in entry:
+                        self._cached_scribe_memories.append(entry["memory"])
             except Exception as e:
                 Logger.get_instance().log_warning(f"Could not read scribe journal for noise: {e}")
         return self._cached_scribe_memories
@@ -1,13 +1,15 @@
 import torch
 import time
+import queue
 import threading
 from collections import deque, defaultdict
-from typing import Optional, Dict, Any, List, Union, Callable, Tuple, Set
+from typing import Optional, Dict, Any, List, Union, Callable, Tuple, Set, Iterator
 import traceback
 from functools import wraps
 from datetime import datetime
+from dataclasses import dataclass, field
 from threading import Lock
-from transformers import AutoModelForCausalLM, AutoTokenizer
+from transformers import AutoModelForCausalLM, AutoTokenizer, StoppingCriteria
 from sovl_logger import Logger
 from sovl_state import StateManager, ConversationHistory
 from sovl_utils import detect_repetitions, adjust_temperature, synchronized, dynamic_batch_size
@@ -152,6 +154,21 @@ class GenerationManager:
         }
 
         self._last_good_memory_context = None  # Cache for fallback memory context
+
+        # Continuous batching: concurrent requests share one decode loop instead of queueing on the generation lock
+        self.batch_scheduler = None
+        if self._get_config_value("generation_config.continuous_batching", True):
+            # Resolves self.base_model on every step (so a reloaded model is picked up) and shares
+            # the generation lock with the exclusive generate() paths, one forward at a time
+            self.batch_scheduler = ContinuousBatchScheduler(
+                model=self.base_model,
+                pad_token_id=base_tokenizer.pad_token_id if base_tokenizer.pad_token_id is not None else base_tokenizer.eos_token_id,
+                eos_token_id=base_tokenizer.eos_token_id,
+                logger=self.logger,
+                max_batch_size=self._get_config_value("generation_config.max_batch_size", 8),
+                lock=self._locks['generation'],
+                model_provider=lambda: self.base_model
+            )
         
         # Log successful initialization
         self.logger.log_info("GenerationManager initialized successfully (with lazy component loading)")
@@ -542,13 +559,8 @@ class GenerationManager:
                 return bs
         return min_bs
 
-    @state_managed_operation("generate_text")
-    def generate_text(self, prompt: str, num_return_sequences: int = 1, user_id: str = "default", metadata_entries: list = None, **kwargs) -> List[str]:
-        """Generate text with state-driven error handling, recovery, scribe logging, and always-on memory integration.
-        Locking is minimized to only the model inference section to prevent deadlocks with StateManager and other modules.
-        """
-        request_time = time.time()
-        # --- Prompt hardening and input sanitization ---
+    def _sanitize_prompt(self, prompt: str) -> str:
+        """Harden a user prompt: strip control characters, collapse whitespace, truncate and screen content."""
         if not isinstance(prompt, str):
             self.logger.log_error(
                 error_msg=f"Prompt is not a string: {type(prompt)}",
@@ -572,98 +584,181 @@ class GenerationManager:
                 error_type="forbidden_prompt_content"
             )
             raise ValueError("Prompt contains forbidden content.")
+        return prompt
+
+    def _retrieve_memory_context(self, user_id: str) -> Optional[str]:
+        """Retrieve short- and long-term memory context with retries, falling back to the last good context."""
+        memory_context = None
+        context_retrieved = False
+        if self.dialogue_context_manager:
+            backoff = 0.1
+            for attempt in range(3):
+                try:
+                    short_ctx = self.dialogue_context_manager.get_short_term_context()
+                    long_ctx = self.dialogue_context_manager.get_long_term_context(user_id=user_id)
+                    memory_context = self._compose_memory_context(short_ctx, long_ctx)
+                    context_retrieved = True
+                    self._last_good_memory_context = memory_context
+                    break
+                except Exception as e:
+                    self.logger.log_warning(
+                        f"Attempt {attempt+1}: Failed to retrieve memory context: {str(e)}",
+                        error_type="memory_context_retrieval_error"
+                    )
+                    if attempt < 2:
+                        import time as _time
+                        _time.sleep(backoff)
+                        backoff *= 2
+            if not context_retrieved:
+                if self._last_good_memory_context:
+                    memory_context = self._last_good_memory_context
+                    self.logger.log_warning(
+                        "Using cached memory context due to repeated retrieval failures.",
+                        error_type="memory_context_fallback"
+                    )
+                else:
+                    self.logger.log_warning(
+                        "No memory context available after retries and no cache present.",
+                        error_type="memory_context_missing"
+                    )
+        else:
+            self.logger.log_warning(
+                "No dialogue context manager available for memory retrieval",
+                error_type="missing_dialogue_context"
+            )
+        return memory_context
+
+    def _prepare_generation_inputs(
+        self,
+        prompt: str,
+        num_return_sequences: int,
+        user_id: str,
+        metadata_entries: Optional[list],
+        kwargs: Dict[str, Any]
+    ) -> Tuple[Any, Dict[str, torch.Tensor], Dict[str, Any]]:
+        """Run memory retrieval and the primer, then tokenize the composite prompt.
+
+        Returns:
+            Tuple of (traits, model inputs on the model device, generation kwargs)
+        """
+        memory_context = self._retrieve_memory_context(user_id)
+        traits = self.primer.prepare_for_generation(prompt, user_id=user_id, metadata_entries=metadata_entries, **kwargs)
+        # Use the universal prompt assembler from sovl_primer for all context and vibe injection
+        composite_prompt = self.primer.assemble_full_prompt(
+            user_prompt=prompt,
+            memory_context=memory_context or ""
+        )
+        inputs = self.base_tokenizer(
+            composite_prompt,
+            return_tensors='pt',
+            padding=True,
+            truncation=True,
+            max_length=self.model_manager.max_context_length
+        )
+        model_device = next(self.base_model.parameters()).device
+        inputs = {k: v.to(model_device) for k, v in inputs.items()}
+        gen_kwargs = {"num_return_sequences": num_return_sequences}
+        gen_kwargs.update(kwargs)
+        base_temp = gen_kwargs.get("temperature", 1.0)
+        base_top_k = gen_kwargs.get("top_k", self._get_config_value("controls_config.top_k", 50))
+        base_top_p = gen_kwargs.get("top_p", self._get_config_value("controls_config.top_p", 0.95))
+        gen_kwargs["temperature"] = self.primer.adjust_parameter(base_temp, "temperature")
+        gen_kwargs["top_k"] = int(self.primer.adjust_parameter(base_top_k, "top_k"))
+        gen_kwargs["top_p"] = self.primer.adjust_parameter(base_top_p, "top_p")
+        return traits, inputs, gen_kwargs
+
+    def _capture_generation_scribe(
+        self,
+        prompt: str,
+        kwargs: Dict[str, Any],
+        generated_texts: List[str],
+        request_time: float,
+        user_id: str
+    ) -> None:
+        """Send a completed generation to the scribe journal."""
+        generation_result = {
+            "generated_texts": generated_texts,
+            "generation_config_used": self._get_generation_config(),
+            "processing_time_ms": (time.time() - request_time) * 1000
+        }
+        event_data, source_metadata = ScribeAssembler.assemble_scribe_data(
+            manager=self,
+            prompt=prompt,
+            initial_kwargs=kwargs,
+            generation_result=generation_result,
+            request_time=request_time,
+            session_id=self.session_id,
+            user_id=user_id,
+        )
+        capture_scribe_event(
+            origin="sovl_generation",
+            event_type="user_interaction",
+            event_data=event_data,
+            source_metadata=source_metadata,
+            session_id=self.session_id
+        )
+
+    def _capture_generation_error(self, prompt: str, kwargs: Dict[str, Any], error: Exception, request_time: float) -> None:
+        """Send a failed generation to the scribe journal."""
+        capture_scribe_event(
+            origin="sovl_generation",
+            event_type="generation_error",
+            event_data={
+                "prompt": prompt,
+                "error_message": str(error),
+                "error_type": type(error).__name__,
+                "kwargs": kwargs
+            },
+            source_metadata={
+                "session_id": self.session_id,
+                "request_timestamp_unix": request_time,
+                "model_name": getattr(self.base_model.config, "_name_or_path", "unknown"),
+                "device": str(self.device)
+            },
+            session_id=self.session_id,
+            timestamp=datetime.fromtimestamp(request_time)
+        )
+
+    def _sync_primer_state(self, context: str, generated_texts: Optional[List[str]], traits: Any, error: Optional[Exception]) -> None:
+        """Sync traits to state after a generation attempt, whether it succeeded or not."""
+        try:
+            self.primer.update_state_after_operation(
+                context=context,
+                result={
+                    "generated_texts": generated_texts,
+                    "traits": traits,
+                    "error": str(error) if error else None
+                }
+            )
+        except Exception as e:
+            self.logger.log_error(
+                error_msg=f"Failed to sync traits to state after generation (finally block): {str(e)}",
+                error_type="trait_state_sync_error",
+                stack_trace=traceback.format_exc()
+            )
+
+    @state_managed_operation("generate_text")
+    def generate_text(self, prompt: str, num_return_sequences: int = 1, user_id: str = "default", metadata_entries: list = None, **kwargs) -> List[str]:
+        """Generate text with state-driven error handling, recovery, scribe logging, and always-on memory integration.
+        Locking is minimized to only the model inference section to prevent deadlocks with StateManager and other modules.
+        """
+        request_time = time.time()
+        prompt = self._sanitize_prompt(prompt)
         traits = None
         generated_texts = None
         error = None
         try:
-            # --- Always-on Memory: Retrieve context ---
-            memory_context = None
-            context_retrieved = False
-            if self.dialogue_context_manager:
-                backoff = 0.1
-                for attempt in range(3):
-                    try:
-                        short_ctx = self.dialogue_context_manager.get_short_term_context()
-                        long_ctx = self.dialogue_context_manager.get_long_term_context(user_id=user_id)
-                        memory_context = self._compose_memory_context(short_ctx, long_ctx)
-                        context_retrieved = True
-                        self._last_good_memory_context = memory_context
-                        break
-                    except Exception as e:
-                        self.logger.log_warning(
-                            f"Attempt {attempt+1}: Failed to retrieve memory context: {str(e)}",
-                            error_type="memory_context_retrieval_error"
-                        )
-                        if attempt < 2:
-                            import time as _time
-                            _time.sleep(backoff)
-                            backoff *= 2
-                if not context_retrieved:
-                    if self._last_good_memory_context:
-                        memory_context = self._last_good_memory_context
-                        self.logger.log_warning(
-                            "Using cached memory context due to repeated retrieval failures.",
-                            error_type="memory_context_fallback"
-                        )
-                    else:
-                        self.logger.log_warning(
-                            "No memory context available after retries and no cache present.",
-                            error_type="memory_context_missing"
-                        )
-            else:
-                self.logger.log_warning(
-                    "No dialogue context manager available for memory retrieval",
-                    error_type="missing_dialogue_context"
-                )
-            traits = self.primer.prepare_for_generation(prompt, user_id=user_id, metadata_entries=metadata_entries, **kwargs)
-            # Use the universal prompt assembler from sovl_primer for all context and vibe injection
-            composite_prompt = self.primer.assemble_full_prompt(
-                user_prompt=prompt,
-                memory_context=memory_context or ""
-            )
-            # --- Prepare input batch ---
-            inputs = self.base_tokenizer(
-                composite_prompt,
-                return_tensors='pt',
-                padding=True,
-                truncation=True,
-                max_length=self.model_manager.max_context_length
+            traits, inputs, gen_kwargs = self._prepare_generation_inputs(
+                prompt, num_return_sequences, user_id, metadata_entries, kwargs
             )
-            model_device = next(self.base_model.parameters()).device
-            inputs = {k: v.to(model_device) for k, v in inputs.items()}
-            gen_kwargs = {"num_return_sequences": num_return_sequences}
-            gen_kwargs.update(kwargs)
-            base_temp = gen_kwargs.get("temperature", 1.0)
-            base_top_k = gen_kwargs.get("top_k", self._get_config_value("controls_config.top_k", 50))
-            base_top_p = gen_kwargs.get("top_p", self._get_config_value("controls_config.top_p", 0.95))
-            gen_kwargs["temperature"] = self.primer.adjust_parameter(base_temp, "temperature")
-            gen_kwargs["top_k"] = int(self.primer.adjust_parameter(base_top_k, "top_k"))
-            gen_kwargs["top_p"] = self.primer.adjust_parameter(base_top_p, "top_p")
-            # --- Model inference under lock ---
-            with self._locks['generation']:
-                output_sequences = self.base_model.generate(**inputs, **gen_kwargs)
+            # --- Model inference: shared decode loop, or exclusive generate under lock ---
+            if self.batch_scheduler is not None and self.batch_scheduler.supports(gen_kwargs):
+                output_sequences = self.batch_scheduler.generate(inputs["input_ids"][0], **gen_kwargs)
+            else:
+                with self._locks['generation']:
+                    output_sequences = self.base_model.generate(**inputs, **gen_kwargs)
             generated_texts = [self.base_tokenizer.decode(seq, skip_special_tokens=True) for seq in output_sequences]
-            generation_result = {
-                "generated_texts": generated_texts,
-                "generation_config_used": self._get_generation_config(),
-                "processing_time_ms": (time.time() - request_time) * 1000
-            }
-            event_data, source_metadata = ScribeAssembler.assemble_scribe_data(
-                manager=self,
-                prompt=prompt,
-                initial_kwargs=kwargs,
-                generation_result=generation_result,
-                request_time=request_time,
-                session_id=self.session_id,
-                user_id=user_id,
-            )
-            capture_scribe_event(
-                origin="sovl_generation",
-                event_type="user_interaction",
-                event_data=event_data,
-                source_metadata=source_metadata,
-                session_id=self.session_id
-            )
+            self._capture_generation_scribe(prompt, kwargs, generated_texts, request_time, user_id)
             return generated_texts
         except (ValueError, RuntimeError, GenerationError, IndexError) as e:
             error = e
@@ -671,42 +766,123 @@ class GenerationManager:
             raise
         except Exception as e:
             error = e
-            capture_scribe_event(
-                origin="sovl_generation",
-                event_type="generation_error",
-                event_data={
-                    "prompt": prompt,
-                    "error_message": str(e),
-                    "error_type": type(e).__name__,
-                    "kwargs": kwargs
-                },
-                source_metadata={
-                    "session_id": self.session_id,
-                    "request_timestamp_unix": request_time,
-                    "model_name": getattr(self.base_model.config, "_name_or_path", "unknown"),
-                    "device": str(self.device)
-                },
-                session_id=self.session_id,
-                timestamp=datetime.fromtimestamp(request_time)
-            )
+            self._capture_generation_error(prompt, kwargs, e, request_time)
             self._handle_error("generate_text", e)
             return ["An error occurred during text generation"]
         finally:
+            self._sync_primer_state("generate_text", generated_texts, traits, error)
+
+    @state_managed_operation("stream_text")
+    def stream_text(self, prompt: str, user_id: str = "default", metadata_entries: list = None, **kwargs) -> Iterator[str]:
+        """Generate a single response and return an iterator of decoded text chunks.
+
+        Prompt validation, memory retrieval, the primer and tokenization run here, under the
+        same state management as generate_text, so a bad request raises before anything is
+        streamed. The returned iterator yields newly decoded text as tokens are produced and
+        captures the scribe event once exhausted, with the same final text generate_text
+        would have returned; closing it early cancels the generation.
+        """
+        request_time = time.time()
+        prompt = self._sanitize_prompt(prompt)
+        kwargs.pop("num_return_sequences", None)
+        try:
+            traits, inputs, gen_kwargs = self._prepare_generation_inputs(
+                prompt, 1, user_id, metadata_entries, kwargs
+            )
+        except (ValueError, RuntimeError, GenerationError, IndexError) as e:
+            self._handle_error("stream_text", e)
+            self._sync_primer_state("stream_text", None, None, e)
+            raise
+        except Exception as e:
+            self._capture_generation_error(prompt, kwargs, e, request_time)
+            self._handle_error("stream_text", e)
+            self._sync_primer_state("stream_text", None, None, e)
+            raise GenerationError(f"Failed in stream_text: {e}") from e
+        return self._stream_tokens(prompt, kwargs, traits, inputs, gen_kwargs, request_time, user_id)
+
+    def _stream_tokens(
+        self,
+        prompt: str,
+        kwargs: Dict[str, Any],
+        traits: Any,
+        inputs: Dict[str, torch.Tensor],
+        gen_kwargs: Dict[str, Any],
+        request_time: float,
+        user_id: str
+    ) -> Iterator[str]:
+        """Yield text chunks for a request prepared by stream_text, then capture its scribe event."""
+        generated_texts = None
+        error = None
+        try:
+            if self.batch_scheduler is not None and self.batch_scheduler.supports(gen_kwargs):
+                prompt_ids = inputs["input_ids"][0]
+                request = self.batch_scheduler.submit(prompt_ids, stream=True, **gen_kwargs)
+                token_ids: List[int] = []
+                emitted = ""
+                try:
+                    for token_id in request.iter_tokens():
+                        token_ids.append(token_id)
+                        text = self.base_tokenizer.decode(token_ids, skip_special_tokens=True)
+                        # Hold back incomplete multi-byte characters until the next token completes them
+                        if text.endswith("\ufffd") or len(text) <= len(emitted):
+                            continue
+                        chunk, emitted = text[len(emitted):], text
+                        yield chunk
+                finally:
+                    # Consumer closed the stream early (e.g. client disconnect): stop decoding for it
+                    request.cancel()
+                output_sequence = request.output_ids()
+            else:
+                output_sequence = yield from self._stream_with_generate(inputs, gen_kwargs)
+            generated_texts = [self.base_tokenizer.decode(output_sequence, skip_special_tokens=True)]
+            self._capture_generation_scribe(prompt, kwargs, generated_texts, request_time, user_id)
+        except (ValueError, RuntimeError, GenerationError, IndexError) as e:
+            error = e
+            self._handle_error("stream_text", e)
+            raise
+        except Exception as e:
+            error = e
+            self._capture_generation_error(prompt, kwargs, e, request_time)
+            self._handle_error("stream_text", e)
+            raise GenerationError(f"Failed in stream_text: {e}") from e
+        finally:
+            self._sync_primer_state("stream_text", generated_texts, traits, error)
+
+    def _stream_with_generate(self, inputs: Dict[str, torch.Tensor], gen_kwargs: Dict[str, Any]):
+        """Stream through base_model.generate when the batch scheduler cannot serve the request.
+
+        Yields text chunks and returns the full output sequence (prompt plus generated ids).
+        """
+        from transformers import StoppingCriteriaList, TextIteratorStreamer
+        streamer = TextIteratorStreamer(self.base_tokenizer, skip_prompt=True, skip_special_tokens=True)
+        cancelled = threading.Event()
+        stopping_criteria = StoppingCriteriaList(gen_kwargs.pop("stopping_criteria", None) or [])
+        stopping_criteria.append(_CancelledCriteria(cancelled))
+        result: Dict[str, Any] = {}
+
+        def _run():
             try:
-                self.primer.update_state_after_operation(
-                    context="generate_text",
-                    result={
-                        "generated_texts": generated_texts,
-                        "traits": traits,
-                        "error": str(error) if error else None
-                    }
-                )
+                with self._locks['generation']:
+                    result["sequences"] = self.base_model.generate(
+                        **inputs, **gen_kwargs, streamer=streamer, stopping_criteria=stopping_criteria
+                    )
             except Exception as e:
-                self.logger.log_error(
-                    error_msg=f"Failed to sync traits to state after generation (finally block): {str(e)}",
-                    error_type="trait_state_sync_error",
-                    stack_trace=traceback.format_exc()
-                )
+                result["error"] = e
+                streamer.end()
+
+        worker = threading.Thread(target=_run, name="generation_streamer", daemon=True)
+        worker.start()
+        try:
+            for chunk in streamer:
+                if chunk:
+                    yield chunk
+        finally:
+            # Stops generate() at the next token (releasing the generation lock) if the consumer went away
+            cancelled.set()
+        worker.join()
+        if "error" in result:
+            raise result["error"]
+        return result["sequences"][0]
 
     def set_system_context(self, system_context):
         """Bind the system context for always-on memory integration."""
@@ -1077,6 +1253,446 @@ class GenerationManager:
             self._handle_error("handle_internal_prompt", e)
             return "..."
 
+class _CancelledCriteria(StoppingCriteria):
+    """StoppingCriteria for base_model.generate() that fires once `event` is set."""
+
+    def __init__(self, event: threading.Event):
+        self.event = event
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        return torch.full((input_ids.shape[0],), self.event.is_set(), dtype=torch.bool, device=input_ids.device)
+
+
+class ContinuousBatchScheduler:
+    """
+    Shares one decode loop across concurrent generation requests.
+
+    Requests are prefilled together when admitted, merged into a left-padded
+    batch KV cache and then decoded one token per step alongside every other
+    active sequence. Finished sequences are retired between steps so new
+    prompts can join without waiting for the whole batch to drain.
+
+    Every forward runs under `lock`, the same lock exclusive base_model.generate()
+    callers hold, so the two never drive the model (and its hooks) at once. The model
+    is re-resolved through `model_provider` before each step; if it changed, the
+    in-flight batch is failed (its KV cache belongs to the old model) and new requests
+    run on the new one. Without max_new_tokens a request stops where base_model.generate()
+    would: generation_config.max_new_tokens, else generation_config.max_length.
+    """
+
+    SUPPORTED_KWARGS = {
+        "num_return_sequences", "max_new_tokens", "temperature", "top_k",
+        "top_p", "do_sample", "eos_token_id", "pad_token_id"
+    }
+
+    def __init__(
+        self,
+        model: AutoModelForCausalLM,
+        pad_token_id: Optional[int],
+        eos_token_id: Optional[Union[int, List[int]]],
+        logger: Logger,
+        max_batch_size: int = 8,
+        default_max_new_tokens: Optional[int] = None,
+        lock: Optional[Lock] = None,
+        model_provider: Optional[Callable[[], Any]] = None
+    ):
+        self._model = model
+        self._model_provider = model_provider
+        self._lock = lock if lock is not None else Lock()
+        self._batch_model = None  # model that produced the active batch's KV cache
+        self.pad_token_id = pad_token_id if pad_token_id is not None else 0
+        self.eos_token_id = eos_token_id
+        self.logger = logger
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.default_max_new_tokens = default_max_new_tokens
+        self._pending: "queue.Queue[BatchRequest]" = queue.Queue()
+        self._active: List[BatchRequest] = []
+        self._past = None
+        self._attention_mask = None
+        self._next_tokens = None
+        self._thread = None
+        self._thread_lock = Lock()
+        self._stop_event = threading.Event()
+
+    @property
+    def model(self):
+        return self._model_provider() if self._model_provider is not None else self._model
+
+    def supports(self, gen_kwargs: Dict[str, Any]) -> bool:
+        """Return True if the generation kwargs can be served by the shared decode loop."""
+        if gen_kwargs.get("num_beams", 1) not in (None, 1):
+            return False
+        return all(k in self.SUPPORTED_KWARGS or k == "num_beams" for k in gen_kwargs)
+
+    def generate(self, input_ids: torch.Tensor, num_return_sequences: int = 1, **gen_kwargs) -> List[torch.Tensor]:
+        """Submit a prompt and block until every returned sequence has finished decoding.
+
+        Args:
+            input_ids: Prompt token ids of shape (seq_len,) or (1, seq_len).
+            num_return_sequences: Number of independent samples to decode for the prompt.
+            **gen_kwargs: Sampling parameters (temperature, top_k, top_p, do_sample, max_new_tokens).
+
+        Returns:
+            List of 1-D tensors holding prompt plus generated ids, matching base_model.generate output.
+        """
+        requests = [
+            self.submit(input_ids, **gen_kwargs)
+            for _ in range(max(1, int(num_return_sequences)))
+        ]
+        for request in requests:
+            request.done.wait()
+            if request.error is not None:
+                raise request.error
+        return [request.output_ids() for request in requests]
+
+    def submit(self, input_ids: torch.Tensor, stream: bool = False, **gen_kwargs) -> "BatchRequest":
+        """Queue a single sequence for admission at the next decode step.
+
+        Args:
+            input_ids: Prompt token ids of shape (seq_len,) or (1, seq_len).
+            stream: If True, decoded token ids are also published to request.iter_tokens().
+            **gen_kwargs: Sampling parameters, as for generate().
+        """
+        request = self._build_request(input_ids, gen_kwargs)
+        if stream:
+            request.stream = queue.Queue()
+        self._ensure_running()
+        self._pending.put(request)
+        return request
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop the decode loop and fail any requests that are still in flight."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self._fail_all(GenerationError("Batch scheduler shut down"))
+
+    def _build_request(self, input_ids: torch.Tensor, gen_kwargs: Dict[str, Any]) -> "BatchRequest":
+        generation_config = getattr(self.model, "generation_config", None)
+        eos = gen_kwargs.get("eos_token_id", self.eos_token_id)
+        eos_ids = set(eos) if isinstance(eos, (list, tuple, set)) else ({eos} if eos is not None else set())
+        input_ids = input_ids.reshape(-1)
+        max_new_tokens = gen_kwargs.get("max_new_tokens") or self.default_max_new_tokens
+        if not max_new_tokens:
+            # Same limit base_model.generate() applies when none is given
+            max_new_tokens = getattr(generation_config, "max_new_tokens", None) or max(
+                1, int(getattr(generation_config, "max_length", None) or 20) - input_ids.numel()
+            )
+        return BatchRequest(
+            input_ids=input_ids,
+            max_new_tokens=int(max_new_tokens),
+            temperature=float(gen_kwargs.get("temperature", 1.0) or 1.0),
+            top_k=int(gen_kwargs.get("top_k", 0) or 0),
+            top_p=float(gen_kwargs.get("top_p", 1.0) or 1.0),
+            do_sample=bool(gen_kwargs.get("do_sample", getattr(generation_config, "do_sample", False))),
+            eos_token_ids=eos_ids
+        )
+
+    def _ensure_running(self) -> None:
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop_event.clear()
+                self._thread = threading.Thread(
+                    target=self._decode_loop,
+                    name="generation_batch_scheduler",
+                    daemon=True
+                )
+                self._thread.start()
+
+    def _decode_loop(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self._check_model()
+                if not self._active:
+                    try:
+                        first = self._pending.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    self._admit([first])
+                self._admit_pending()
+                self._retire_cancelled()
+                if self._active:
+                    self._step()
+            except Exception as e:
+                self.logger.log_error(
+                    error_msg=f"Batch decode step failed: {str(e)}",
+                    error_type="batch_scheduler_error",
+                    stack_trace=traceback.format_exc()
+                )
+                self._fail_all(e)
+
+    def _check_model(self) -> None:
+        """Re-point at the current model; fail sequences whose KV cache came from a replaced one."""
+        model = self.model
+        if model is self._batch_model:
+            return
+        if self._active:
+            self.logger.log_warning("Base model replaced during batched generation; failing in-flight requests")
+            failed, self._active = self._active, []
+            self._reset_batch()
+            for request in failed:
+                request.fail(GenerationError("Base model was replaced during generation"))
+        self._batch_model = model
+
+    def _admit_pending(self) -> None:
+        """Admit queued requests up to the remaining batch capacity."""
+        capacity = self.max_batch_size - len(self._active)
+        incoming = []
+        while capacity > len(incoming):
+            try:
+                incoming.append(self._pending.get_nowait())
+            except queue.Empty:
+                break
+        if incoming:
+            self._admit(incoming)
+
+    @torch.no_grad()
+    def _admit(self, requests: List["BatchRequest"]) -> None:
+        """Prefill new requests as one left-padded batch and merge them into the active batch."""
+        for request in requests:
+            if request.cancelled:
+                request._finish()
+        requests = [request for request in requests if not request.cancelled]
+        if not requests:
+            return
+        model = self._batch_model
+        device = next(model.parameters()).device
+        prompt_len = max(r.input_ids.numel() for r in requests)
+        input_ids = torch.full((len(requests), prompt_len), self.pad_token_id, dtype=torch.long, device=device)
+        attention_mask = torch.zeros((len(requests), prompt_len), dtype=torch.long, device=device)
+        for row, request in enumerate(requests):
+            ids = request.input_ids.to(device)
+            input_ids[row, prompt_len - ids.numel():] = ids
+            attention_mask[row, prompt_len - ids.numel():] = 1
+        position_ids = (attention_mask.cumsum(-1) - 1).clamp(min=0)
+        with self._lock:
+            outputs = model(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                position_ids=position_ids,
+                use_cache=True
+            )
+        next_tokens = self._sample(outputs.logits[:, -1, :], requests)
+        past = _to_legacy_cache(outputs.past_key_values)
+
+        keep = [row for row, request in enumerate(requests) if not request.append(int(next_tokens[row]))]
+        if len(keep) < len(requests):
+            index = torch.tensor(keep, dtype=torch.long, device=device)
+            past = _select_cache_rows(past, index)
+            attention_mask = attention_mask.index_select(0, index)
+            next_tokens = next_tokens.index_select(0, index)
+        if not keep:
+            return
+        requests = [requests[row] for row in keep]
+
+        if not self._active:
+            self._past, self._attention_mask = past, attention_mask
+            self._next_tokens = next_tokens.unsqueeze(-1)
+        else:
+            target = max(self._attention_mask.size(1), attention_mask.size(1))
+            self._past = _concat_cache_rows(
+                _left_pad_cache(self._past, target), _left_pad_cache(past, target)
+            )
+            self._attention_mask = torch.cat(
+                [_left_pad_mask(self._attention_mask, target), _left_pad_mask(attention_mask, target)], dim=0
+            )
+            self._next_tokens = torch.cat([self._next_tokens, next_tokens.unsqueeze(-1)], dim=0)
+        self._active.extend(requests)
+
+    @torch.no_grad()
+    def _step(self) -> None:
+        """Decode one token for every active sequence and retire the finished ones."""
+        position_ids = self._attention_mask.sum(dim=-1, keepdim=True)
+        attention_mask = torch.cat([self._attention_mask, torch.ones_like(self._next_tokens)], dim=-1)
+        with self._lock:
+            outputs = self._batch_model(
+                input_ids=self._next_tokens,
+                attention_mask=attention_mask,
+                position_ids=position_ids,
+                past_key_values=_from_legacy_cache(self._past),
+                use_cache=True
+            )
+        next_tokens = self._sample(outputs.logits[:, -1, :], self._active)
+        self._past = _to_legacy_cache(outputs.past_key_values)
+        self._attention_mask = attention_mask
+        self._next_tokens = next_tokens.unsqueeze(-1)
+
+        keep = [row for row, request in enumerate(self._active) if not request.append(int(next_tokens[row]))]
+        self._retain(keep)
+
+    def _retire_cancelled(self) -> None:
+        """Drop sequences whose consumer cancelled them, before spending a step on them."""
+        if not any(request.cancelled for request in self._active):
+            return
+        keep = []
+        for row, request in enumerate(self._active):
+            if request.cancelled:
+                request._finish()
+            else:
+                keep.append(row)
+        self._retain(keep)
+
+    def _retain(self, keep: List[int]) -> None:
+        """Keep only the given rows of the active batch (cache, mask and next tokens included)."""
+        if len(keep) == len(self._active):
+            return
+        if not keep:
+            self._reset_batch()
+            return
+        index = torch.tensor(keep, dtype=torch.long, device=self._next_tokens.device)
+        self._active = [self._active[row] for row in keep]
+        self._past = _select_cache_rows(self._past, index)
+        self._attention_mask = self._attention_mask.index_select(0, index)
+        self._next_tokens = self._next_tokens.index_select(0, index)
+        # Drop leading columns that are padding for every remaining sequence
+        live_columns = self._attention_mask.any(dim=0).nonzero()
+        start = int(live_columns[0]) if live_columns.numel() else 0
+        if start > 0:
+            self._attention_mask = self._attention_mask[:, start:]
+            self._past = tuple((k[:, :, start:], v[:, :, start:]) for k, v in self._past)
+
+    def _sample(self, logits: torch.Tensor, requests: List["BatchRequest"]) -> torch.Tensor:
+        """Apply per-row temperature, top-k and top-p sampling in one vectorised pass."""
+        device = logits.device
+        logits = logits.float()
+        greedy = logits.argmax(dim=-1)
+        do_sample = torch.tensor([r.do_sample for r in requests], dtype=torch.bool, device=device)
+        if not bool(do_sample.any()):
+            return greedy
+        vocab_size = logits.size(-1)
+        temperature = torch.tensor([max(r.temperature, 1e-5) for r in requests], device=device)
+        top_k = torch.tensor([r.top_k if r.top_k > 0 else vocab_size for r in requests], device=device)
+        top_p = torch.tensor([r.top_p for r in requests], device=device)
+        sorted_logits, sorted_idx = (logits / temperature[:, None]).sort(dim=-1, descending=True)
+        ranks = torch.arange(vocab_size, device=device)
+        remove = ranks[None, :] >= top_k[:, None]
+        probs = torch.softmax(sorted_logits.masked_fill(remove, float("-inf")), dim=-1)
+        remove |= (probs.cumsum(dim=-1) - probs) > top_p[:, None]
+        probs = torch.softmax(sorted_logits.masked_fill(remove, float("-inf")), dim=-1)
+        sampled = sorted_idx.gather(-1, torch.multinomial(probs, 1)).squeeze(-1)
+        return torch.where(do_sample, sampled, greedy)
+
+    def _reset_batch(self) -> None:
+        self._active = []
+        self._past = None
+        self._attention_mask = None
+        self._next_tokens = None
+
+    def _fail_all(self, error: BaseException) -> None:
+        failed = list(self._active)
+        while True:
+            try:
+                failed.append(self._pending.get_nowait())
+            except queue.Empty:
+                break
+        self._reset_batch()
+        for request in failed:
+            request.fail(error)
+
+
+@dataclass
+class BatchRequest:
+    """A single sequence decoded by ContinuousBatchScheduler."""
+    input_ids: torch.Tensor
+    max_new_tokens: int
+    temperature: float = 1.0
+    top_k: int = 0
+    top_p: float = 1.0
+    do_sample: bool = False
+    eos_token_ids: Set[int] = field(default_factory=set)
+    generated: List[int] = field(default_factory=list)
+    error: Optional[BaseException] = None
+    done: threading.Event = field(default_factory=threading.Event)
+    stream: Optional[queue.Queue] = None
+    cancelled: bool = False
+
+    def append(self, token_id: int) -> bool:
+        """Record a decoded token and return True once the sequence is finished."""
+        self.generated.append(token_id)
+        if self.stream is not None:
+            self.stream.put(token_id)
+        finished = token_id in self.eos_token_ids or len(self.generated) >= self.max_new_tokens
+        if finished:
+            self._finish()
+        return finished
+
+    def fail(self, error: BaseException) -> None:
+        self.error = error
+        self._finish()
+
+    def cancel(self) -> None:
+        """Ask the scheduler to stop decoding this sequence at its next step (no-op once finished)."""
+        self.cancelled = True
+
+    def iter_tokens(self) -> Iterator[int]:
+        """Yield token ids as they are decoded; raises the scheduler error if the request failed."""
+        if self.stream is None:
+            raise RuntimeError("Request was not submitted with stream=True")
+        while True:
+            token_id = self.stream.get()
+            if token_id is None:
+                break
+            yield token_id
+        if self.error is not None:
+            raise self.error
+
+    def _finish(self) -> None:
+        if self.stream is not None:
+            self.stream.put(None)
+        self.done.set()
+
+    def output_ids(self) -> torch.Tensor:
+        generated = torch.tensor(self.generated, dtype=self.input_ids.dtype)
+        return torch.cat([self.input_ids.cpu(), generated])
+
+
+def _to_legacy_cache(past):
+    """Normalise a model cache to the legacy tuple of (key, value) per layer."""
+    if hasattr(past, "to_legacy_cache"):
+        return past.to_legacy_cache()
+    if hasattr(past, "layers"):
+        return tuple((layer.keys, layer.values) for layer in past.layers)
+    return tuple((layer[0], layer[1]) for layer in past)
+
+
+def _from_legacy_cache(past):
+    """Wrap a legacy cache in DynamicCache when the installed transformers expects one."""
+    try:
+        from transformers import DynamicCache
+    except ImportError:
+        return past
+    if hasattr(DynamicCache, "from_legacy_cache"):
+        return DynamicCache.from_legacy_cache(past)
+    return DynamicCache(past)
+
+
+def _select_cache_rows(past, index: torch.Tensor):
+    return tuple((k.index_select(0, index), v.index_select(0, index)) for k, v in past)
+
+
+def _concat_cache_rows(first, second):
+    return tuple(
+        (torch.cat([k1, k2], dim=0), torch.cat([v1, v2], dim=0))
+        for (k1, v1), (k2, v2) in zip(first, second)
+    )
+
+
+def _left_pad_cache(past, target_len: int):
+    def pad(t: torch.Tensor) -> torch.Tensor:
+        missing = target_len - t.size(-2)
+        if missing <= 0:
+            return t
+        return torch.cat([t.new_zeros(*t.shape[:-2], missing, t.size(-1)), t], dim=-2)
+    return tuple((pad(k), pad(v)) for k, v in past)
+
+
+def _left_pad_mask(mask: torch.Tensor, target_len: int) -> torch.Tensor:
+    missing = target_len - mask.size(1)
+    if missing <= 0:
+        return mask
+    return torch.cat([mask.new_zeros(mask.size(0), missing), mask], dim=1)
+
+
 class ScribeAssembler:
     """Assembles the data required for logging generation events."""
 
@@ -10,10 +10,13 @@ from threading import Lock
 import traceback
 import random
 import time
+import re
+from collections import deque
 from sovl_logger import Logger, LoggerConfig
 from sovl_config import ConfigManager
 from sovl_error import ErrorManager, ConfigurationError
 import shutil
+import weakref
 
 class InsufficientDataError(Exception):
     """Raised when loaded data doesn't meet minimum entry requirements."""
@@ -556,17 +559,508 @@ def load_and_split_data(
         )
         raise DataValidationError(f"Failed to split data: {str(e)}")
 
+class ScribeJournal:
+    """
+    Segmented scribe journal: the live head file at `path` plus immutable sealed segments.
+
+    The head (`path` itself, so existing readers and appenders keep working) is appended
+    by JsonlWriter. When it reaches scribed_config.max_file_size_mb, or when training wants
+    a stable snapshot, it is sealed: renamed to <stem>.<seq>.jsonl next to it and recorded
+    in <path>.manifest.json with its entry count, byte size, first/last write time, the
+    offset just past its last "wake" event, and whether it has been trained on. Counting,
+    tail reads and "since last wake" reads consult the manifest and open only the segments
+    they need; only the head's unrecorded tail is ever scanned. Pruning rewrites trained
+    segments without their trained entries (see prune).
+
+    One instance per path is shared in-process (get_instance); writers commit under
+    self.lock and reopen the head when `generation` changes after a seal.
+    """
+    _instances: Dict[str, "ScribeJournal"] = {}
+    _instances_lock = threading.Lock()
+
+    _WAKE_RE = re.compile(rb'"event_type":\s*"wake"')
+
+    @classmethod
+    def get_instance(cls, path: str) -> "ScribeJournal":
+        """Return the journal for path, creating it on first use."""
+        key = os.path.abspath(path)
+        with cls._instances_lock:
+            journal = cls._instances.get(key)
+            if journal is None:
+                journal = cls(path)
+                cls._instances[key] = journal
+            return journal
+
+    def __init__(self, path: str):
+        self.path = path
+        self.directory = os.path.dirname(path) or "."
+        stem, ext = os.path.splitext(os.path.basename(path))
+        self._segment_prefix = f"{stem}."
+        self._segment_suffix = ext or ".jsonl"
+        self.manifest_path = f"{path}.manifest.json"
+        self.lock = threading.RLock()
+        self.generation = 0
+        self.fallback_logger = logging.getLogger('sovl.scribe.journal')
+        self._segments: List[Dict[str, Any]] = []
+        self._next_seq = 1
+        self._head = self._empty_head()
+        self._writers = weakref.WeakSet()
+        with self.lock:
+            self._load_manifest()
+            self.refresh()
+
+    @staticmethod
+    def _empty_head() -> Dict[str, Any]:
+        return {"inode": None, "entries": 0, "bytes": 0, "first_ts": None, "last_ts": None, "last_wake_offset": None, "wake_scanned": 0}
+
+    # --- manifest ---
+
+    def _load_manifest(self) -> None:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            manifest = {"segments": self._discover_segments()}
+        except (OSError, ValueError) as e:
+            self.fallback_logger.error(f"Unreadable scribe manifest {self.manifest_path}, rebuilding: {str(e)}")
+            manifest = {"segments": self._discover_segments()}
+        self._segments = [
+            segment for segment in manifest.get("segments", [])
+            if os.path.exists(os.path.join(self.directory, segment["name"]))
+        ]
+        self._next_seq = max([manifest.get("next_seq", 1)] + [self._segment_seq(s["name"]) + 1 for s in self._segments])
+        head = manifest.get("head")
+        if head:
+            self._head = {**self._empty_head(), **head}
+
+    def _segment_seq(self, name: str) -> int:
+        try:
+            return int(name[len(self._segment_prefix):-len(self._segment_suffix)])
+        except ValueError:
+            return 0
+
+    def _discover_segments(self) -> List[Dict[str, Any]]:
+        """Rebuild segment records from the files on disk (manifest lost or corrupt)."""
+        segments = []
+        if not os.path.isdir(self.directory):
+            return segments
+        for name in sorted(os.listdir(self.directory)):
+            if name.startswith(self._segment_prefix) and name.endswith(self._segment_suffix) and self._segment_seq(name):
+                stats = self._scan_file(os.path.join(self.directory, name), 0)
+                mtime = os.path.getmtime(os.path.join(self.directory, name))
+                segments.append({"name": name, "entries": stats["entries"], "bytes": stats["bytes"],
+                                 "first_ts": mtime, "last_ts": mtime, "last_wake_offset": stats["last_wake_offset"], "trained": False})
+        return segments
+
+    def _save_manifest(self) -> None:
+        manifest = {"version": 1, "next_seq": self._next_seq, "segments": self._segments, "head": self._head}
+        try:
+            tmp = f"{self.manifest_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.replace(tmp, self.manifest_path)
+        except OSError as e:
+            self.fallback_logger.error(f"Failed to save scribe manifest {self.manifest_path}: {str(e)}")
+
+    # --- head tracking ---
+
+    def _scan_file(self, path: str, start: int, stop: Optional[int] = None) -> Dict[str, Any]:
+        """Count complete lines and the last wake in path from start (up to stop), in 1 MiB blocks."""
+        stats = {"entries": 0, "bytes": start, "last_wake_offset": None}
+        with open(path, "rb") as f:
+            f.seek(start)
+            offset, carry = start, b""
+            while True:
+                block = f.read(1 << 20 if stop is None else min(1 << 20, stop - offset - len(carry)))
+                if not block:
+                    break
+                data = carry + block
+                end = data.rfind(b"\n") + 1
+                stats["entries"] += data.count(b"\n", 0, end)
+                wake = None
+                for wake in self._WAKE_RE.finditer(data, 0, end):
+                    pass
+                if wake is not None:
+                    stats["last_wake_offset"] = offset + data.index(b"\n", wake.end()) + 1
+                offset += end
+                carry = data[end:]
+            stats["bytes"] = offset
+        return stats
+
+    def refresh(self) -> None:
+        """Catch up with the head file: account appended lines, or start over if it was replaced."""
+        with self.lock:
+            drained = self._drain_writers()
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                if self._head["inode"] is not None or self._head["entries"]:
+                    self._head = self._empty_head()
+                return
+            if stat.st_ino != self._head["inode"] or stat.st_size < self._head["bytes"]:
+                self._head = self._empty_head()
+                self._head["inode"] = stat.st_ino
+            elif drained and stat.st_size > self._head["bytes"]:
+                # Someone outside this process appended too, so the drained counts no longer
+                # line up with offsets in the file: count the head again from the start
+                self._head = self._empty_head()
+                self._head["inode"] = stat.st_ino
+            if stat.st_size > self._head["bytes"]:
+                self._scan_head_wakes()
+                stats = self._scan_file(self.path, self._head["bytes"])
+                if stats["entries"]:
+                    self._head["entries"] += stats["entries"]
+                    self._head["bytes"] = stats["bytes"]
+                    self._head["wake_scanned"] = stats["bytes"]
+                    self._head["first_ts"] = self._head["first_ts"] or stat.st_mtime
+                    self._head["last_ts"] = stat.st_mtime
+                    if stats["last_wake_offset"] is not None:
+                        self._head["last_wake_offset"] = stats["last_wake_offset"]
+
+    def _scan_head_wakes(self) -> None:
+        """Find wakes in the part of the head committed since the last scan; caller holds self.lock.
+
+        Writers only tally lines and bytes, so the wake search runs here, when an offset is
+        needed, instead of on every group they append.
+        """
+        head = self._head
+        if head["wake_scanned"] >= head["bytes"]:
+            return
+        try:
+            stats = self._scan_file(self.path, head["wake_scanned"], head["bytes"])
+        except FileNotFoundError:
+            return
+        if stats["last_wake_offset"] is not None:
+            head["last_wake_offset"] = stats["last_wake_offset"]
+        head["wake_scanned"] = stats["bytes"]
+
+    def attach(self, writer: "JsonlWriter") -> None:
+        """Register a writer whose commits are counted from its own tallies instead of rescanning the head."""
+        with self.lock:
+            self.refresh()  # pick up the head the writer may just have created
+            self._writers.add(writer)
+
+    def detach(self, writer: "JsonlWriter") -> None:
+        with self.lock:
+            self._drain_writers()
+            self._writers.discard(writer)
+
+    def _drain_writers(self) -> bool:
+        """
+        Fold the line and byte tallies attached writers kept since the last drain into the
+        head; caller holds self.lock. Writers only update their tallies under this lock,
+        so every drained byte is already in the file. Returns whether anything was drained.
+        """
+        head, drained = self._head, False
+        for writer in list(self._writers):
+            if not writer._journal_lines:
+                continue
+            if writer._inode == head["inode"]:
+                head["entries"] += writer._journal_lines
+                head["bytes"] += writer._journal_bytes
+                head["first_ts"] = head["first_ts"] or writer._journal_since
+                head["last_ts"] = time.time()
+                drained = True
+            # Tallies for a replaced head are dropped; refresh() rescans whatever is on disk
+            writer._journal_lines = writer._journal_bytes = 0
+        return drained
+
+    # --- segments ---
+
+    def seal(self) -> Optional[str]:
+        """Seal the head into the next segment; returns its path, or None if the head is empty."""
+        with self.lock:
+            self.refresh()
+            if not self._head["entries"]:
+                return None
+            self._scan_head_wakes()
+            name = f"{self._segment_prefix}{self._next_seq:06d}{self._segment_suffix}"
+            segment_path = os.path.join(self.directory, name)
+            # Readers stop at the recorded size, so a trailing partial line is never returned
+            os.rename(self.path, segment_path)
+            record = {key: self._head[key] for key in ("entries", "bytes", "first_ts", "last_ts", "last_wake_offset")}
+            self._segments.append({"name": name, **record, "trained": False})
+            self._next_seq += 1
+            self._head = self._empty_head()
+            self.generation += 1
+            self._save_manifest()
+            return segment_path
+
+    def segments(self) -> List[Dict[str, Any]]:
+        """Manifest records of the sealed segments, oldest first."""
+        with self.lock:
+            return [dict(segment) for segment in self._segments]
+
+    def _segment_path(self, segment: Dict[str, Any]) -> str:
+        return os.path.join(self.directory, segment["name"])
+
+    def seal_for_training(self) -> List[str]:
+        """Seal the head and return the paths of all segments not yet trained on, oldest first."""
+        with self.lock:
+            self.seal()
+            return [self._segment_path(segment) for segment in self._segments if not segment["trained"]]
+
+    def mark_trained(self, segment_paths: List[str]) -> None:
+        names = {os.path.basename(path) for path in segment_paths}
+        with self.lock:
+            for segment in self._segments:
+                if segment["name"] in names:
+                    segment["trained"] = True
+            self._save_manifest()
+
+    def prune(self, trained_memories: set, backup: bool = True, backup_dir: str = "scribe_backups", max_backups: int = 5) -> int:
+        """
+        Remove trained entries from the segments marked trained; untrained segments and the
+        head are not opened. An entry is removed when its "memory" is in trained_memories;
+        everything else (wake markers and other events, memories that were not trained on,
+        malformed lines) stays in the segment, which is rewritten in place. A segment left
+        with memories to train on is marked untrained again; one left with only other events
+        is marked pruned and not read again. Segments left empty are dropped.
+
+        With backup set, each segment is copied (or moved, if emptied) to backup_dir as it was
+        before its first pruning. Only the newest max_backups segment backups are kept; older
+        ones are deleted permanently (max_backups <= 0 keeps them all). Returns the number of
+        entries removed.
+        """
+        with self.lock:
+            removed = 0
+            kept = []
+            for segment in self._segments:
+                if not segment["trained"] or segment.get("pruned"):
+                    kept.append(segment)
+                    continue
+                segment_path = self._segment_path(segment)
+                try:
+                    retained, dropped, memories_left = self._filter_segment(segment_path, segment["bytes"], trained_memories)
+                    backup_path = os.path.join(backup_dir, segment["name"])
+                    if backup and dropped:
+                        os.makedirs(backup_dir, exist_ok=True)
+                        # An existing backup predates an earlier pruning and already holds these entries
+                        if not os.path.exists(backup_path):
+                            if retained:
+                                shutil.copy2(segment_path, backup_path)
+                            else:
+                                shutil.move(segment_path, backup_path)
+                    if not retained:
+                        if os.path.exists(segment_path):
+                            os.remove(segment_path)
+                        removed += dropped
+                        continue
+                    if dropped:
+                        # Readers that already opened the segment keep the old file; new ones see the rewrite
+                        tmp = f"{segment_path}.tmp"
+                        with open(tmp, "wb") as f:
+                            f.writelines(retained)
+                        os.replace(tmp, segment_path)
+                        stats = self._scan_file(segment_path, 0)
+                        segment.update(entries=stats["entries"], bytes=stats["bytes"], last_wake_offset=stats["last_wake_offset"])
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    self.fallback_logger.error(f"Failed to prune scribe segment {segment_path}: {str(e)}")
+                    kept.append(segment)
+                    continue
+                removed += dropped
+                if memories_left:
+                    segment["trained"] = False
+                else:
+                    segment["pruned"] = True
+                kept.append(segment)
+            self._segments = kept
+            self._save_manifest()
+        if backup and removed and max_backups > 0 and os.path.isdir(backup_dir):
+            backups = sorted(
+                (name for name in os.listdir(backup_dir)
+                 if name.startswith(self._segment_prefix) and name.endswith(self._segment_suffix)),
+                reverse=True
+            )
+            for old in backups[max_backups:]:
+                os.remove(os.path.join(backup_dir, old))
+        return removed
+
+    @staticmethod
+    def _filter_segment(path: str, end: int, trained_memories: set) -> Tuple[List[bytes], int, bool]:
+        """
+        Split a segment's lines (up to byte offset end) into those to keep and a count of
+        trained entries to drop; also reports whether any kept line is a memory to train on.
+        """
+        retained, dropped, memories_left = [], 0, False
+        with open(path, "rb") as f:
+            offset = 0
+            while offset < end:
+                line = f.readline()
+                if not line:
+                    break
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    retained.append(line)  # Keep malformed lines
+                    continue
+                memory = entry.get("memory") if isinstance(entry, dict) else None
+                if isinstance(memory, str) and memory in trained_memories:
+                    dropped += 1
+                    continue
+                memories_left = memories_left or isinstance(memory, str)
+                retained.append(line)
+        return retained, dropped, memories_left
+
+    # --- queries ---
+
+    def count(self) -> int:
+        """Total entries in the journal, from the manifest plus the head."""
+        with self.lock:
+            self.refresh()
+            return sum(segment["entries"] for segment in self._segments) + self._head["entries"]
+
+    def _parts(self) -> List[Tuple[Any, int, int, Optional[int]]]:
+        """
+        (source, entries, end offset, last wake end offset) for every segment and the head,
+        oldest first. Segments are immutable, so their source is a path; the head is opened
+        here, under the lock, so a concurrent seal cannot swap the file underneath a reader.
+        """
+        with self.lock:
+            self.refresh()
+            self._scan_head_wakes()
+            parts = [(self._segment_path(s), s["entries"], s["bytes"], s["last_wake_offset"]) for s in self._segments]
+            if self._head["entries"]:
+                parts.append((open(self.path, "rb"), self._head["entries"], self._head["bytes"], self._head["last_wake_offset"]))
+            return parts
+
+    @staticmethod
+    def _release(parts) -> None:
+        for source, _, _, _ in parts:
+            if not isinstance(source, str):
+                source.close()
+
+    @staticmethod
+    def _read_part(source: Any, start: int, end: int):
+        """Yield parsed entries between byte offsets start and end of a path or open file (malformed lines skipped)."""
+        try:
+            with (open(source, "rb") if isinstance(source, str) else source) as f:
+                f.seek(start)
+                offset = start
+                while offset < end:
+                    line = f.readline()
+                    if not line:
+                        break
+                    offset += len(line)
+                    if not line.strip():
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            return  # pruned while being read
+
+    def iter_entries(self, paths: Optional[List[str]] = None):
+        """Yield every entry, oldest first (or of the given segment paths)."""
+        parts = self._parts()
+        try:
+            for source, _, end, _ in parts:
+                if paths is None or (source if isinstance(source, str) else self.path) in paths:
+                    yield from self._read_part(source, 0, end)
+        finally:
+            self._release(parts)
+
+    def tail(self, n: int) -> List[Dict[str, Any]]:
+        """The last n entries, reading only the newest segments that hold them."""
+        parts = self._parts()
+        try:
+            entries: List[Dict[str, Any]] = []
+            for source, _, end, _ in reversed(parts):
+                if len(entries) >= n:
+                    break
+                entries[:0] = self._read_last(source, end, n - len(entries))
+            return entries
+        finally:
+            self._release(parts)
+
+    @staticmethod
+    def _read_last(source: Any, end: int, n: int, block_size: int = 1 << 16) -> List[Dict[str, Any]]:
+        """Parse the last n lines before byte offset end, reading the file backwards in blocks."""
+        try:
+            with (open(source, "rb") if isinstance(source, str) else source) as f:
+                data, start = b"", end
+                while start > 0 and data.count(b"\n") <= n:
+                    step = min(block_size, start)
+                    start -= step
+                    f.seek(start)
+                    data = f.read(step) + data
+        except FileNotFoundError:
+            return []
+        lines = data.split(b"\n")[:-1]  # data ends with the newline closing the last entry
+        if start > 0:
+            lines = lines[1:]  # the first piece may be a partial line
+        entries = []
+        for line in lines[-n:] if n else []:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+        return entries
+
+    def read_since_last_wake(self, max_events: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Entries after the most recent "wake" event (the last max_events of them). Walks back
+        from the head only until the segment holding that wake, or until enough entries.
+        """
+        parts = self._parts()
+        try:
+            selected, total = [], 0
+            for source, entries, end, wake_offset in reversed(parts):
+                if wake_offset is not None:
+                    selected.append((source, wake_offset, end))
+                    break
+                selected.append((source, 0, end))
+                total += entries
+                if max_events is not None and total >= max_events:
+                    # No wake within the window: it is simply the last max_events entries
+                    events: List[Dict[str, Any]] = []
+                    for source, _, end in selected:
+                        if len(events) >= max_events:
+                            break
+                        events[:0] = self._read_last(source, end, max_events - len(events))
+                    return events
+            events = deque(maxlen=max_events)
+            for source, start, end in reversed(selected):
+                events.extend(entry for entry in self._read_part(source, start, end) if entry.get("event_type") != "wake")
+            return list(events)
+        finally:
+            self._release(parts)
+
+    def close(self) -> None:
+        with self.lock:
+            self.refresh()
+            self._save_manifest()
+
+SCRIBE_DURABILITY_MODES = ("none", "flush", "fsync", "fsync_interval")
+
 class JsonlWriter:
     """
-    Handles writing structured data to a rotating JSONL file.
-    Manages file I/O, buffering, and rotation for the scribed output.
+    Handles writing structured data to the head of a segmented ScribeJournal.
+    Manages file I/O, buffering, and sealing full heads into journal segments.
+
+    Buffered lines are committed as a group: one writev() (or a single write()
+    where writev is unavailable) on an unbuffered O_APPEND descriptor, so nothing is
+    copied into an intermediate file buffer. scribed_config.durability controls what
+    a commit guarantees:
+      - "none": lines are handed to the OS only when the buffer fills, or on flush()/close()
+      - "flush": every write_many()/flush() hands its group to the OS (survives a process crash)
+      - "fsync": additionally fsyncs every group (survives power loss)
+      - "fsync_interval": like "flush", with at most one fsync per fsync_interval_ms
     """
-    
+
     def __init__(
         self,
         config_manager: ConfigManager,
         error_manager: ErrorManager,
-        logger: Logger
+        logger: Logger,
+        *,
+        file_path: Optional[str] = None
     ):
         """
         Initialize the JSONL writer.
@@ -575,6 +1069,7 @@ class JsonlWriter:
             config_manager: Configuration manager instance
             error_manager: Error manager instance for error handling
             logger: Logger instance for operational logging
+            file_path: Output path (keyword-only); defaults to scribed_config.log_path
         """
         self.config_manager = config_manager
         self.error_manager = error_manager
@@ -583,13 +1078,29 @@ class JsonlWriter:
         
         # Load configuration
         self._load_config()
+        if file_path:
+            self.scribe_file_path = file_path
         
         # Setup fallback logger
         self.fallback_logger = self._setup_fallback_logger()
         
         # Initialize file handling
-        self._buffer: List[str] = []
-        self._file_handle = None
+        self._buffer: List[bytes] = []  # encoded chunks of one or more lines
+        self._buffer_lines: List[int] = []  # line count of each chunk
+        self._pending_lines = 0
+        # Committed lines/bytes not yet folded into the journal head (see ScribeJournal._drain_writers)
+        self._journal_lines = 0
+        self._journal_bytes = 0
+        self._journal_since: Optional[float] = None
+        self._inode: Optional[int] = None
+        self._fd: Optional[int] = None
+        self._file_size = 0
+        self._last_fsync = time.monotonic()
+        self._unsynced = False
+        self._committed = 0
+        self._iov_max = self._get_iov_max()
+        self.journal: Optional[ScribeJournal] = None
+        self._journal_generation = 0
         self._setup_scribe_file()
 
     def _load_config(self) -> None:
@@ -613,6 +1124,20 @@ class JsonlWriter:
                 "scribed_config.buffer_size",
                 10
             ))
+
+            # Get durability policy
+            self.durability = str(self.config_manager.get(
+                "scribed_config.durability",
+                "flush"
+            )).lower()
+            if self.durability not in SCRIBE_DURABILITY_MODES:
+                raise ConfigurationError(
+                    f"scribed_config.durability must be one of {SCRIBE_DURABILITY_MODES}, got '{self.durability}'"
+                )
+            self.fsync_interval = max(0.0, float(self.config_manager.get(
+                "scribed_config.fsync_interval_ms",
+                1000
+            ))) / 1000.0
             
         except Exception as e:
             self.error_manager.handle_error(
@@ -625,6 +1150,14 @@ class JsonlWriter:
             )
             raise
 
+    @staticmethod
+    def _get_iov_max() -> int:
+        """Maximum number of buffers per writev() call."""
+        try:
+            return max(16, os.sysconf("SC_IOV_MAX"))
+        except (AttributeError, ValueError, OSError):
+            return 1024
+
     def _setup_fallback_logger(self) -> logging.Logger:
         """Sets up an independent logger for critical I/O errors."""
         logger = logging.getLogger('sovl.scribe.jsonl_writer')
@@ -651,7 +1184,9 @@ class JsonlWriter:
             if scribe_dir:  # Only create if there's a directory component
                 os.makedirs(scribe_dir, exist_ok=True)
             
+            self.journal = ScribeJournal.get_instance(self.scribe_file_path)
             self._open_file()
+            self.journal.attach(self)
         except OSError as e:
             self.fallback_logger.exception(
                 f"Failed to create directory or open scribe file: {self.scribe_file_path}"
@@ -667,12 +1202,15 @@ class JsonlWriter:
             raise
 
     def _open_file(self) -> None:
-        """Opens the scribe file in append mode."""
+        """Opens the scribe file as an unbuffered append-only descriptor."""
         try:
-            if self._file_handle and not self._file_handle.closed:
-                self._file_handle.close()
-            self._file_handle = open(self.scribe_file_path, 'a', encoding='utf-8')
-        except IOError as e:
+            self._close_fd()
+            flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+            self._fd = os.open(self.scribe_file_path, flags, 0o644)
+            stat = os.fstat(self._fd)
+            self._file_size, self._inode = stat.st_size, stat.st_ino
+            self._journal_generation = self.journal.generation
+        except OSError as e:
             self.fallback_logger.exception(
                 f"Failed to open scribe file: {self.scribe_file_path}"
             )
@@ -684,13 +1222,23 @@ class JsonlWriter:
                     "error_type": "file_open_error"
                 }
             )
-            self._file_handle = None
+            self._fd = None
             raise
 
+    def _close_fd(self) -> None:
+        if self._fd is not None:
+            fd, self._fd = self._fd, None
+            if self._unsynced and self.durability in ("fsync", "fsync_interval"):
+                self._fsync(fd)
+            os.close(fd)
+
     def write(self, json_string: str) -> bool:
         """
         Writes a JSON string to the scribe file.
 
+        The line is buffered and committed with the rest of its group once
+        buffer_size lines are pending; call flush() to commit earlier.
+
         Args:
             json_string: The JSON string to write
 
@@ -700,10 +1248,12 @@ class JsonlWriter:
         try:
             with self.lock:
                 # Add to buffer
-                self._buffer.append(json_string)
+                self._buffer.append((json_string + '\n').encode('utf-8'))
+                self._buffer_lines.append(1)
+                self._pending_lines += 1
 
                 # Flush if buffer is full
-                if len(self._buffer) >= self.buffer_size:
+                if self._pending_lines >= self.buffer_size:
                     self._flush_buffer()
 
             return True
@@ -722,26 +1272,97 @@ class JsonlWriter:
             )
             return False
 
-    def _flush_buffer(self) -> None:
-        """Writes all buffered entries to the file."""
+    def write_many(self, json_strings: List[str]) -> bool:
+        """
+        Writes a group of JSON strings as one commit.
+
+        Unless durability is "none" (which waits for buffer_size lines), the group and
+        anything already buffered are committed before returning.
+
+        Args:
+            json_strings: The JSON strings to write, one line each
+
+        Returns:
+            bool: True if writing was successful, False otherwise
+        """
+        if not json_strings:
+            return True
+        try:
+            # One encode for the whole group instead of one per line
+            chunk = ('\n'.join(json_strings) + '\n').encode('utf-8')
+            with self.lock:
+                self._buffer.append(chunk)
+                self._buffer_lines.append(len(json_strings))
+                self._pending_lines += len(json_strings)
+                if self.durability != "none" or self._pending_lines >= self.buffer_size:
+                    return self._flush_buffer()
+            return True
+        except Exception as write_error:
+            self.fallback_logger.exception(
+                f"Failed to write scribe group of {len(json_strings)} entries. Error: {write_error}"
+            )
+            self.error_manager.handle_error(
+                write_error,
+                error_type="io",
+                context={
+                    "file_path": self.scribe_file_path,
+                    "error_type": "write_error"
+                }
+            )
+            return False
+
+    def flush(self) -> bool:
+        """Commits all buffered entries, applying the durability policy; returns False on failure."""
+        with self.lock:
+            return self._flush_buffer(force_sync=self.durability == "fsync_interval")
+
+    def _flush_buffer(self, force_sync: bool = False) -> bool:
+        """Writes all buffered entries to the file as one group; caller holds self.lock."""
         if not self._buffer:
-            return
+            if force_sync and self._unsynced and self._fd is not None:
+                self._fsync(self._fd)
+            return True
 
-        if not self._file_handle or self._file_handle.closed:
+        if self._fd is None:
             self.fallback_logger.warning(
                 "Attempted to flush buffer, but file handle is not open."
             )
-            return
+            return False
 
         try:
-            for entry in self._buffer:
-                self._file_handle.write(entry + '\n')
-            self._file_handle.flush()
-            self._buffer = []
+            group, self._buffer = self._buffer, []
+            group_lines, self._buffer_lines = self._buffer_lines, []
+            lines, self._pending_lines = self._pending_lines, 0
+            # Under the journal lock, so a seal never lands between the check and the write
+            with self.journal.lock:
+                if self._journal_generation != self.journal.generation:
+                    self._open_file()  # the head was sealed by another user of the journal
+                try:
+                    written = self._write_group(group)
+                except Exception:
+                    # Keep the unwritten remainder for the next attempt
+                    self._buffer = group[self._committed:] + self._buffer
+                    self._buffer_lines = group_lines[self._committed:] + self._buffer_lines
+                    self._pending_lines += sum(group_lines[self._committed:])
+                    raise
+                # Tallied for the journal to collect on its next refresh
+                if not self._journal_lines:
+                    self._journal_since = time.time()
+                self._journal_lines += lines
+                self._journal_bytes += written
+            self._file_size += written
+            self._unsynced = True
+
+            if self.durability == "fsync":
+                self._fsync(self._fd)
+            elif self.durability == "fsync_interval":
+                if force_sync or time.monotonic() - self._last_fsync >= self.fsync_interval:
+                    self._fsync(self._fd)
 
             # Check file size for rotation
-            if self._file_handle.tell() > self.max_file_size_bytes:
+            if self._file_size > self.max_file_size_bytes:
                 self._rotate_scribe()
+            return True
 
         except Exception as e:
             self.fallback_logger.exception(
@@ -755,28 +1376,62 @@ class JsonlWriter:
                     "error_type": "flush_error"
                 }
             )
+            return False
+
+    def _write_group(self, group: List[bytes]) -> int:
+        """Writes the encoded chunks with as few syscalls as possible; returns bytes written."""
+        self._committed = 0
+        total = 0
+        if not hasattr(os, "writev"):
+            data = memoryview(b"".join(group))
+            while data:
+                n = os.write(self._fd, data)
+                data = data[n:]
+                total += n
+            self._committed = len(group)
+            return total
+        while self._committed < len(group):
+            chunk = group[self._committed:self._committed + self._iov_max]
+            n = os.writev(self._fd, chunk)
+            total += n
+            # Short write: skip whole chunks, then finish the partial one
+            for data in chunk:
+                if n < len(data):
+                    break
+                n -= len(data)
+                self._committed += 1
+            if n:
+                rest = memoryview(group[self._committed])[n:]
+                while rest:
+                    m = os.write(self._fd, rest)
+                    rest = rest[m:]
+                    total += m
+                self._committed += 1
+        return total
+
+    def _fsync(self, fd: int) -> None:
+        os.fsync(fd)
+        self._last_fsync = time.monotonic()
+        self._unsynced = False
 
     def _rotate_scribe(self) -> None:
-        """Rotates the scribe file when it reaches the size limit."""
-        if not self._file_handle:
+        """Seals the head into a journal segment when it reaches the size limit."""
+        if self._fd is None:
             return
 
         try:
             # Close current file
-            self._file_handle.close()
+            self._close_fd()
             
-            # Rename current file with timestamp
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            old_path = self._file_handle.name
-            new_path = f"{old_path}.{timestamp}"
-            os.rename(old_path, new_path)
+            # Seal it as the next immutable segment
+            self.journal.seal()
             
             # Reopen file
             self._open_file()
             
         except Exception as e:
             self.fallback_logger.exception(
-                f"Failed to rotate scribe file: {self._file_handle.name}"
+                f"Failed to rotate scribe file: {self.scribe_file_path}"
             )
             self.error_manager.handle_error(
                 e,
@@ -792,9 +1447,10 @@ class JsonlWriter:
         try:
             with self.lock:
                 self._flush_buffer()
-                if self._file_handle and not self._file_handle.closed:
-                    self._file_handle.close()
-                    self._file_handle = None
+                self._close_fd()
+                if self.journal is not None:
+                    self.journal.detach(self)
+                    self.journal.close()
         except Exception as e:
             self.fallback_logger.exception(
                 "Error closing scribe file"
@@ -833,37 +1489,40 @@ class StreamingJSONLoader:
 class ScribeJSONLBatchLoader:
     """
     Loads and batches scribe-formatted JSONL data for training.
+    file_path may be a single file or a list of files (e.g. journal segments), read in order.
     Each batch yields:
       - batch_texts: List[Dict[str, str]] with 'memory'
       - batch_weights: List[float] (from 'weight', or default 1.0)
     """
-    def __init__(self, file_path: str, batch_size: int = 32, default_weight: float = 1.0):
+    def __init__(self, file_path, batch_size: int = 32, default_weight: float = 1.0):
         self.file_path = file_path
+        self.file_paths = [file_path] if isinstance(file_path, str) else list(file_path)
         self.batch_size = batch_size
         self.default_weight = default_weight
 
     def __iter__(self):
         batch_texts = []
         batch_weights = []
-        with open(self.file_path, 'r', encoding='utf-8') as f:
-            for line_number, line in enumerate(f, 1):
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    entry = json.loads(line)
-                    memory = entry.get("memory")
-                    weight = float(entry.get("weight", self.default_weight))
-                    if not isinstance(memory, str):
-                        continue  # Skip invalid entries
-                    batch_texts.append({"memory": memory})
-                    batch_weights.append(weight)
-                    if len(batch_texts) == self.batch_size:
-                        yield batch_texts, batch_weights
-                        batch_texts = []
-                        batch_weights = []
-                except Exception:
-                    continue
+        for file_path in self.file_paths:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                        memory = entry.get("memory")
+                        weight = float(entry.get("weight", self.default_weight))
+                        if not isinstance(memory, str):
+                            continue  # Skip invalid entries
+                        batch_texts.append({"memory": memory})
+                        batch_weights.append(weight)
+                        if len(batch_texts) == self.batch_size:
+                            yield batch_texts, batch_weights
+                            batch_texts = []
+                            batch_weights = []
+                    except Exception:
+                        continue
         if batch_texts:
             yield batch_texts, batch_weights
 
@@ -889,31 +1548,26 @@ def backup_if_large(file_path, max_size_mb=MAX_BACKUP_SIZE_MB, backup_dir=BACKUP
         return backup_path
     return None
 
-def prune_scribe_journal(trained_memories: set, scribe_path: str, backup: bool = True):
+def prune_scribe_journal(trained_memories: set, scribe_path: str, backup: bool = True, max_backups: int = MAX_BACKUPS):
     """
-    Remove entries from the scribe journal whose 'memory' field is in trained_memories.
-    Optionally back up the original file before overwriting.
-    Handles malformed lines gracefully.
+    Remove entries whose 'memory' field is in trained_memories from the scribe journal at scribe_path.
+
+    Training seals the journal head and marks the segments it consumed as trained (see
+    ScribeJournal.seal_for_training/mark_trained); only those segments are read and
+    rewritten, so entries written after training started (newer segments and the head)
+    are kept even if their memory text matches. Non-training entries such as wake markers
+    are kept, as are malformed lines.
+
+    With backup set, each pruned segment is saved to BACKUP_DIR first. Unlike the old
+    size-triggered whole-file copy, every pruning is backed up; the newest max_backups
+    segment backups (scribed_config.max_backups) are kept and older ones are deleted
+    permanently, and max_backups <= 0 keeps them all. Returns the number of entries removed.
     """
-    if backup and os.path.exists(scribe_path):
-        backup_if_large(scribe_path)
-    # Read all entries
-    with open(scribe_path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-    # Filter out trained entries
-    pruned_lines = []
-    for line in lines:
-        if not line.strip():
-            continue
-        try:
-            entry = json.loads(line)
-            if entry.get("memory") not in trained_memories:
-                pruned_lines.append(line)
-        except Exception:
-            pruned_lines.append(line)  # Keep malformed lines
-    # Write back pruned file
-    with open(scribe_path, "w", encoding="utf-8") as f:
-        f.writelines(pruned_lines)
+    if not trained_memories:
+        return 0
+    return ScribeJournal.get_instance(scribe_path).prune(
+        trained_memories, backup=backup, backup_dir=BACKUP_DIR, max_backups=max_backups
+    )
 
 def count_jsonl_entries(file_path: str) -> int:
     """
@@ -1,6 +1,13 @@
+import atexit
+import bisect
+import fnmatch
 import json
 import os
 import gzip
+import random
+import re
+import struct
+import threading
 import uuid
 import time
 import logging
@@ -9,7 +16,8 @@ from threading import Lock, RLock
 from typing import List, Dict, Union, Optional, Callable, Any, Tuple, Literal
 from dataclasses import dataclass, field
 import traceback
-from collections import deque, defaultdict
+from array import array
+from collections import Counter, deque, defaultdict
 from sovl_config import ConfigManager
 from sovl_records import ErrorRecordBridge, IErrorHandler, ErrorRecord
 
@@ -24,6 +32,50 @@ def set_logging_enabled_from_config(config_manager: ConfigManager):
     except Exception:
         LOGGING_ENABLED = True
 
+OVERFLOW_POLICIES = ("drop_oldest", "drop_new", "block")
+
+_LEVEL_NUMBERS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+_LEVEL_NUMBERS.update({name.lower(): number for name, number in list(_LEVEL_NUMBERS.items())})
+
+class Deferred:
+    """
+    Wraps a zero-argument callable used as an additional_info value. It is only called
+    once the event has passed level filtering, sampling and rate limiting.
+    """
+    __slots__ = ("fn",)
+
+    def __init__(self, fn: Callable[[], Any]):
+        self.fn = fn
+
+def _truncate_payload(value: Any, max_chars: int, max_items: int, depth: int = 0) -> Any:
+    """Cap long strings and collections in a log entry so one event cannot produce a huge line."""
+    if isinstance(value, str):
+        if len(value) > max_chars:
+            return f"{value[:max_chars]}...[truncated {len(value) - max_chars} chars]"
+        return value
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    if depth >= 8:
+        return _truncate_payload(str(value), max_chars, max_items, depth)
+    if isinstance(value, dict):
+        items = list(value.items())
+        result = {k: _truncate_payload(v, max_chars, max_items, depth + 1) for k, v in items[:max_items]}
+        if len(items) > max_items:
+            result["_truncated_keys"] = len(items) - max_items
+        return result
+    if isinstance(value, (list, tuple, set, deque)):
+        items = list(value)
+        result = [_truncate_payload(v, max_chars, max_items, depth + 1) for v in items[:max_items]]
+        if len(items) > max_items:
+            result.append(f"...[truncated {len(items) - max_items} items]")
+        return result
+    # Tensors, arrays and other objects are logged by their (bounded) string form
+    return _truncate_payload(str(value), max_chars, max_items, depth)
+
+def _event_id() -> str:
+    """Random version-4 UUID string without the os.urandom call behind uuid.uuid4()."""
+    return str(uuid.UUID(int=random.getrandbits(128), version=4))
+
 @dataclass
 class LoggerConfig:
     """Configuration for Logger with validation."""
@@ -37,6 +89,21 @@ class LoggerConfig:
     memory_threshold_mb: int = 100  # Memory threshold to trigger aggressive pruning
     gpu_memory_threshold: float = 0.85  # GPU memory usage threshold (0-1)
     log_level: str = "INFO"  # Log level threshold (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+
+    # Asynchronous writer: events are queued in a bounded buffer and written in batches
+    async_enabled: bool = True  # False writes every event synchronously on the caller's thread
+    async_buffer_size: int = 10000  # Entries held in memory awaiting the writer
+    async_batch_size: int = 256  # Max entries per write; a fuller buffer wakes the writer early
+    async_flush_interval_ms: float = 200.0  # Max time an entry waits before being written
+    async_overflow_policy: str = "drop_oldest"  # Full buffer: drop_oldest, drop_new or block (backpressure)
+    async_block_timeout_ms: float = 100.0  # How long "block" waits for space before dropping the entry
+
+    # Volume control: per-event-type sampling and rate limits (keys may be fnmatch patterns,
+    # e.g. "long_term_memory_*"); error/critical events are never sampled or rate limited
+    event_sampling: Dict[str, float] = field(default_factory=dict)  # event_type -> fraction kept (0-1)
+    event_rate_limits: Dict[str, float] = field(default_factory=dict)  # event_type -> max events per second
+    max_field_chars: int = 4096  # Longer strings in an entry are truncated
+    max_list_items: int = 100  # Longer lists/dicts in an entry are truncated
     
     # Error handling configuration
     error_cooldown: float = 1.0  # Time in seconds before an error is no longer considered recent
@@ -59,9 +126,25 @@ class LoggerConfig:
         "memory_threshold_mb": (10, 1000),
         "gpu_memory_threshold": (0.1, 1.0),
         "error_cooldown": (0.1, 60.0),
-        "max_recent_errors": (10, 1000)
+        "max_recent_errors": (10, 1000),
+        "async_buffer_size": (100, 1000000),
+        "async_batch_size": (1, 100000),
+        "async_flush_interval_ms": (1.0, 60000.0),
+        "async_block_timeout_ms": (0.0, 60000.0),
+        "max_field_chars": (64, 10000000),
+        "max_list_items": (1, 1000000)
     }
 
+    @staticmethod
+    def _validate_event_table(key: str, value: Any) -> None:
+        if not isinstance(value, dict):
+            raise ValueError(f"{key} must be a dictionary of event_type -> number")
+        for event_type, number in value.items():
+            if not isinstance(number, (int, float)) or number < 0:
+                raise ValueError(f"{key}[{event_type}] must be a non-negative number, got {number}")
+            if key == "event_sampling" and number > 1:
+                raise ValueError(f"event_sampling[{event_type}] must be between 0 and 1, got {number}")
+
     def __post_init__(self):
         """Validate configuration parameters."""
         if not isinstance(self.log_file, str) or not self.log_file.endswith(".jsonl"):
@@ -76,6 +159,12 @@ class LoggerConfig:
         valid_levels = {"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"}
         if self.log_level.upper() not in valid_levels:
             raise ValueError(f"log_level must be one of {valid_levels}, got {self.log_level}")
+        if not isinstance(self.async_enabled, bool):
+            raise ValueError("async_enabled must be a boolean")
+        if self.async_overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"async_overflow_policy must be one of {OVERFLOW_POLICIES}, got {self.async_overflow_policy}")
+        self._validate_event_table("event_sampling", self.event_sampling)
+        self._validate_event_table("event_rate_limits", self.event_rate_limits)
         # Validate error handling config
         if not isinstance(self.error_handling_config, dict):
             raise ValueError("error_handling_config must be a dictionary")
@@ -89,9 +178,14 @@ class LoggerConfig:
             if key == "log_file":
                 if not isinstance(value, str) or not value.endswith(".jsonl"):
                     raise ValueError("log_file must be a .jsonl file path")
-            elif key == "compress_old":
+            elif key in ("compress_old", "async_enabled"):
                 if not isinstance(value, bool):
-                    raise ValueError("compress_old must be a boolean")
+                    raise ValueError(f"{key} must be a boolean")
+            elif key == "async_overflow_policy":
+                if value not in OVERFLOW_POLICIES:
+                    raise ValueError(f"async_overflow_policy must be one of {OVERFLOW_POLICIES}, got {value}")
+            elif key in ("event_sampling", "event_rate_limits"):
+                self._validate_event_table(key, value)
             elif key in self._RANGES:
                 min_val, max_val = self._RANGES[key]
                 if not (min_val <= value <= max_val):
@@ -161,6 +255,7 @@ class _FileHandler:
     def __init__(self, config: LoggerConfig, fallback_logger: logging.Logger):
         self.config = config
         self.fallback_logger = fallback_logger
+        self._validator = _LogValidator(fallback_logger)
 
     def safe_file_op(self, operation: Callable, *args, **kwargs):
         """Execute file operation with retry logic."""
@@ -243,7 +338,7 @@ class _FileHandler:
 
             rotated_files = [
                 os.path.join(log_dir, f) for f in os.listdir(log_dir)
-                if f.startswith(base_name) and f != base_name
+                if f.startswith(base_name) and f != base_name and not f.startswith(f"{base_name}.idx")
             ]
 
             rotated_files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
@@ -264,7 +359,7 @@ class _FileHandler:
 
         valid_entries = []
         for entry in entries:
-            if self.validate_entry(entry):
+            if self._validator.validate_entry(entry):
                 if "error" in entry or "warning" in entry:
                     entry["is_error_prompt"] = True
                 valid_entries.append(entry)
@@ -275,9 +370,8 @@ class _FileHandler:
             return
 
         try:
-            with self.safe_file_op(open, self.config.log_file, 'a') as f:
-                for entry in valid_entries:
-                    f.write(json.dumps(entry) + '\n')
+            with self.safe_file_op(open, self.config.log_file, 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(entry, default=str) + '\n' for entry in valid_entries))
         except Exception as e:
             self.fallback_logger.error(f"Error writing batch: {str(e)}")
 
@@ -294,6 +388,517 @@ class _FileHandler:
                     stack_trace=traceback.format_exc()
                 )
 
+@dataclass(frozen=True)
+class LogCheckpoint:
+    """Snapshot of LogIndex running counters; see LogIndex.count_since."""
+    total: int
+    by_level: Tuple[int, ...]
+    by_event_type: Dict[str, int]
+
+class LogIndex:
+    """
+    Offset index and running counters for the JSONL log file.
+
+    For every line of the current file it keeps the byte offset, timestamp, level and
+    event type in compact arrays, mirrored to a binary sidecar (<log_file>.idx, names in
+    <log_file>.idx.json) so a restart does not rescan the log. The async writer reports
+    what it writes; bytes appended by anyone else are picked up by refresh(), which only
+    reads past the last indexed offset. Rotation or truncation starts a fresh index while
+    the process-lifetime counters keep running, so checkpoints survive rotations.
+
+    Costs: tail reads O(k) seeks, counts and count_since O(1), error_rate O(k).
+    """
+
+    _RECORD = struct.Struct("<QdBI")  # offset, unix timestamp, level number, event type id
+    _LINE_RE = re.compile(rb'"timestamp": "([^"]*)".*?"event_type": "((?:[^"\\]|\\.)*)".*?"level": "(\w+)"')
+    _LEVELS = (10, 20, 30, 40, 50)
+
+    def __init__(self, log_file: str, fallback_logger: logging.Logger):
+        self.log_file = log_file
+        self.sidecar = f"{log_file}.idx"
+        self.meta_file = f"{log_file}.idx.json"
+        self.fallback_logger = fallback_logger
+        self.lock = RLock()
+        self._type_names: List[str] = []
+        self._type_ids: Dict[str, int] = {}
+        self._type_is_error = bytearray()
+        self._reset_arrays()
+        # Process-lifetime counters (carried across rotations)
+        self._total_lines = 0
+        self._level_counts = [0] * len(self._LEVELS)
+        self._type_counts: Counter = Counter()
+        self._sidecar_file = None
+        with self.lock:
+            self._load()
+            self.refresh()
+
+    def _reset_arrays(self) -> None:
+        self._offsets = array("Q")
+        self._timestamps = array("d")
+        self._levels = array("B")
+        self._types = array("I")
+        self._inode = None
+        self._indexed_bytes = 0
+        self._file_level_counts = [0] * len(self._LEVELS)
+        self._file_type_counts: Counter = Counter()
+
+    @classmethod
+    def _level_slot(cls, level: Any) -> int:
+        number = _LEVEL_NUMBERS.get(level, 20) if isinstance(level, str) else int(level)
+        return max(0, min(len(cls._LEVELS) - 1, number // 10 - 1))
+
+    def _type_id(self, event_type: str) -> int:
+        type_id = self._type_ids.get(event_type)
+        if type_id is None:
+            type_id = len(self._type_names)
+            self._type_names.append(event_type)
+            self._type_ids[event_type] = type_id
+            self._type_is_error.append(1 if "error" in event_type.lower() else 0)
+            self._save_meta()
+        return type_id
+
+    # --- persistence ---
+
+    def _save_meta(self) -> None:
+        try:
+            tmp = f"{self.meta_file}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"inode": self._inode, "event_types": self._type_names}, f)
+            os.replace(tmp, self.meta_file)
+        except OSError as e:
+            self.fallback_logger.error(f"Failed to save log index metadata: {str(e)}")
+
+    def _load(self) -> None:
+        """Adopt the sidecar if it describes the current log file, otherwise rebuild it."""
+        try:
+            with open(self.meta_file, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(self.sidecar, "rb") as f:
+                raw = f.read()
+            stat = os.stat(self.log_file)
+            if meta.get("inode") != stat.st_ino:
+                raise ValueError("sidecar belongs to a previous log file")
+            raw = raw[:len(raw) - len(raw) % self._RECORD.size]
+            self._type_names = list(meta.get("event_types", []))
+            self._type_ids = {name: i for i, name in enumerate(self._type_names)}
+            self._type_is_error = bytearray(1 if "error" in name.lower() else 0 for name in self._type_names)
+            records = list(self._RECORD.iter_unpack(raw))
+            if any(type_id >= len(self._type_names) for _, _, _, type_id in records):
+                raise ValueError("sidecar references unknown event types")
+            self._inode = stat.st_ino
+            for offset, ts, level, type_id in records:
+                self._append(offset, ts, level, type_id)
+            if records:
+                # Resume after the last indexed line
+                with open(self.log_file, "rb") as f:
+                    f.seek(records[-1][0])
+                    line = f.readline()
+                if not line.endswith(b"\n"):
+                    raise ValueError("last indexed line is incomplete")
+                self._indexed_bytes = records[-1][0] + len(line)
+            self._open_sidecar("ab")
+        except FileNotFoundError:
+            self._start_file()
+        except Exception as e:
+            self.fallback_logger.info(f"Rebuilding log index: {str(e)}")
+            self._start_file()
+
+    def _open_sidecar(self, mode: str) -> None:
+        if self._sidecar_file is not None:
+            self._sidecar_file.close()
+        self._sidecar_file = open(self.sidecar, mode)
+
+    def _start_file(self) -> None:
+        """Begin indexing a new (or unrecognised) log file from offset 0."""
+        self._reset_arrays()
+        try:
+            self._inode = os.stat(self.log_file).st_ino
+        except FileNotFoundError:
+            self._inode = None
+        try:
+            self._open_sidecar("wb")
+        except OSError as e:
+            self._sidecar_file = None
+            self.fallback_logger.error(f"Failed to open log index sidecar: {str(e)}")
+        self._save_meta()
+
+    def _append(self, offset: int, ts: float, level_number: int, type_id: int) -> None:
+        slot = self._level_slot(level_number)
+        self._offsets.append(offset)
+        self._timestamps.append(ts)
+        self._levels.append(self._LEVELS[slot])
+        self._types.append(type_id)
+        self._file_level_counts[slot] += 1
+        self._file_type_counts[type_id] += 1
+        self._total_lines += 1
+        self._level_counts[slot] += 1
+        self._type_counts[type_id] += 1
+
+    def _add_lines(self, records: List[Tuple[int, float, int, int]]) -> None:
+        for record in records:
+            self._append(*record)
+        if self._sidecar_file is not None and records:
+            try:
+                self._sidecar_file.write(b"".join(self._RECORD.pack(*record) for record in records))
+                self._sidecar_file.flush()
+            except OSError as e:
+                self.fallback_logger.error(f"Failed to write log index sidecar: {str(e)}")
+
+    # --- updates ---
+
+    def note_written(self, start_offset: int, lines: List[bytes], entries: List[Dict], inode: int) -> None:
+        """Index lines the writer just appended at start_offset; caller holds self.lock."""
+        if inode != self._inode or start_offset < self._indexed_bytes:
+            self.refresh()
+            if inode != self._inode or start_offset < self._indexed_bytes:
+                return  # written to a rotated-away file, or refresh() already read them
+        elif start_offset > self._indexed_bytes:
+            self._scan(self._indexed_bytes, start_offset)
+        records = []
+        offset = start_offset
+        for line, entry in zip(lines, entries):
+            records.append((offset, self._entry_time(entry.get("timestamp")), _LEVEL_NUMBERS.get(entry.get("level"), 20),
+                            self._type_id(str(entry.get("event_type", "unknown")))))
+            offset += len(line)
+        self._add_lines(records)
+        self._indexed_bytes = offset
+
+    def refresh(self) -> None:
+        """Catch up with the log file: index appended lines, or restart after rotation/truncation."""
+        with self.lock:
+            try:
+                stat = os.stat(self.log_file)
+            except FileNotFoundError:
+                if self._offsets or self._inode is not None:
+                    self._start_file()
+                return
+            if stat.st_ino != self._inode or stat.st_size < self._indexed_bytes:
+                self._start_file()
+            if stat.st_size > self._indexed_bytes:
+                self._scan(self._indexed_bytes, stat.st_size)
+
+    def _scan(self, start: int, end: int) -> None:
+        """Index complete lines in [start, end) of the log file."""
+        records = []
+        offset = start
+        with open(self.log_file, "rb") as f:
+            f.seek(start)
+            while offset < end:
+                line = f.readline(end - offset)
+                if not line.endswith(b"\n"):
+                    break  # partial line still being written
+                ts, event_type, level = self._parse_line(line)
+                records.append((offset, ts, level, self._type_id(event_type)))
+                offset += len(line)
+        self._add_lines(records)
+        self._indexed_bytes = offset
+
+    def _parse_line(self, line: bytes) -> Tuple[float, str, int]:
+        match = self._LINE_RE.search(line)
+        if match:
+            try:
+                event_type = json.loads(b'"' + match.group(2) + b'"')
+            except ValueError:
+                event_type = match.group(2).decode("utf-8", "replace")
+            return self._entry_time(match.group(1).decode("ascii", "replace")), event_type, _LEVEL_NUMBERS.get(match.group(3).decode("ascii"), 20)
+        try:
+            entry = json.loads(line)
+            return self._entry_time(entry.get("timestamp")), str(entry.get("event_type", "unknown")), _LEVEL_NUMBERS.get(entry.get("level"), 20)
+        except ValueError:
+            return 0.0, "unparseable", 20
+
+    @staticmethod
+    def _entry_time(value: Any) -> float:
+        if isinstance(value, (int, float)):
+            return float(value)
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except (TypeError, ValueError):
+            return 0.0
+
+    def close(self) -> None:
+        with self.lock:
+            if self._sidecar_file is not None:
+                self._sidecar_file.close()
+                self._sidecar_file = None
+
+    # --- queries ---
+
+    def counts(self) -> Dict[str, Any]:
+        """Line counts of the current log file, by level and by event type."""
+        with self.lock:
+            self.refresh()
+            return {
+                "total": len(self._offsets),
+                "by_level": {logging.getLevelName(number).lower(): count for number, count in zip(self._LEVELS, self._file_level_counts) if count},
+                "by_event_type": {self._type_names[type_id]: count for type_id, count in self._file_type_counts.items()}
+            }
+
+    def checkpoint(self) -> LogCheckpoint:
+        with self.lock:
+            self.refresh()
+            return LogCheckpoint(
+                total=self._total_lines,
+                by_level=tuple(self._level_counts),
+                by_event_type={self._type_names[type_id]: count for type_id, count in self._type_counts.items()}
+            )
+
+    def count_since(self, checkpoint: Optional[LogCheckpoint], level: Optional[str] = None, event_type: Optional[str] = None) -> int:
+        """Lines logged since checkpoint (None: since the index was opened), optionally of one level or event type."""
+        with self.lock:
+            self.refresh()
+            if event_type is not None:
+                type_id = self._type_ids.get(event_type)
+                now = self._type_counts.get(type_id, 0) if type_id is not None else 0
+                return now - (checkpoint.by_event_type.get(event_type, 0) if checkpoint else 0)
+            if level is not None:
+                slot = self._level_slot(level)
+                return self._level_counts[slot] - (checkpoint.by_level[slot] if checkpoint else 0)
+            return self._total_lines - (checkpoint.total if checkpoint else 0)
+
+    def _tail_start(self, last_n: Optional[int], since: Optional[float]) -> int:
+        count = len(self._offsets)
+        start = 0 if last_n is None else max(0, count - last_n)
+        if since is not None:
+            # Timestamps are appended in order, so the window start is a binary search
+            start = max(start, bisect.bisect_left(self._timestamps, since))
+        return start
+
+    def error_rate(self, last_n: Optional[int] = None, since: Optional[float] = None) -> float:
+        """
+        Fraction of the last last_n lines (and/or lines since the unix time `since`) that are
+        errors: level error/critical, or an event type containing "error".
+        """
+        with self.lock:
+            self.refresh()
+            start = self._tail_start(last_n, since)
+            window = len(self._offsets) - start
+            if window <= 0:
+                return 0.0
+            is_error = self._type_is_error
+            errors = sum(
+                1 for level, type_id in zip(self._levels[start:], self._types[start:])
+                if level >= 40 or is_error[type_id]
+            )
+            return errors / window
+
+    def read(self, limit: Optional[int] = None, event_type: Optional[str] = None, level: Optional[str] = None, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Parsed entries of the current log file, oldest first: the last `limit` matching lines
+        (all if None), optionally filtered by event type, minimum level and unix time.
+        Matching lines are located in the index and read with one seek each.
+        """
+        with self.lock:
+            self.refresh()
+            start = self._tail_start(None, since)
+            type_id = self._type_ids.get(event_type) if event_type is not None else None
+            if event_type is not None and type_id is None:
+                return []
+            min_level = _LEVEL_NUMBERS.get(level, 0) if level is not None else 0
+            if type_id is None and not min_level:
+                first = start if limit is None else max(start, len(self._offsets) - limit)
+                positions = range(first, len(self._offsets))
+            else:
+                positions = []
+                for i in range(len(self._offsets) - 1, start - 1, -1):
+                    if (type_id is None or self._types[i] == type_id) and self._levels[i] >= min_level:
+                        positions.append(i)
+                        if limit is not None and len(positions) >= limit:
+                            break
+                positions.reverse()
+            entries = []
+            if not positions:
+                return entries
+            with open(self.log_file, "rb") as f:
+                for i in positions:
+                    f.seek(self._offsets[i])
+                    try:
+                        entries.append(json.loads(f.readline()))
+                    except ValueError:
+                        continue
+            return entries
+
+class _AsyncLogWriter:
+    """
+    Background writer for log entries.
+
+    record_event only appends to a bounded deque; a daemon thread validates, serialises and
+    writes them in batches through a persistent append handle, one write() per batch. The
+    writer wakes every async_flush_interval_ms, or early when the buffer holds a batch or
+    an error-level entry arrives. When the buffer is full, async_overflow_policy decides:
+    drop_oldest (ring buffer), drop_new, or block the caller for up to
+    async_block_timeout_ms. Dropped entries are counted and reported in the log.
+    """
+
+    _URGENT_LEVELS = frozenset({"error", "critical"})
+
+    def __init__(self, config: LoggerConfig, file_handler: _FileHandler, validator: _LogValidator, fallback_logger: logging.Logger, index: Optional[LogIndex] = None):
+        self.config = config
+        self.index = index
+        self.file_handler = file_handler
+        self.validator = validator
+        self.fallback_logger = fallback_logger
+        self._buffer: deque = deque()
+        lock = Lock()
+        self._cond = threading.Condition(lock)  # wakes the writer
+        self._space = threading.Condition(lock)  # wakes blocked submitters and flush()
+        self._enqueued = 0
+        self._retired = 0  # entries written, skipped or evicted; flush() waits on this
+        self._written = 0
+        self._dropped = 0
+        self._reported_drops = 0
+        self._file = None
+        self._bytes_since_rotation_check = 0
+        self._release_file = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="SOVLLogWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, entry: Dict) -> bool:
+        """Queue an entry; returns False if it was dropped."""
+        with self._cond:
+            if self._closed:
+                return False
+            if len(self._buffer) >= self.config.async_buffer_size:
+                policy = self.config.async_overflow_policy
+                if policy == "block":
+                    deadline = time.monotonic() + self.config.async_block_timeout_ms / 1000.0
+                    while len(self._buffer) >= self.config.async_buffer_size and not self._closed:
+                        self._cond.notify()
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0 or not self._space.wait(remaining):
+                            break
+                if len(self._buffer) >= self.config.async_buffer_size:
+                    self._dropped += 1
+                    if policy != "drop_oldest":
+                        return False
+                    self._buffer.popleft()
+                    self._retired += 1
+            self._buffer.append(entry)
+            self._enqueued += 1
+            if len(self._buffer) >= self.config.async_batch_size or entry.get("level") in self._URGENT_LEVELS:
+                self._cond.notify()
+            return True
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Wait until everything queued so far has been written; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            target = self._enqueued
+            while self._retired < target and self._thread.is_alive():
+                self._cond.notify()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._space.wait(0.05 if remaining is None else min(remaining, 0.05))
+            return self._retired >= target
+
+    def release_file(self) -> None:
+        """Flush and close the append handle (before rotation/compression); it reopens on the next batch."""
+        self.flush()
+        with self._cond:
+            self._release_file = True
+            self._cond.notify()
+        self.flush()
+
+    def close(self, timeout: float = 5.0) -> None:
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            self._space.notify_all()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"queued": len(self._buffer), "written": self._written, "dropped": self._dropped}
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._buffer and not self._closed and not self._release_file:
+                    self._cond.wait(self.config.async_flush_interval_ms / 1000.0)
+                batch = [self._buffer.popleft() for _ in range(min(len(self._buffer), self.config.async_batch_size))]
+                dropped = self._dropped - self._reported_drops
+                self._reported_drops = self._dropped
+                release, self._release_file = self._release_file, False
+                closing = self._closed and not self._buffer
+            if dropped:
+                batch.append({
+                    'timestamp': datetime.now().isoformat(),
+                    'conversation_id': _event_id(),
+                    'event_type': 'log_entries_dropped',
+                    'message': f"{dropped} log entries dropped (buffer full, policy {self.config.async_overflow_policy})",
+                    'level': 'warning',
+                    'dropped': dropped
+                })
+            if release:
+                # Close before writing, so entries queued after the request go to the new file
+                self._close_file()
+            written = self._write(batch) if batch else 0
+            with self._cond:
+                self._retired += len(batch) - (1 if dropped else 0)
+                self._written += written - (1 if dropped and written else 0)
+                self._space.notify_all()
+            if closing:
+                self._close_file()
+            if closing:
+                return
+
+    def _write(self, batch: List[Dict]) -> int:
+        """Write a batch with a single write() call; returns the number of lines written."""
+        lines = []
+        written_entries = []
+        for entry in batch:
+            try:
+                if not self.validator.validate_entry(entry):
+                    self.fallback_logger.warning(f"Invalid log entry skipped: {entry.get('event_type')}")
+                    continue
+                # Entries arrive already truncated, i.e. snapshotted, by Logger._emit
+                if "error" in entry or "warning" in entry:
+                    entry["is_error_prompt"] = True
+                lines.append((json.dumps(entry, default=str) + '\n').encode('utf-8'))
+                written_entries.append(entry)
+            except Exception as e:
+                self.fallback_logger.error(f"Failed to serialise log entry: {str(e)}")
+        if not lines:
+            return 0
+        data = b''.join(lines)
+        try:
+            if self._file is None:
+                self._file = self.file_handler.safe_file_op(open, self.config.log_file, 'ab')
+            if self.index is None:
+                self._file.write(data)
+                self._file.flush()
+            else:
+                # Under the index lock, so readers never see lines the index has not caught up with
+                with self.index.lock:
+                    self._file.write(data)
+                    self._file.flush()
+                    # O_APPEND only moves the position on write, so derive the start from the new end
+                    start = self._file.tell() - len(data)
+                    self.index.note_written(start, lines, written_entries, os.fstat(self._file.fileno()).st_ino)
+            self._bytes_since_rotation_check += len(data)
+            if self.config.max_size_mb > 0 and self._bytes_since_rotation_check >= 1024 * 1024:
+                self._bytes_since_rotation_check = 0
+                if os.fstat(self._file.fileno()).st_size >= self.config.max_size_mb * 1024 * 1024:
+                    self._close_file()
+                    self.file_handler.rotate_if_needed()
+            return len(lines)
+        except Exception as e:
+            self.fallback_logger.error(f"Error writing log batch: {str(e)}")
+            self._close_file()
+            return 0
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception as e:
+                self.fallback_logger.error(f"Failed to close log file: {str(e)}")
+            self._file = None
+
 class ILoggerClient:
     """Interface for logger clients to ensure consistent interaction."""
     def log_event(self, event_type: str, message: str, level: str = "info", **kwargs) -> None:
@@ -314,7 +919,7 @@ class Logger(IErrorHandler):
         "CRITICAL": 50
     }
     
-    def __new__(cls):
+    def __new__(cls, *args, **kwargs):
         with cls._lock:
             if cls._instance is None:
                 cls._instance = super().__new__(cls)
@@ -330,6 +935,18 @@ class Logger(IErrorHandler):
             
             # Initialize configuration
             self.config = LoggerConfig()
+            if config_manager is not None and hasattr(config_manager, "get"):
+                async_settings = {}
+                for key in ("async_enabled", "async_buffer_size", "async_batch_size", "async_flush_interval_ms",
+                            "async_overflow_policy", "async_block_timeout_ms", "log_level", "event_sampling",
+                            "event_rate_limits", "max_field_chars", "max_list_items"):
+                    value = config_manager.get(f"logging_config.{key}", None)
+                    if value is not None:
+                        async_settings[key] = value
+                try:
+                    self.config.update(**async_settings)
+                except ValueError as e:
+                    print(f"Invalid async logging config, using defaults: {e}")
             
             # Ensure log directory exists
             log_dir = os.path.dirname(self.config.log_file)
@@ -339,6 +956,10 @@ class Logger(IErrorHandler):
                 except Exception as e:
                     print(f"Failed to create log directory '{log_dir}': {e}")
             
+            # Numeric level threshold and sampling/rate-limit rules, so filtered events cost a comparison
+            self._filter_lock = Lock()
+            self._configure_filters()
+            
             # Initialize fallback logger for internal errors
             self._fallback_logger = logging.getLogger('sovl_internal')
             if not self._fallback_logger.handlers:
@@ -358,6 +979,12 @@ class Logger(IErrorHandler):
                     pass  # This will create the file if it doesn't exist
             except Exception as e:
                 self._fallback_logger.error(f"Failed to create log file on init: {str(e)}")
+
+            self._log_index = self._open_log_index()
+            self._writer = None
+            if self.config.async_enabled:
+                self._writer = _AsyncLogWriter(self.config, self._file_handler, self._validator, self._fallback_logger, self._log_index)
+                atexit.register(self.flush)
             
             # Register with ErrorRecordBridge
             ErrorRecordBridge().register_handler(self)
@@ -374,58 +1001,144 @@ class Logger(IErrorHandler):
             return cls._instance
     
     def should_log(self, entry_level: str) -> bool:
-        config_level = self.config.log_level
-        entry_level_num = self.LOG_LEVELS.get(entry_level.upper(), 20)
-        config_level_num = self.LOG_LEVELS.get(config_level.upper(), 20)
-        return entry_level_num >= config_level_num
+        return _LEVEL_NUMBERS.get(entry_level, 20) >= self._level_threshold
+
+    def _configure_filters(self) -> None:
+        """Cache the level threshold and reset sampling/rate-limit state after a config change."""
+        self._level_threshold = self.LOG_LEVELS.get(self.config.log_level.upper(), 20)
+        with self._filter_lock:
+            self._sampling = dict(self.config.event_sampling)
+            self._rate_limits = dict(self.config.event_rate_limits)
+            self._filters_active = bool(self._sampling or self._rate_limits)
+            self._event_rules: Dict[str, Optional[Tuple[Optional[float], Optional[float]]]] = {}
+            self._rate_state: Dict[str, List[float]] = {}  # event_type -> [tokens, last refill, suppressed]
+
+    @staticmethod
+    def _lookup_rule(table: Dict[str, float], event_type: str) -> Optional[float]:
+        if event_type in table:
+            return table[event_type]
+        for pattern, value in table.items():
+            if fnmatch.fnmatchcase(event_type, pattern):
+                return value
+        return None
+
+    def _admit(self, event_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Apply sampling and rate limits to a non-error event. Returns None to drop it,
+        otherwise fields to add to the entry (sample rate, events suppressed since the last one).
+        """
+        rule = self._event_rules.get(event_type, False)
+        if rule is False:
+            sample = self._lookup_rule(self._sampling, event_type)
+            rate = self._lookup_rule(self._rate_limits, event_type)
+            rule = None if sample is None and rate is None else (sample, rate)
+            self._event_rules[event_type] = rule
+        if rule is None:
+            return {}
+        sample, rate = rule
+        extra = {}
+        if sample is not None:
+            if sample <= 0 or random.random() >= sample:
+                return None
+            if sample < 1:
+                extra["sample_rate"] = sample
+        if rate is not None:
+            now = time.monotonic()
+            with self._filter_lock:
+                state = self._rate_state.setdefault(event_type, [max(rate, 1.0), now, 0])
+                # Token bucket: refills at `rate` per second, bursts up to max(rate, 1)
+                state[0] = min(max(rate, 1.0), state[0] + (now - state[1]) * rate)
+                state[1] = now
+                if state[0] < 1.0:
+                    state[2] += 1
+                    return None
+                state[0] -= 1.0
+                if state[2]:
+                    extra["suppressed"] = int(state[2])
+                    state[2] = 0
+        return extra
+
+    def is_enabled_for(self, level: str) -> bool:
+        """Cheap guard for callers that would otherwise build an expensive payload."""
+        return LOGGING_ENABLED and _LEVEL_NUMBERS.get(level, 20) >= self._level_threshold
     
-    def record_event(self, event_type: str, message: str, level: str = "info", additional_info: Dict[str, Any] = None) -> None:
-        """Record a general system event."""
-        if not LOGGING_ENABLED or not self.should_log(level):
+    def _emit(self, entry: Dict[str, Any]) -> None:
+        """Queue an entry for the background writer, or write it now when async logging is off.
+
+        Queued entries are truncated here, on the caller's thread, so nested containers are
+        copied before the caller can mutate them and the writer never reads live objects.
+        """
+        writer = self._writer
+        if writer is not None:
+            writer.submit(_truncate_payload(entry, self.config.max_field_chars, self.config.max_list_items))
             return
         with self._lock:
-            try:
-                log_entry = {
-                    'timestamp': datetime.now().isoformat(),
-                    'conversation_id': str(uuid.uuid4()),
-                    'event_type': event_type,
-                    'message': message,
-                    'level': level,
-                    **(additional_info or {})
-                }
-                if self._validator.validate_entry(log_entry):
-                    self._file_handler.write_batch([log_entry])
-                else:
-                    self._fallback_logger.warning(f"Invalid log entry skipped: {log_entry}")
-            except Exception as e:
-                self._fallback_logger.error(f"Failed to record event: {str(e)}")
-                self._fallback_logger.error(traceback.format_exc())
+            if self._validator.validate_entry(entry):
+                entry = _truncate_payload(entry, self.config.max_field_chars, self.config.max_list_items)
+                self._file_handler.write_batch([entry])
+            else:
+                self._fallback_logger.warning(f"Invalid log entry skipped: {entry}")
+
+    def record_event(self, event_type: str, message: Union[str, Callable[[], str]], level: str = "info", additional_info: Union[Dict[str, Any], Callable[[], Dict[str, Any]], None] = None) -> None:
+        """
+        Record a general system event.
+
+        message and additional_info may be zero-argument callables, and additional_info
+        values may be Deferred; they are only evaluated if the event passes the level
+        check, sampling and rate limiting (logging_config.event_sampling/event_rate_limits).
+        """
+        level_number = _LEVEL_NUMBERS.get(level, 20)
+        if level_number < self._level_threshold or not LOGGING_ENABLED:
+            return
+        try:
+            extra = None
+            if self._filters_active and level_number < 40:
+                extra = self._admit(event_type)
+                if extra is None:
+                    return
+            if callable(message):
+                message = message()
+            if callable(additional_info):
+                additional_info = additional_info()
+            log_entry = {
+                'timestamp': datetime.now().isoformat(),
+                'conversation_id': _event_id(),
+                'event_type': event_type,
+                'message': message,
+                'level': level,
+                **(additional_info or {})
+            }
+            if additional_info:
+                for key, value in additional_info.items():
+                    if isinstance(value, Deferred):
+                        log_entry[key] = value.fn()
+            if extra:
+                log_entry.update(extra)
+            self._emit(log_entry)
+        except Exception as e:
+            self._fallback_logger.error(f"Failed to record event: {str(e)}")
+            self._fallback_logger.error(traceback.format_exc())
     
     def handle_error(self, record: ErrorRecord) -> None:
         """Handle error records from the ErrorRecordBridge."""
         if not LOGGING_ENABLED or not self.should_log("ERROR"):
             return
-        with self._lock:
-            try:
-                # Construct error log entry
-                error_entry = {
-                    'timestamp': datetime.now().isoformat(),
-                    'conversation_id': str(uuid.uuid4()),
-                    'event_type': 'error',
-                    'message': record.error_message,
-                    'level': 'error',
-                    'error_type': record.error_type,
-                    'stack_trace': record.stack_trace,
-                    **(record.additional_info or {})
-                }
-                # Write error to log file
-                if self._validator.validate_entry(error_entry):
-                    self._file_handler.write_batch([error_entry])
-                else:
-                    self._fallback_logger.warning(f"Invalid error entry skipped: {error_entry}")
-            except Exception as e:
-                self._fallback_logger.error(f"Failed to handle error: {str(e)}")
-                self._fallback_logger.error(traceback.format_exc())
+        try:
+            # Construct error log entry
+            error_entry = {
+                'timestamp': datetime.now().isoformat(),
+                'conversation_id': _event_id(),
+                'event_type': 'error',
+                'message': record.error_message,
+                'level': 'error',
+                'error_type': record.error_type,
+                'stack_trace': record.stack_trace,
+                **(record.additional_info or {})
+            }
+            self._emit(error_entry)
+        except Exception as e:
+            self._fallback_logger.error(f"Failed to handle error: {str(e)}")
+            self._fallback_logger.error(traceback.format_exc())
     
     def log_error(self, error_msg: str, error_type: str = None, stack_trace: str = None, additional_info: Dict[str, Any] = None) -> None:
         """Log an error with detailed information."""
@@ -450,12 +1163,61 @@ class Logger(IErrorHandler):
                 "recent_errors": [record.__dict__ for record in ErrorRecordBridge().get_recent_errors()]
             }
     
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Block until queued entries are on disk; returns False if the writer did not catch up in time."""
+        writer = self._writer
+        return writer.flush(timeout) if writer is not None else True
+
+    def _open_log_index(self) -> Optional[LogIndex]:
+        try:
+            return LogIndex(self.config.log_file, self._fallback_logger)
+        except Exception as e:
+            self._fallback_logger.error(f"Failed to open log index, log queries will be unavailable: {str(e)}")
+            return None
+
+    def _require_index(self) -> LogIndex:
+        if self._log_index is None:
+            raise RuntimeError("Log index is unavailable")
+        return self._log_index
+
+    def read(self, limit: Optional[int] = None, event_type: Optional[str] = None, level: Optional[str] = None, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Entries of the current log file, oldest first; see LogIndex.read. Queued entries are written first."""
+        self.flush()
+        return self._require_index().read(limit=limit, event_type=event_type, level=level, since=since)
+
+    def checkpoint(self) -> LogCheckpoint:
+        """Mark the current position; pass the result to count_since."""
+        self.flush()
+        return self._require_index().checkpoint()
+
+    def count_since(self, checkpoint: Optional[LogCheckpoint], level: Optional[str] = None, event_type: Optional[str] = None) -> int:
+        """Events logged since checkpoint, optionally of one level or event type, in O(1)."""
+        self.flush()
+        return self._require_index().count_since(checkpoint, level=level, event_type=event_type)
+
+    def error_rate(self, last_n: Optional[int] = None, since: Optional[float] = None) -> float:
+        """Share of error events among the last last_n events and/or those since the unix time `since`."""
+        self.flush()
+        return self._require_index().error_rate(last_n=last_n, since=since)
+
+    def get_log_counts(self) -> Dict[str, Any]:
+        """Event counts of the current log file by level and event type."""
+        self.flush()
+        return self._require_index().counts()
+
+    def get_writer_stats(self) -> Dict[str, int]:
+        """Queued, written and dropped entry counts of the async writer."""
+        writer = self._writer
+        return writer.stats() if writer is not None else {"queued": 0, "written": 0, "dropped": 0}
+
     def cleanup(self) -> None:
         """Clean up logging resources."""
         if not LOGGING_ENABLED:
             return
         with self._lock:
             try:
+                if self._writer is not None:
+                    self._writer.release_file()
                 self._file_handler.manage_rotation()
                 self._file_handler.compress_logs()
             except Exception as e:
@@ -469,8 +1231,19 @@ class Logger(IErrorHandler):
         with self._lock:
             try:
                 self.config.update(**kwargs)
+                self._configure_filters()
                 # Reinitialize file handler with new config
                 self._file_handler = _FileHandler(self.config, self._fallback_logger)
+                writer = self._writer
+                if writer is not None:
+                    writer.close()
+                    self._writer = None
+                if self._log_index is None or self._log_index.log_file != self.config.log_file:
+                    if self._log_index is not None:
+                        self._log_index.close()
+                    self._log_index = self._open_log_index()
+                if self.config.async_enabled:
+                    self._writer = _AsyncLogWriter(self.config, self._file_handler, self._validator, self._fallback_logger, self._log_index)
             except Exception as e:
                 self._fallback_logger.error(f"Failed to update logger config: {str(e)}")
                 self._fallback_logger.error(traceback.format_exc())
\ No newline at end of file
@@ -177,14 +177,21 @@ class TirednessManager:
         self._gestation_event_log = []
         self._monitor_thread = None
         self._stop_event = threading.Event()
+        self._log_checkpoint = self._take_log_checkpoint()
+
+    def _take_log_checkpoint(self):
+        try:
+            return self.logger.checkpoint()
+        except Exception:
+            return None
 
     def _compute_tiredness(self):
         """Compute system tiredness based on log size, confidence, exposure, and time since last sleep."""
         try:
-            log_entries = self.logger.read()
+            # Events logged since the last gestation, from the logger's running counters
+            new_entries = self.logger.count_since(self._log_checkpoint)
         except Exception:
-            log_entries = []
-        new_entries = len(log_entries)
+            new_entries = 0
         log_factor = min(1.0, new_entries / getattr(self, 'sleep_log_min', 10))
         conf_hist = getattr(self, 'confidence_history', [])
         conf = 1.0 - (sum(conf_hist) / len(conf_hist) if conf_hist else 0.5)
@@ -285,6 +292,7 @@ class TirednessManager:
 
     def on_gestation_complete(self):
         self.last_gestation_time = time.time()
+        self._log_checkpoint = self._take_log_checkpoint()
         self.current_tiredness_threshold = self.tiredness_threshold
         self._pending_gestation_start = None
         self._gestating_start = None
@@ -694,7 +702,10 @@ class SOVLSystem(SystemInterface):
             epochs = getattr(self, 'train_epochs', 1)
             trained_memories = self.trainer.train_on_scribe_journal(scribe_path, batch_size=batch_size, epochs=epochs)
         if trained_memories:
-            prune_scribe_journal(trained_memories, getattr(self, 'scribe_path', 'scribe/sovl_scribe.jsonl'), backup=True)
+            max_backups = 5
+            if hasattr(self, 'config_handler'):
+                max_backups = self.config_handler.get('scribed_config.max_backups', 5)
+            prune_scribe_journal(trained_memories, getattr(self, 'scribe_path', 'scribe/sovl_scribe.jsonl'), backup=True, max_backups=max_backups)
         # --- End: Training and Pruning ---
         # Check config if we should dream after gestation
         dream_after_gestation = getattr(self, 'dream_after_gestation', True)
@@ -11,7 +11,7 @@ from sovl_state import StateManager, UserProfileState
 from sovl_error import ErrorManager
 from sovl_queue import check_scribe_queue_health
 from sovl_bonder import BondCalculator, BondModulator  # Add import
-from sovl_io import count_jsonl_entries
+from sovl_io import ScribeJournal
 import time
 import traceback
 import curses
@@ -287,9 +287,9 @@ class SystemMonitor:
             return f"Meditating {dots:<3}"
 
     def get_scribe_journal_entry_count(self):
-        """Return the number of entries in the scribe journal JSONL file."""
+        """Return the number of entries in the scribe journal (from its segment manifest)."""
         path = self._config_manager.get('scribed_config.output_path', 'scribe/sovl_scribe.jsonl')
-        return count_jsonl_entries(path)
+        return ScribeJournal.get_instance(path).count()
 
 class MemoryMonitor:
     """Monitors system memory usage."""
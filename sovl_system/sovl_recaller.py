@@ -1,7 +1,14 @@
 import torch
+import bisect
+import functools
+import itertools
 import json
+import math
 import os
-from collections import deque
+import queue
+import re
+from collections import OrderedDict, deque
+from concurrent.futures import Future
 from threading import Lock
 import time
 import numpy as np
@@ -48,9 +55,14 @@ class ShortTermMemory:
                     logger.log_error(f"ShortTermMemory failed to get config values: {e}", error_type="ShortTermMemoryError")
         self.max_short_term = max_short_term
         self.expiry_seconds = expiry_seconds
-        self.memory = []  # List of dicts, each with unified message structure
-        self._read_lock = threading.Lock()
-        self._write_lock = threading.Lock()
+        # Messages in insertion order, which is also _timestamp_unix order, so count and
+        # expiry pruning both pop from the left in O(1) per message
+        self.memory = deque()
+        self._views: Dict[frozenset, deque] = {}  # exclude_fields -> per-message projections, parallel to memory
+        self._last_prune_ts = float("-inf")
+        # Reads may expire messages, so reads and writes share one lock
+        self._write_lock = threading.RLock()
+        self._read_lock = self._write_lock
         self.logger = logger or Logger.get_instance()
         self.logging_level = logging_level
         self.default_origin = default_origin
@@ -125,100 +137,101 @@ class ShortTermMemory:
             del msg["timestamp"]
         # Always set timestamp_unix and _timestamp_unix
         now = time.time()
-        msg["timestamp_unix"] = msg.get("timestamp_unix", now)
-        msg["_timestamp_unix"] = msg["timestamp_unix"]
-        # Automatic message_index assignment if not present
-        if "message_index" not in msg or msg["message_index"] is None:
-            msg["message_index"] = self._message_index_counter
-            self._message_index_counter += 1
-        else:
-            self._message_index_counter = max(self._message_index_counter, msg["message_index"] + 1)
-        start_wait = time.perf_counter()
+        if not isinstance(msg.get("timestamp_unix"), (int, float)):
+            msg["timestamp_unix"] = now
         with self._write_lock:
-            wait_time = time.perf_counter() - start_wait
-            self.logger.record_event(
-                event_type="short_term_memory_write_lock_acquired",
-                message=f"Write lock acquired in {wait_time:.6f} seconds.",
-                level="debug"
-            )
-            start_hold = time.perf_counter()
+            # Automatic message_index assignment if not present
+            if "message_index" not in msg or msg["message_index"] is None:
+                msg["message_index"] = self._message_index_counter
+                self._message_index_counter += 1
+            else:
+                self._message_index_counter = max(self._message_index_counter, msg["message_index"] + 1)
             msg_with_time = dict(msg)
+            # Pruning keys never decrease, so expiry only ever removes from the left end;
+            # a back-dated message expires together with the newer message before it
+            msg_with_time["_timestamp_unix"] = max(msg["timestamp_unix"], self._last_prune_ts)
+            self._last_prune_ts = msg_with_time["_timestamp_unix"]
             self.memory.append(msg_with_time)
-            # Prune by count
-            if len(self.memory) > self.max_short_term:
-                removed = self.memory.pop(0)
-                self.logger.record_event(
-                    event_type="short_term_memory_prune",
-                    message="ShortTermMemory pruned oldest message due to max size.",
-                    level=self.logging_level,
-                    additional_info={"removed": removed}
-                )
-            # Prune by expiry
-            if self.expiry_seconds is not None:
-                now = time.time()
-                before = len(self.memory)
-                self.memory = [m for m in self.memory if now - m["_timestamp_unix"] <= self.expiry_seconds]
-                after = len(self.memory)
-                if before != after:
-                    self.logger.record_event(
-                        event_type="short_term_memory_expiry_prune",
-                        message=f"ShortTermMemory pruned {before - after} expired messages.",
-                        level=self.logging_level
-                    )
-            hold_time = time.perf_counter() - start_hold
+            for exclude, view in self._views.items():
+                view.append(self._project(msg_with_time, exclude))
+            pruned = 0
+            if self.max_short_term is not None:
+                while len(self.memory) > self.max_short_term:
+                    self._popleft()
+                    pruned += 1
+            expired = self._expire(now)
+            size = len(self.memory)
+        if pruned:
             self.logger.record_event(
-                event_type="short_term_memory_write_lock_held",
-                message=f"Write lock held for {hold_time:.6f} seconds.",
-                level="debug"
+                event_type="short_term_memory_prune",
+                message="ShortTermMemory pruned oldest message due to max size.",
+                level=self.logging_level,
+                additional_info={"removed_count": pruned}
+            )
+        if expired:
+            self.logger.record_event(
+                event_type="short_term_memory_expiry_prune",
+                message=f"ShortTermMemory pruned {expired} expired messages.",
+                level=self.logging_level
             )
-        # Logging outside lock
         self.logger.record_event(
             event_type="short_term_memory_add",
             message="Message added to ShortTermMemory.",
             level=self.logging_level,
-            additional_info={"msg": msg}
+            additional_info={"role": msg["role"], "message_index": msg["message_index"], "size": size}
         )
-        if "vibe_profile" not in msg:
-            self.logger.record_event(
-                event_type="short_term_memory_missing_vibe",
-                message="Message added without vibe_profile.",
-                level="debug"
-            )
 
-    def get(self, exclude_fields: Optional[list] = None) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _project(msg: Dict[str, Any], exclude: frozenset) -> Dict[str, Any]:
+        return {k: v for k, v in msg.items() if k not in exclude}
+
+    def _popleft(self):
+        # Caller holds _write_lock
+        self.memory.popleft()
+        for view in self._views.values():
+            view.popleft()
+
+    def _expire(self, now: float) -> int:
+        """Drop expired messages from the old end; O(number expired). Caller holds _write_lock."""
+        if self.expiry_seconds is None:
+            return 0
+        expired = 0
+        while self.memory and now - self.memory[0]["_timestamp_unix"] > self.expiry_seconds:
+            self._popleft()
+            expired += 1
+        return expired
+
+    def get(self, exclude_fields: Optional[list] = None, last_n: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Return messages, excluding internal fields by default (['_timestamp_unix', 'embedding']).
+        With last_n, only the most recent last_n messages are returned.
+
+        The returned dicts are shared with later calls and must be treated as read-only:
+        each exclude_fields set keeps a projection per message, built once when the message
+        is added, so retrieval costs one list copy rather than a copy of every message.
         """
-        if exclude_fields is None:
-            exclude_fields = ["_timestamp_unix", "embedding"]
-        with self._read_lock:
-            now = time.time()
-            if self.expiry_seconds is not None:
-                filtered = [m for m in self.memory if now - m["_timestamp_unix"] <= self.expiry_seconds]
-            else:
-                filtered = list(self.memory)
-            result = [
-                {k: v for k, v in m.items() if k not in exclude_fields}
-                for m in filtered
-            ]
-        self.logger.record_event(
-            event_type="short_term_memory_get",
-            message="ShortTermMemory context retrieved.",
-            level=self.logging_level,
-            additional_info={"size": len(result)}
-        )
-        return result
+        exclude = frozenset(["_timestamp_unix", "embedding"] if exclude_fields is None else exclude_fields)
+        with self._write_lock:
+            self._expire(time.time())
+            view = self._views.get(exclude)
+            if view is None:
+                view = deque(self._project(m, exclude) for m in self.memory)
+                self._views[exclude] = view
+            if last_n is None or last_n >= len(view):
+                return list(view)
+            if last_n <= 0:
+                return []
+            return list(itertools.islice(view, len(view) - last_n, None))
+
+    def latest(self, exclude_fields: Optional[list] = None) -> Optional[Dict[str, Any]]:
+        """Return the most recent unexpired message, or None."""
+        recent = self.get(exclude_fields, last_n=1)
+        return recent[0] if recent else None
 
     def clear(self):
-        start_wait = time.perf_counter()
         with self._write_lock:
-            wait_time = time.perf_counter() - start_wait
-            self.logger.record_event(
-                event_type="short_term_memory_write_lock_acquired",
-                message=f"Write lock acquired in {wait_time:.6f} seconds.",
-                level="debug"
-            )
-            self.memory = []
+            self.memory.clear()
+            self._views.clear()
         self.logger.record_event(
             event_type="short_term_memory_clear",
             message="ShortTermMemory cleared.",
@@ -235,7 +248,15 @@ class ShortTermMemory:
         Load memory from a list of messages. Sets message_index counter to one more than the highest present.
         """
         with self._write_lock:
-            self.memory = list(memory_list)
+            self.memory = deque()
+            self._views.clear()
+            self._last_prune_ts = float("-inf")
+            for m in memory_list:
+                m = dict(m)
+                prune_ts = m.get("_timestamp_unix", m.get("timestamp_unix", time.time()))
+                m["_timestamp_unix"] = max(prune_ts, self._last_prune_ts)
+                self._last_prune_ts = m["_timestamp_unix"]
+                self.memory.append(m)
             max_index = max((m.get("message_index", -1) for m in self.memory), default=-1)
             self._message_index_counter = max_index + 1
 
@@ -244,18 +265,20 @@ class ShortTermMemory:
         with self._write_lock:
             if self.memory:
                 removed = self.memory.pop()
+                for view in self._views.values():
+                    view.pop()
                 self.logger.record_event(
                     event_type="short_term_memory_rollback",
                     message="Rolled back last message from ShortTermMemory.",
                     level="warning",
-                    additional_info={"removed": removed}
+                    additional_info={"role": removed.get("role"), "message_index": removed.get("message_index")}
                 )
 
     def get_recent_vibe_profiles(self, n: int = 10) -> List[VibeProfile]:
         """
         Return the most recent n VibeProfiles from short-term memory (if present in messages).
         """
-        messages = self.get()[-n:]
+        messages = self.get(last_n=n)
         vibes = []
         for msg in messages:
             vibe_dict = msg.get("vibe_profile")
@@ -266,6 +289,110 @@ class ShortTermMemory:
                     continue
         return vibes
 
+EMBEDDING_STORAGE_TYPES = ("float32", "float16", "int8")
+
+def encode_embedding(embedding: np.ndarray, storage: str = "float32") -> bytes:
+    """
+    Serialise an embedding for the conversations table.
+
+    float32 and float16 are raw arrays; int8 is a float32 scale followed by symmetric
+    scalar-quantised codes (x ~= code * scale). The three layouts have different lengths,
+    so decode_embeddings only needs embedding_dim to read any of them.
+    """
+    vec = np.asarray(embedding, dtype=np.float32).reshape(-1)
+    if storage == "float16":
+        return vec.astype(np.float16).tobytes()
+    if storage == "int8":
+        peak = float(np.max(np.abs(vec))) if vec.size else 0.0
+        scale = np.float32(peak / 127.0 if peak > 0 else 1.0)
+        codes = np.clip(np.rint(vec / scale), -127, 127).astype(np.int8)
+        return scale.tobytes() + codes.tobytes()
+    return vec.tobytes()
+
+def decode_embeddings(blobs: List[bytes], embedding_dim: int) -> np.ndarray:
+    """Decode embedding blobs of any storage type into an (n, embedding_dim) float32 array."""
+    if not blobs:
+        return np.zeros((0, embedding_dim), dtype=np.float32)
+    size = len(blobs[0])
+    if any(len(blob) != size for blob in blobs):
+        # Mixed layouts, e.g. a database part-way through migration
+        return np.concatenate([decode_embeddings([blob], embedding_dim) for blob in blobs])
+    raw = np.frombuffer(b"".join(blobs), dtype=np.uint8).reshape(len(blobs), size)
+    if size == 4 * embedding_dim:
+        return raw.view(np.float32).copy()
+    if size == 2 * embedding_dim:
+        return raw.view(np.float16).astype(np.float32)
+    if size == embedding_dim + 4:
+        scales = np.ascontiguousarray(raw[:, :4]).view(np.float32)
+        return raw[:, 4:].view(np.int8).astype(np.float32) * scales
+    raise ValueError(f"Embedding blob of {size} bytes does not match embedding_dim={embedding_dim}")
+
+def migrate_embedding_storage(db_path: str, embedding_dim: int, storage: str, batch_size: int = 4096, vacuum: bool = True, logger: Optional[Logger] = None) -> int:
+    """
+    Re-encode every stored embedding in db_path to the given storage type and return the
+    number of rows rewritten. Rows already in that layout are skipped, so an interrupted
+    run can simply be repeated. Persisted FAISS indexes record the storage type they were
+    built for and are rebuilt on the next open. Run it while no LongTermMemory has the
+    database open.
+    """
+    if storage not in EMBEDDING_STORAGE_TYPES:
+        raise ValueError(f"Unknown embedding storage '{storage}', expected one of {EMBEDDING_STORAGE_TYPES}")
+    target_size = len(encode_embedding(np.zeros(embedding_dim, dtype=np.float32), storage))
+    conn = sqlite3.connect(db_path, timeout=10.0)
+    rewritten = 0
+    try:
+        size_before = os.path.getsize(db_path)
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                "SELECT id, embedding FROM conversations WHERE id > ? ORDER BY id ASC LIMIT ?",
+                (last_id, batch_size)
+            ).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            stale = [row for row in rows if len(row[1]) != target_size]
+            if stale:
+                vectors = decode_embeddings([row[1] for row in stale], embedding_dim)
+                conn.executemany(
+                    "UPDATE conversations SET embedding = ? WHERE id = ?",
+                    [(encode_embedding(vec, storage), row[0]) for row, vec in zip(stale, vectors)]
+                )
+                conn.commit()
+                rewritten += len(stale)
+        if vacuum and rewritten:
+            conn.execute("VACUUM")
+        if logger:
+            logger.record_event(
+                event_type="long_term_memory_storage_migrated",
+                message=f"Re-encoded {rewritten} embeddings in {db_path} as {storage}.",
+                level="info",
+                additional_info={"storage": storage, "rows": rewritten, "bytes_before": size_before, "bytes_after": os.path.getsize(db_path)}
+            )
+        return rewritten
+    finally:
+        conn.close()
+
+_FTS_TOKEN_RE = re.compile(r"\w+")
+
+def _fts_query(text: str, phrase: bool = False) -> Optional[str]:
+    """
+    FTS5 MATCH expression for free text: any of its words (ranked by BM25), or with phrase
+    the exact word sequence. Words are quoted, so user text never reaches FTS5 as syntax.
+    """
+    tokens = _FTS_TOKEN_RE.findall(text or "")
+    if not tokens:
+        return None
+    if phrase:
+        return '"' + " ".join(tokens) + '"'
+    return " OR ".join(f'"{token}"' for token in dict.fromkeys(token.lower() for token in tokens))
+
+@functools.lru_cache(maxsize=256)
+def _rows_by_id_sql(count: int, by_user: bool) -> str:
+    """SELECT for a list of result ids; cached so repeated top-k sizes hit SQLite's statement cache."""
+    sql = f"SELECT id, role, content, embedding, timestamp_unix, user_id FROM conversations WHERE id IN ({','.join('?' * count)}) AND session_id = ?"
+    return sql + " AND user_id = ?" if by_user else sql
+
 class LongTermMemory:
     """
     Handles persistent, vector-searchable conversation storage using SQLite and FAISS.
@@ -273,7 +400,7 @@ class LongTermMemory:
     with check_same_thread=False and a timeout. All DB operations use self._db_conn
     and are protected by _read_lock and _write_lock. Connection is cleaned up on error or deletion.
     """
-    def __init__(self, db_path: str, embedding_dim: int, session_id: str, logger: Optional[Logger] = None, config_manager: Optional[ConfigManager] = None, retention_days: Optional[int] = None, top_k: int = 5, logging_level: str = "info", max_records: int = 10000, db_conn: Optional[sqlite3.Connection] = None):
+    def __init__(self, db_path: str, embedding_dim: int, session_id: str, logger: Optional[Logger] = None, config_manager: Optional[ConfigManager] = None, retention_days: Optional[int] = None, top_k: int = 5, logging_level: str = "info", max_records: int = 10000, db_conn: Optional[sqlite3.Connection] = None, write_lock: Optional[threading.Lock] = None):
         # Ensure the directory for db_path exists
         db_dir = os.path.dirname(db_path)
         if db_dir and not os.path.exists(db_dir):
@@ -297,10 +424,59 @@ class LongTermMemory:
         self.top_k = top_k
         self.max_records = max_records
         self._read_lock = threading.Lock()
-        self._write_lock = threading.Lock()
+        # Instances sharing a connection must share write_lock too: sqlite3 opens one implicit
+        # transaction per connection, so unserialised writers would collide on BEGIN
+        self._write_lock = write_lock or threading.Lock()
         self.logger = logger or Logger.get_instance()
         self.logging_level = logging_level
         self.message_timestamps = {}
+        self._time_order_ids: List[int] = []
+        self._time_order_ts: List[float] = []
+        self._time_monotonic = True
+        # Storage: WAL journaling and group commit. Inserts share one transaction that is
+        # committed after write_batch_size rows or commit_interval_ms, whichever comes first
+        storage_defaults = {
+            "sqlite_journal_mode": "WAL",
+            "sqlite_synchronous": "NORMAL",
+            "write_batch_size": 64,
+            "commit_interval_ms": 50,
+            "embedding_storage": "float32",
+            "fts_enabled": True,
+        }
+        storage = {
+            key: (config_manager.get(f"memory.{key}", default) if config_manager else default)
+            for key, default in storage_defaults.items()
+        }
+        self._journal_mode = str(storage["sqlite_journal_mode"]).upper()
+        self._synchronous = str(storage["sqlite_synchronous"]).upper()
+        self._write_batch_size = max(1, int(storage["write_batch_size"]))
+        self._commit_interval = max(0.0, float(storage["commit_interval_ms"])) / 1000.0
+        self._uncommitted = 0
+        self._flush_timer = None
+        # Vector storage in SQLite and in flat/HNSW indexes: float32, float16 or int8 (scalar quantised)
+        self._embedding_storage = str(storage["embedding_storage"]).lower()
+        if self._embedding_storage not in EMBEDDING_STORAGE_TYPES:
+            self.logger.record_event(
+                event_type="long_term_memory_storage_invalid",
+                message=f"Unknown embedding_storage '{self._embedding_storage}', using float32.",
+                level="warning"
+            )
+            self._embedding_storage = "float32"
+        self._index_codec = self._index_codec_for(0)
+        # Lexical recall: FTS5 index over content, fused with vector results by hybrid_query
+        self._fts_enabled = bool(storage["fts_enabled"])
+        self._fts_available = False
+        retrieval_defaults = {
+            "hybrid_rrf_k": 60,
+            "hybrid_lexical_weight": 0.5,
+            "hybrid_candidate_factor": 4,
+        }
+        self._retrieval_config = {
+            key: (config_manager.get(f"memory.{key}", default) if config_manager else default)
+            for key, default in retrieval_defaults.items()
+        }
+        # Shared connections (DialogueContextManager, MemoryService) are closed by their owner
+        self._owns_connection = db_conn is None
         try:
             if db_conn is not None:
                 self._db_conn = db_conn
@@ -311,12 +487,36 @@ class LongTermMemory:
                     timeout=10.0
                 )
             self._init_database()
-            self.faiss_index = faiss.IndexFlatL2(self.embedding_dim)
-            self.message_ids = []
-            # Throttle FAISS index rebuilds
+            # ID-mapped index keyed by SQLite row id; changes are applied in place and
+            # the index is persisted next to the DB every faiss_persist_interval changes
+            self._index_lock = threading.RLock()
             self._faiss_pending_changes = 0
-            self._faiss_rebuild_threshold = config_manager.get("memory.faiss_rebuild_threshold", 100) if config_manager else 100
-            self.rebuild_faiss_index()
+            self._faiss_persist_interval = config_manager.get("memory.faiss_persist_interval", 1000) if config_manager else 1000
+            # ANN tiers: the index is promoted flat -> hnsw -> ivfpq as the session grows
+            index_defaults = {
+                "faiss_index_type": "auto",
+                "faiss_hnsw_threshold": 50000,
+                "faiss_ivfpq_threshold": 1000000,
+                "faiss_min_recall": 0.95,
+                "faiss_hnsw_m": 32,
+                "faiss_hnsw_ef_search": 64,
+                "faiss_pq_m": 16,
+                "faiss_nprobe": 16,
+                "faiss_rerank_factor": 4,
+                "faiss_exact_window_rows": 2048,
+            }
+            self._index_config = {
+                key: (config_manager.get(f"memory.{key}", default) if config_manager else default)
+                for key, default in index_defaults.items()
+            }
+            self._faiss_tier = "flat"
+            self._faiss_search_param = None
+            self._tombstones = set()
+            self._removed_during_build = None
+            self._promotion_thread = None
+            self._promotion_blocked_below = 0
+            self._load_or_rebuild_faiss_index()
+            self._maybe_promote_index()
             self.logger.record_event(
                 event_type="long_term_memory_init",
                 message=f"LongTermMemory initialized with db_path={db_path}, embedding_dim={embedding_dim}, session_id={session_id}, retention_days={retention_days}, top_k={top_k}, max_records={max_records}",
@@ -330,32 +530,78 @@ class LongTermMemory:
     def _cleanup_connection(self):
         try:
             if hasattr(self, '_db_conn') and self._db_conn:
-                self._db_conn.close()
-                self._db_conn = None
+                if getattr(self, '_uncommitted', 0):
+                    # Keep rows from the open group; only the failed statement is lost
+                    try:
+                        self._db_conn.commit()
+                    except Exception:
+                        pass
+                    self._uncommitted = 0
+                if getattr(self, '_owns_connection', True):
+                    self._db_conn.close()
+                    self._db_conn = None
         except Exception as e:
             self.logger.log_error(f"Failed to close database connection: {e}", error_type="LongTermMemoryError")
 
     def __del__(self):
         self._cleanup_connection()
 
+    def _configure_connection(self):
+        """Apply journal_mode and synchronous; unsupported values are left at SQLite's default."""
+        if self._db_conn.in_transaction:
+            # Another shard's write group is open on this shared connection; PRAGMAs need it committed
+            self._db_conn.commit()
+        cursor = self._db_conn.cursor()
+        journal_mode = None
+        if self._journal_mode not in ("WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY"):
+            self.logger.record_event(
+                event_type="long_term_memory_pragma_invalid",
+                message=f"Unsupported sqlite_journal_mode '{self._journal_mode}', leaving the default.",
+                level="warning"
+            )
+        elif self.db_path != ":memory:":
+            try:
+                journal_mode = cursor.execute(f"PRAGMA journal_mode={self._journal_mode}").fetchone()[0]
+            except sqlite3.OperationalError as e:
+                # e.g. another connection to the file holds a lock
+                journal_mode = cursor.execute("PRAGMA journal_mode").fetchone()[0]
+                self.logger.record_event(
+                    event_type="long_term_memory_pragma_failed",
+                    message=f"Could not set journal_mode={self._journal_mode}: {e}",
+                    level="warning"
+                )
+        if self._synchronous in ("OFF", "NORMAL", "FULL", "EXTRA"):
+            cursor.execute(f"PRAGMA synchronous={self._synchronous}")
+        else:
+            self.logger.record_event(
+                event_type="long_term_memory_pragma_invalid",
+                message=f"Unsupported sqlite_synchronous '{self._synchronous}', leaving the default.",
+                level="warning"
+            )
+        return journal_mode
+
     def _init_database(self):
         try:
-            cursor = self._db_conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS conversations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    role TEXT,
-                    content TEXT,
-                    embedding BLOB,
-                    timestamp_unix REAL,
-                    user_id TEXT,
-                    session_id TEXT
-                )
-            """)
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_session_id ON conversations (session_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_id ON conversations (user_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_timestamp_unix ON conversations (timestamp_unix)")
-            self._db_conn.commit()
+            with self._write_lock:
+                journal_mode = self._configure_connection()
+                cursor = self._db_conn.cursor()
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS conversations (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        role TEXT,
+                        content TEXT,
+                        embedding BLOB,
+                        timestamp_unix REAL,
+                        user_id TEXT,
+                        session_id TEXT
+                    )
+                """)
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_session_id ON conversations (session_id)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_id ON conversations (user_id)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_timestamp_unix ON conversations (timestamp_unix)")
+                if self._fts_enabled:
+                    self._fts_available = self._ensure_fts(cursor)
+                self._db_conn.commit()
             cursor.execute("PRAGMA table_info(conversations)")
             columns = {row[1] for row in cursor.fetchall()}
             required = {"id", "role", "content", "embedding", "timestamp_unix", "user_id", "session_id"}
@@ -364,118 +610,335 @@ class LongTermMemory:
             self.logger.record_event(
                 event_type="long_term_memory_db_init",
                 message="Conversations table and indexes ensured.",
-                level="info"
+                level="info",
+                additional_info={"journal_mode": journal_mode, "synchronous": self._synchronous, "fts": self._fts_available}
             )
         except Exception as e:
             self._cleanup_connection()
             self.logger.log_error(f"LongTermMemory._init_database failed: {e}", error_type="LongTermMemoryError")
             raise ConfigurationError(f"Failed to initialize conversations table: {e}")
 
-    def rebuild_faiss_index(self):
+    def _ensure_fts(self, cursor) -> bool:
+        """
+        Create the external-content FTS5 index over conversations.content and the triggers
+        that keep it in step with inserts and deletes; caller holds _write_lock. An index
+        created over an existing table is backfilled once. Returns False if this SQLite
+        build has no FTS5.
+        """
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'conversations_fts'"
+        ).fetchone() is not None
         try:
-            with self._read_lock:
+            cursor.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts USING fts5(content, content='conversations', content_rowid='id')"
+            )
+        except sqlite3.OperationalError as e:
+            self.logger.record_event(
+                event_type="long_term_memory_fts_unavailable",
+                message=f"FTS5 is not available, long-term recall is vector-only: {e}",
+                level="warning"
+            )
+            return False
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS conversations_fts_insert AFTER INSERT ON conversations BEGIN
+                INSERT INTO conversations_fts (rowid, content) VALUES (new.id, new.content);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS conversations_fts_delete AFTER DELETE ON conversations BEGIN
+                INSERT INTO conversations_fts (conversations_fts, rowid, content) VALUES ('delete', old.id, old.content);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS conversations_fts_update AFTER UPDATE OF content ON conversations BEGIN
+                INSERT INTO conversations_fts (conversations_fts, rowid, content) VALUES ('delete', old.id, old.content);
+                INSERT INTO conversations_fts (rowid, content) VALUES (new.id, new.content);
+            END
+        """)
+        if not exists:
+            start = time.perf_counter()
+            cursor.execute("INSERT INTO conversations_fts (conversations_fts) VALUES ('rebuild')")
+            self.logger.record_event(
+                event_type="long_term_memory_fts_built",
+                message=f"Built the full-text index in {time.perf_counter() - start:.3f} seconds.",
+                level="info"
+            )
+        return True
+
+    def _faiss_index_path(self) -> str:
+        session_key = hashlib.md5(str(self.session_id).encode("utf-8")).hexdigest()[:12]
+        return f"{self.db_path}.{session_key}.faiss"
+
+    def _index_codec_for(self, count: int) -> str:
+        """Vector codec for flat/HNSW indexes; int8 (SQ8) needs training data, so small sessions stay float16."""
+        if self._embedding_storage == "int8" and count < 1000:
+            return "float16"
+        return self._embedding_storage
+
+    @staticmethod
+    def _quantizer_type(codec: str):
+        return faiss.ScalarQuantizer.QT_fp16 if codec == "float16" else faiss.ScalarQuantizer.QT_8bit
+
+    def _new_faiss_index(self, codec: Optional[str] = None):
+        codec = codec or self._index_codec_for(0)
+        if codec == "float32":
+            return faiss.IndexIDMap2(faiss.IndexFlatL2(self.embedding_dim))
+        return faiss.IndexIDMap2(faiss.IndexScalarQuantizer(self.embedding_dim, self._quantizer_type(codec), faiss.METRIC_L2))
+
+    def _session_row_stats(self):
+        cursor = self._db_conn.cursor()
+        cursor.execute("SELECT COUNT(*), MAX(id) FROM conversations WHERE session_id = ?", (self.session_id,))
+        count, max_id = cursor.fetchone()
+        return count or 0, max_id or 0
+
+    def _add_rows_to_index(self, min_id_exclusive: int = 0, batch_size: int = 4096):
+        """Stream session rows with id > min_id_exclusive from SQLite into the index."""
+        cursor = self._db_conn.cursor()
+        cursor.execute(
+            "SELECT id, embedding, timestamp_unix FROM conversations WHERE session_id = ? AND id > ? ORDER BY id ASC",
+            (self.session_id, min_id_exclusive)
+        )
+        added = 0
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+            embeddings = decode_embeddings([row[1] for row in rows], self.embedding_dim)
+            self.faiss_index.add_with_ids(embeddings, ids)
+            for row in rows:
+                self._record_timestamp(row[0], row[2])
+            added += len(rows)
+        return added
+
+    def _load_or_rebuild_faiss_index(self):
+        """Open the persisted index, add rows written since it was saved, or rebuild if it is stale."""
+        path = self._faiss_index_path()
+        with self._index_lock, self._read_lock:
+            count, max_id = self._session_row_stats()
+            meta = None
+            if os.path.exists(path) and os.path.exists(f"{path}.meta.json"):
+                try:
+                    with open(f"{path}.meta.json", "r", encoding="utf-8") as f:
+                        meta = json.load(f)
+                    self.faiss_index = faiss.read_index(path)
+                    if (self.faiss_index.d != self.embedding_dim or meta.get("ntotal") != self.faiss_index.ntotal
+                            or meta.get("storage", "float32") != self._embedding_storage):
+                        meta = None
+                    else:
+                        self._faiss_tier = meta.get("tier", "flat")
+                        self._index_codec = meta.get("codec", "float32")
+                        self._faiss_search_param = meta.get("search_param")
+                        self._tombstones = set(meta.get("tombstones", []))
+                except Exception as e:
+                    self.logger.log_error(f"LongTermMemory failed to load FAISS index {path}: {e}", error_type="LongTermMemoryError")
+                    meta = None
+            if meta is not None:
                 cursor = self._db_conn.cursor()
-                cursor.execute("SELECT id, embedding, timestamp_unix FROM conversations WHERE session_id = ? ORDER BY id ASC", (self.session_id,))
-                rows = cursor.fetchall()
-                if rows:
-                    embeddings = np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
-                    self.faiss_index = faiss.IndexFlatL2(self.embedding_dim)
-                    self.faiss_index.add(embeddings)
-                    self.message_ids = [row[0] for row in rows]
-                    self.message_timestamps = {row[0]: row[2] for row in rows}
-                else:
-                    self.faiss_index = faiss.IndexFlatL2(self.embedding_dim)
-                    self.message_ids = []
-                    self.message_timestamps = {}
+                cursor.execute("SELECT id, timestamp_unix FROM conversations WHERE session_id = ? AND id <= ? ORDER BY id ASC", (self.session_id, meta.get("max_id", 0)))
+                self._reset_timestamps()
+                for mid, ts in cursor.fetchall():
+                    self._record_timestamp(mid, ts)
+                added = self._add_rows_to_index(meta.get("max_id", 0))
+                if self.faiss_index.ntotal - len(self._tombstones) == count:
+                    self._faiss_pending_changes = added
+                    self.logger.record_event(
+                        event_type="long_term_memory_index_loaded",
+                        message=f"Loaded FAISS index with {self.faiss_index.ntotal} vectors ({added} added since last save).",
+                        level=self.logging_level,
+                        additional_info={"path": path, "ntotal": self.faiss_index.ntotal}
+                    )
+                    return
+                # Rows were deleted since the index was saved; fall through to a rebuild
+        self.rebuild_faiss_index()
+
+    def rebuild_faiss_index(self):
+        """Rebuild the index from SQLite. Only needed when the persisted index is missing or stale."""
+        try:
+            with self._index_lock, self._read_lock:
+                self._index_codec = self._index_codec_for(0)
+                self.faiss_index = self._new_faiss_index(self._index_codec)
+                self._faiss_tier = "flat"
+                self._faiss_search_param = None
+                self._tombstones = set()
+                self._reset_timestamps()
+                self._add_rows_to_index()
+                self._faiss_pending_changes = 0
+                self._save_faiss_index()
         except Exception as e:
             self._cleanup_connection()
             self.logger.log_error(f"LongTermMemory.rebuild_faiss_index failed: {e}", error_type="LongTermMemoryError")
             raise
 
+    def _save_faiss_index(self):
+        if self.db_path == ":memory:":
+            return
+        path = self._faiss_index_path()
+        try:
+            with self._index_lock:
+                faiss.write_index(self.faiss_index, f"{path}.tmp")
+                meta = {
+                    "ntotal": int(self.faiss_index.ntotal),
+                    "max_id": int(max(self.message_timestamps, default=0)),
+                    "embedding_dim": self.embedding_dim,
+                    "tier": self._faiss_tier,
+                    "storage": self._embedding_storage,
+                    "codec": self._index_codec,
+                    "search_param": self._faiss_search_param,
+                    "tombstones": sorted(self._tombstones),
+                    "saved_at": time.time()
+                }
+                with open(f"{path}.meta.json.tmp", "w", encoding="utf-8") as f:
+                    json.dump(meta, f)
+                os.replace(f"{path}.tmp", path)
+                os.replace(f"{path}.meta.json.tmp", f"{path}.meta.json")
+                self._faiss_pending_changes = 0
+        except Exception as e:
+            self.logger.log_error(f"LongTermMemory failed to persist FAISS index: {e}", error_type="LongTermMemoryError")
+
+    def _note_index_changes(self, count: int = 1):
+        self._faiss_pending_changes += count
+        if self._faiss_pending_changes >= self._faiss_persist_interval:
+            self._save_faiss_index()
+
+    def persist_index(self):
+        """Write the FAISS index to disk if it has unsaved changes."""
+        with self._index_lock:
+            if self._faiss_pending_changes:
+                self._save_faiss_index()
+
     def add(self, msg: Dict[str, Any]):
+        """Insert one message; it is committed with the current write group."""
+        self.add_many([msg])
+
+    def add_many(self, msgs: List[Dict[str, Any]]) -> List[int]:
+        """
+        Insert several messages with one FAISS add and a single commit, e.g. for imports
+        or dream/meditation replay. Returns the new row ids in input order.
+        """
+        if not msgs:
+            return []
         start_wait = time.perf_counter()
         with self._write_lock:
             wait_time = time.perf_counter() - start_wait
             self.logger.record_event(
                 event_type="long_term_memory_write_lock_acquired",
-                message=f"Write lock acquired in {wait_time:.6f} seconds.",
+                message=lambda: f"Write lock acquired in {wait_time:.6f} seconds.",
                 level="debug"
             )
-            self.faiss_index.add(msg["embedding"].reshape(1, -1))
-        try:
-            cursor = self._db_conn.cursor()
-            cursor.execute(
-                "INSERT INTO conversations (role, content, embedding, timestamp_unix, user_id, session_id) VALUES (?, ?, ?, ?, ?, ?)",
-                (msg["role"], msg["content"], msg["embedding"].tobytes(), msg["timestamp_unix"], msg["user_id"], self.session_id)
-            )
-            msg_id = cursor.lastrowid
-            self._db_conn.commit()
-            with self._write_lock:
-                self.message_ids.append(msg_id)
-                self.message_timestamps[msg_id] = msg["timestamp_unix"]
-                # Throttle FAISS index rebuilds
-                self._faiss_pending_changes += 1
-                if self._faiss_pending_changes >= self._faiss_rebuild_threshold:
-                    self.rebuild_faiss_index()
-                    self._faiss_pending_changes = 0
-            self.logger.record_event(
-                event_type="long_term_memory_add",
-                message="Message added to LongTermMemory.",
-                level=self.logging_level,
-                additional_info={"msg": msg, "msg_id": msg_id}
-            )
-        except Exception as e:
-            self._cleanup_connection()
-            self.logger.log_error(f"LongTermMemory.add failed: {e}", error_type="LongTermMemoryError")
-            raise
+            try:
+                embeddings = np.stack([np.asarray(msg["embedding"], dtype=np.float32).reshape(-1) for msg in msgs])
+                cursor = self._db_conn.cursor()
+                msg_ids = []
+                for msg, embedding in zip(msgs, embeddings):
+                    cursor.execute(
+                        "INSERT INTO conversations (role, content, embedding, timestamp_unix, user_id, session_id) VALUES (?, ?, ?, ?, ?, ?)",
+                        (msg["role"], msg["content"], encode_embedding(embedding, self._embedding_storage), msg["timestamp_unix"], msg["user_id"], self.session_id)
+                    )
+                    msg_ids.append(cursor.lastrowid)
+                self._uncommitted += len(msgs)
+                self._maybe_commit()
+                with self._index_lock:
+                    self.faiss_index.add_with_ids(embeddings, np.array(msg_ids, dtype=np.int64))
+                    for msg_id, msg in zip(msg_ids, msgs):
+                        self._record_timestamp(msg_id, msg["timestamp_unix"])
+                    self._note_index_changes(len(msgs))
+                    self._maybe_promote_index()
+                if len(msgs) == 1:
+                    self.logger.record_event(
+                        event_type="long_term_memory_add",
+                        message="Message added to LongTermMemory.",
+                        level=self.logging_level,
+                        additional_info=lambda: {"msg": {k: v for k, v in msgs[0].items() if k != "embedding"}, "msg_id": msg_ids[0]}
+                    )
+                else:
+                    self.logger.record_event(
+                        event_type="long_term_memory_add_many",
+                        message=f"{len(msgs)} messages added to LongTermMemory.",
+                        level=self.logging_level,
+                        additional_info={"count": len(msgs), "first_id": msg_ids[0], "last_id": msg_ids[-1]}
+                    )
+                return msg_ids
+            except Exception as e:
+                self._cleanup_connection()
+                self.logger.log_error(f"LongTermMemory.add_many failed: {e}", error_type="LongTermMemoryError")
+                raise
+
+    def _maybe_commit(self):
+        """Commit the write group once it is full, otherwise make sure a flush is scheduled; caller holds _write_lock."""
+        if self._uncommitted >= self._write_batch_size or self._commit_interval <= 0:
+            self._commit_writes()
+        elif self._flush_timer is None:
+            self._flush_timer = threading.Timer(self._commit_interval, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _commit_writes(self):
+        # Caller holds _write_lock
+        if self._flush_timer is not None:
+            if self._flush_timer is not threading.current_thread():
+                self._flush_timer.cancel()
+            self._flush_timer = None
+        self._db_conn.commit()
+        self._uncommitted = 0
+
+    def flush(self):
+        """Commit rows still waiting in the current write group."""
+        with self._write_lock:
+            if self._uncommitted and self._db_conn is not None:
+                try:
+                    self._commit_writes()
+                except Exception as e:
+                    self.logger.log_error(f"LongTermMemory.flush failed: {e}", error_type="LongTermMemoryError")
+            elif self._flush_timer is threading.current_thread():
+                self._flush_timer = None
 
     def query(self, query_embedding: np.ndarray, user_id: Optional[str] = None, top_k: int = 5, min_timestamp_unix: Optional[float] = None, short_term_memory: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
         start_time = time.perf_counter()
-        with self._read_lock:
-            if len(self.message_ids) == 0:
+        with self._index_lock:
+            if len(self.message_timestamps) == 0:
                 self.logger.record_event(
                     event_type="long_term_memory_query_empty",
                     message="No rows found for LongTermMemory query.",
                     level=self.logging_level
                 )
                 return []
-            filtered_ids = self.message_ids
-            if min_timestamp_unix is not None:
-                filtered_ids = [mid for mid in self.message_ids if self.message_timestamps.get(mid, 0) >= min_timestamp_unix]
-            if not filtered_ids:
-                self.logger.record_event(
-                    event_type="long_term_memory_query_empty",
-                    message="No rows after timestamp filtering.",
-                    level=self.logging_level
-                )
-                return []
-            k = min(top_k, len(filtered_ids))
-            if min_timestamp_unix is not None:
-                cursor = self._db_conn.cursor()
-                placeholders = ','.join('?' for _ in filtered_ids)
-                cursor.execute(f"SELECT id, embedding FROM conversations WHERE id IN ({placeholders})", filtered_ids)
-                rows = cursor.fetchall()
-                if not rows:
-                    return []
-                embeddings = np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
-                temp_index = faiss.IndexFlatL2(self.embedding_dim)
-                temp_index.add(embeddings)
-                D, I = temp_index.search(query_embedding.reshape(1, -1), k)
-                result_ids = [rows[i][0] for i in I[0]]
+            exact_window = False
+            if min_timestamp_unix is None:
+                result_ids = self._search_index(query_embedding, top_k)
             else:
-                D, I = self.faiss_index.search(query_embedding.reshape(1, -1), k)
-                result_ids = [filtered_ids[i] for i in I[0]]
+                window_start, window_size = self._time_window(min_timestamp_unix)
+                if window_size == 0:
+                    self.logger.record_event(
+                        event_type="long_term_memory_query_empty",
+                        message="No rows after timestamp filtering.",
+                        level=self.logging_level
+                    )
+                    return []
+                if self._faiss_tier != "flat" and window_size <= self._index_config["faiss_exact_window_rows"]:
+                    # Graph/IVF search degrades when few nodes pass the filter; small windows are scanned exactly
+                    exact_window = True
+                    result_ids = self._search_recent_exact(query_embedding, min_timestamp_unix, top_k, window_start)
+                else:
+                    selector, _keep_alive = self._time_window_selector(min_timestamp_unix, window_start)
+                    result_ids = self._search_index(query_embedding, top_k, selector)
+            # Compressed (PQ/SQ8) distances are approximate; candidates are re-ranked below against the stored vectors
+            rerank = self._index_codec in ("pq", "int8") and not exact_window
+            k = top_k
         try:
             cursor = self._db_conn.cursor()
-            placeholders = ','.join('?' for _ in result_ids)
-            where = f"WHERE id IN ({placeholders}) AND session_id = ?"
             params = result_ids + [self.session_id]
             if user_id:
-                where += " AND user_id = ?"
                 params.append(user_id)
-            cursor.execute(f"SELECT id, role, content, embedding, timestamp_unix, user_id FROM conversations {where}", params)
+            cursor.execute(_rows_by_id_sql(len(result_ids), bool(user_id)), params)
             rows = cursor.fetchall()
             id_to_row = {row[0]: row for row in rows}
+            # Exact squared L2 for every row, so results from different shards can be merged
+            query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+            vectors = decode_embeddings([row[3] for row in rows], self.embedding_dim)
+            distances = {row[0]: float(np.sum((vec - query) ** 2)) for row, vec in zip(rows, vectors)}
+            if rerank and rows:
+                result_ids = sorted((rid for rid in result_ids if rid in distances), key=distances.get)[:k]
             results = [
                 {
                     "id": id_to_row[rid][0],
@@ -483,7 +946,8 @@ class LongTermMemory:
                     "content": id_to_row[rid][2],
                     "timestamp_unix": id_to_row[rid][4],
                     "user_id": id_to_row[rid][5],
-                    "session_id": self.session_id
+                    "session_id": self.session_id,
+                    "distance": distances[rid]
                 }
                 for rid in result_ids if rid in id_to_row
             ]
@@ -500,43 +964,451 @@ class LongTermMemory:
             self.logger.log_error(f"LongTermMemory.query failed: {e}", error_type="LongTermMemoryError")
             raise
 
+    def search_text(self, query_text: str, user_id: Optional[str] = None, top_k: int = 5, min_timestamp_unix: Optional[float] = None, phrase: bool = False) -> List[Dict[str, Any]]:
+        """
+        Full-text search over this session's messages, best BM25 match first ("bm25" is the
+        negated FTS5 score, so higher is better). phrase=True only matches the exact word
+        sequence. Without FTS5, phrase lookups fall back to a substring scan and word
+        lookups return nothing.
+        """
+        expression = _fts_query(query_text, phrase)
+        if expression is None or (not self._fts_available and not phrase):
+            return []
+        filters = ["c.session_id = ?"]
+        params: List[Any] = [self.session_id]
+        if user_id:
+            filters.append("c.user_id = ?")
+            params.append(user_id)
+        if min_timestamp_unix is not None:
+            filters.append("c.timestamp_unix >= ?")
+            params.append(min_timestamp_unix)
+        try:
+            cursor = self._db_conn.cursor()
+            if self._fts_available:
+                cursor.execute(
+                    "SELECT c.id, c.role, c.content, c.timestamp_unix, c.user_id, bm25(conversations_fts) AS rank "
+                    "FROM conversations_fts JOIN conversations c ON c.id = conversations_fts.rowid "
+                    f"WHERE conversations_fts MATCH ? AND {' AND '.join(filters)} ORDER BY rank LIMIT ?",
+                    [expression] + params + [top_k]
+                )
+            else:
+                pattern = query_text.strip().strip('"').replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                cursor.execute(
+                    "SELECT c.id, c.role, c.content, c.timestamp_unix, c.user_id, 0.0 FROM conversations c "
+                    f"WHERE c.content LIKE ? ESCAPE '\\' AND {' AND '.join(filters)} ORDER BY c.id DESC LIMIT ?",
+                    [f"%{pattern}%"] + params + [top_k]
+                )
+            return [
+                {
+                    "id": row[0],
+                    "role": row[1],
+                    "content": row[2],
+                    "timestamp_unix": row[3],
+                    "user_id": row[4],
+                    "session_id": self.session_id,
+                    "bm25": -float(row[5])
+                }
+                for row in cursor.fetchall()
+            ]
+        except sqlite3.OperationalError as e:
+            self.logger.log_error(f"LongTermMemory.search_text failed: {e}", error_type="LongTermMemoryError")
+            return []
+
+    def hybrid_query(self, query_text: Optional[str], query_embedding: Optional[np.ndarray] = None, user_id: Optional[str] = None, top_k: int = 5, min_timestamp_unix: Optional[float] = None, exact_phrase: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """
+        Lexical + vector recall. BM25 and vector rankings are merged with weighted reciprocal
+        rank fusion (memory.hybrid_lexical_weight, memory.hybrid_rrf_k) into "score", higher
+        is better. Without a query_embedding (e.g. no semantic embedding source) only BM25
+        is used. Exact-phrase lookups (exact_phrase, or text wrapped in double quotes) skip
+        the vector path entirely.
+        """
+        start_time = time.perf_counter()
+        text = (query_text or "").strip()
+        if exact_phrase is None:
+            exact_phrase = len(text) > 1 and text[0] == text[-1] == '"'
+        if exact_phrase:
+            rankings = [(1.0, self.search_text(text, user_id=user_id, top_k=top_k, min_timestamp_unix=min_timestamp_unix, phrase=True))]
+        else:
+            candidates = max(top_k, top_k * int(self._retrieval_config["hybrid_candidate_factor"]))
+            lexical_weight = min(1.0, max(0.0, float(self._retrieval_config["hybrid_lexical_weight"])))
+            rankings = []
+            if text:
+                rankings.append((lexical_weight, self.search_text(text, user_id=user_id, top_k=candidates, min_timestamp_unix=min_timestamp_unix)))
+            if query_embedding is not None:
+                rankings.append((1.0 - lexical_weight, self.query(query_embedding, user_id=user_id, top_k=candidates, min_timestamp_unix=min_timestamp_unix)))
+        rrf_k = float(self._retrieval_config["hybrid_rrf_k"])
+        fused: Dict[int, Dict[str, Any]] = {}
+        for weight, ranked in rankings:
+            for rank, row in enumerate(ranked):
+                entry = fused.setdefault(row["id"], {"score": 0.0})
+                entry.update(row)
+                entry["score"] += weight / (rrf_k + rank + 1)
+        results = sorted(fused.values(), key=lambda r: r["score"], reverse=True)[:top_k]
+        self.logger.record_event(
+            event_type="long_term_memory_hybrid_query",
+            message=f"LongTermMemory hybrid query executed in {time.perf_counter() - start_time:.6f} seconds.",
+            level=self.logging_level,
+            additional_info={
+                "num_results": len(results),
+                "exact_phrase": exact_phrase,
+                "lexical_hits": len(rankings[0][1]) if rankings and text else 0,
+                "vector": query_embedding is not None and not exact_phrase
+            }
+        )
+        return results
+
     def clear(self, user_id: Optional[str] = None):
         start_wait = time.perf_counter()
         with self._write_lock:
             wait_time = time.perf_counter() - start_wait
             self.logger.record_event(
                 event_type="long_term_memory_write_lock_acquired",
-                message=f"Write lock acquired in {wait_time:.6f} seconds.",
+                message=lambda: f"Write lock acquired in {wait_time:.6f} seconds.",
                 level="debug"
             )
-            self.faiss_index = faiss.IndexFlatL2(self.embedding_dim)
-            self.message_ids = []
-            self.message_timestamps = {}
-            # Always rebuild index and reset counter on clear
-            self.rebuild_faiss_index()
-            self._faiss_pending_changes = 0
-        try:
+            try:
+                cursor = self._db_conn.cursor()
+                if user_id:
+                    cursor.execute("SELECT id FROM conversations WHERE user_id = ? AND session_id = ?", (user_id, self.session_id))
+                    removed_ids = [row[0] for row in cursor.fetchall()]
+                    cursor.execute("DELETE FROM conversations WHERE user_id = ? AND session_id = ?", (user_id, self.session_id))
+                else:
+                    cursor.execute("DELETE FROM conversations WHERE session_id = ?", (self.session_id,))
+                self._commit_writes()
+                with self._index_lock:
+                    if user_id:
+                        self._remove_from_index(removed_ids)
+                    else:
+                        self._index_codec = self._index_codec_for(0)
+                        self.faiss_index = self._new_faiss_index(self._index_codec)
+                        self._faiss_tier = "flat"
+                        self._faiss_search_param = None
+                        self._tombstones = set()
+                        self._reset_timestamps()
+                        if self._removed_during_build is not None:
+                            self._removed_during_build.add(None)
+                    self._save_faiss_index()
+                self.logger.record_event(
+                    event_type="long_term_memory_clear",
+                    message="LongTermMemory cleared.",
+                    level=self.logging_level,
+                    additional_info={"user_id": user_id}
+                )
+            except Exception as e:
+                self._cleanup_connection()
+                self.logger.log_error(f"LongTermMemory.clear failed: {e}", error_type="LongTermMemoryError")
+                raise
+
+    def _remove_from_index(self, memory_ids: List[int]):
+        """Drop ids from the FAISS index in place; caller holds _index_lock."""
+        present = [mid for mid in memory_ids if mid in self.message_timestamps]
+        if not present:
+            return 0
+        if self._faiss_tier == "hnsw":
+            # HNSW graphs cannot drop nodes; hide them at search time until the next rebuild
+            self._tombstones.update(present)
+        else:
+            self.faiss_index.remove_ids(np.array(present, dtype=np.int64))
+        if self._removed_during_build is not None:
+            self._removed_during_build.update(present)
+        for mid in present:
+            del self.message_timestamps[mid]
+        if len(self._time_order_ids) > 2 * len(self.message_timestamps) + 1024:
+            self._compact_time_order()
+        self._maybe_promote_index()
+        return len(present)
+
+    def _reset_timestamps(self):
+        self.message_timestamps = {}
+        self._time_order_ids = []
+        self._time_order_ts = []
+        self._time_monotonic = True
+
+    def _record_timestamp(self, mid: int, ts: float):
+        """Track a row's timestamp; ids and timestamps are kept in insertion order for range lookups."""
+        ts = float(ts or 0.0)
+        if self._time_order_ids and (ts < self._time_order_ts[-1] or mid < self._time_order_ids[-1]):
+            self._time_monotonic = False
+        self.message_timestamps[mid] = ts
+        self._time_order_ids.append(mid)
+        self._time_order_ts.append(ts)
+
+    def _compact_time_order(self):
+        live = [(mid, self.message_timestamps[mid]) for mid in self._time_order_ids if mid in self.message_timestamps]
+        self._time_order_ids = [mid for mid, _ in live]
+        self._time_order_ts = [ts for _, ts in live]
+
+    def _time_window(self, min_timestamp_unix: float):
+        """Return (start position, approximate row count) of rows with timestamp >= min_timestamp_unix.
+
+        When rows arrive in timestamp order (the normal case) this is a binary search; the
+        count may include deleted rows, which the index no longer returns anyway.
+        """
+        if self._time_monotonic:
+            start = bisect.bisect_left(self._time_order_ts, min_timestamp_unix)
+            return start, len(self._time_order_ts) - start
+        return None, sum(1 for ts in self.message_timestamps.values() if ts >= min_timestamp_unix)
+
+    def _time_window_selector(self, min_timestamp_unix: float, window_start: Optional[int]):
+        """FAISS ID selector for the time window; returns (selector, objects to keep alive)."""
+        if window_start is not None:
+            # Ids grow with time, so the window is every id from the first row in it onwards
+            selector = faiss.IDSelectorRange(self._time_order_ids[window_start], np.iinfo(np.int64).max)
+            return selector, [selector]
+        window_ids = np.fromiter(
+            (mid for mid, ts in self.message_timestamps.items() if ts >= min_timestamp_unix), dtype=np.int64
+        )
+        selector = faiss.IDSelectorBatch(window_ids)
+        return selector, [selector, window_ids]
+
+    def _search_recent_exact(self, query_embedding: np.ndarray, min_timestamp_unix: float, k: int, window_start: Optional[int] = None) -> List[int]:
+        """Exact search over a small time window, read by primary-key or timestamp range."""
+        cursor = self._db_conn.cursor()
+        if window_start is not None:
+            cursor.execute(
+                "SELECT id, embedding FROM conversations WHERE id >= ? AND session_id = ?",
+                (self._time_order_ids[window_start], self.session_id)
+            )
+        else:
+            # Unary + keeps SQLite from preferring the (unselective) session index
+            cursor.execute(
+                "SELECT id, embedding FROM conversations WHERE +session_id = ? AND timestamp_unix >= ?",
+                (self.session_id, min_timestamp_unix)
+            )
+        rows = cursor.fetchall()
+        if not rows:
+            return []
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        embeddings = decode_embeddings([row[1] for row in rows], self.embedding_dim)
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        distances = np.sum((embeddings - query) ** 2, axis=1)
+        order = np.argsort(distances)[:k]
+        return ids[order].tolist()
+
+    def _target_index_tier(self, count: int) -> str:
+        index_type = self._index_config["faiss_index_type"]
+        if index_type in ("flat", "hnsw", "ivfpq"):
+            target = index_type
+        else:
+            target = "flat"
+            if count >= self._index_config["faiss_hnsw_threshold"]:
+                target = "hnsw"
+            if count >= self._index_config["faiss_ivfpq_threshold"]:
+                target = "ivfpq"
+        # IVF-PQ needs enough points to train its coarse quantizer and codebooks
+        if target == "ivfpq" and count < 256 * 39:
+            target = "hnsw" if count >= 1000 else "flat"
+        return target
+
+    def _maybe_promote_index(self):
+        """Start a background rebuild when the session outgrows its tier or HNSW tombstones pile up."""
+        with self._index_lock:
+            if self._promotion_thread is not None and self._promotion_thread.is_alive():
+                return
+            count = len(self.message_timestamps)
+            target = self._target_index_tier(count)
+            tiers = ("flat", "hnsw", "ivfpq")
+            # A rejected or failed rebuild backs off promotion and requantization alike
+            backed_off = count < self._promotion_blocked_below
+            promote = tiers.index(target) > tiers.index(self._faiss_tier) and not backed_off
+            compact = self._faiss_tier == "hnsw" and len(self._tombstones) > max(1000, 0.2 * self.faiss_index.ntotal)
+            requantize = self._faiss_tier != "ivfpq" and self._index_codec != self._index_codec_for(count) and not backed_off
+            if not (promote or compact or requantize):
+                return
+            self._promotion_thread = threading.Thread(
+                target=self._rebuild_index_tier,
+                args=(target if promote else self._faiss_tier,),
+                name="long_term_memory_index_builder",
+                daemon=True
+            )
+            self._promotion_thread.start()
+
+    def _read_session_vectors(self, min_id_exclusive: int = 0):
+        with self._read_lock:
             cursor = self._db_conn.cursor()
-            if user_id:
-                cursor.execute("DELETE FROM conversations WHERE user_id = ? AND session_id = ?", (user_id, self.session_id))
+            cursor.execute(
+                "SELECT id, embedding FROM conversations WHERE session_id = ? AND id > ? ORDER BY id ASC",
+                (self.session_id, min_id_exclusive)
+            )
+            rows = cursor.fetchall()
+        if not rows:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, self.embedding_dim), dtype=np.float32)
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        return ids, decode_embeddings([row[1] for row in rows], self.embedding_dim)
+
+    def _build_tier_index(self, tier: str, ids: np.ndarray, vectors: np.ndarray):
+        """Build (and train) an index of the given tier over the supplied vectors."""
+        dim = self.embedding_dim
+        codec = self._index_codec_for(len(ids))
+        if tier == "hnsw":
+            if codec == "float32":
+                index = faiss.IndexIDMap(faiss.IndexHNSWFlat(dim, int(self._index_config["faiss_hnsw_m"])))
             else:
-                cursor.execute("DELETE FROM conversations WHERE session_id = ?", (self.session_id,))
-            self._db_conn.commit()
+                index = faiss.IndexIDMap(faiss.IndexHNSWSQ(dim, self._quantizer_type(codec), int(self._index_config["faiss_hnsw_m"])))
+        elif tier == "ivfpq":
+            nlist = max(1, min(int(4 * math.sqrt(len(ids))), len(ids) // 39))
+            pq_m = max(m for m in range(1, min(int(self._index_config["faiss_pq_m"]), dim) + 1) if dim % m == 0)
+            ivf = faiss.IndexIVFPQ(faiss.IndexFlatL2(dim), dim, nlist, pq_m, 8)
+            sample = vectors
+            if len(vectors) > 256 * nlist:
+                sample = vectors[np.random.default_rng(0).choice(len(vectors), 256 * nlist, replace=False)]
+            ivf.train(sample)
+            index = faiss.IndexIDMap(ivf)
+        else:
+            index = self._new_faiss_index(codec)
+        if tier != "ivfpq" and codec == "int8":
+            sample = vectors
+            if len(vectors) > 65536:
+                sample = vectors[np.random.default_rng(0).choice(len(vectors), 65536, replace=False)]
+            index.train(sample)
+        if len(ids):
+            index.add_with_ids(vectors, ids)
+        return index
+
+    def _search_parameters(self, tier: str, search_param: Optional[int], selector=None):
+        """Build FAISS search parameters for a tier; returns (params, objects to keep alive)."""
+        keep_alive = []
+        if self._tombstones and tier == self._faiss_tier:
+            batch = faiss.IDSelectorBatch(np.array(sorted(self._tombstones), dtype=np.int64))
+            live = faiss.IDSelectorNot(batch)
+            keep_alive += [batch, live]
+            selector = live if selector is None else faiss.IDSelectorAnd(live, selector)
+            keep_alive.append(selector)
+        if tier == "hnsw":
+            params = faiss.SearchParametersHNSW()
+            params.efSearch = int(search_param or self._index_config["faiss_hnsw_ef_search"])
+        elif tier == "ivfpq":
+            params = faiss.SearchParametersIVF()
+            params.nprobe = int(search_param or self._index_config["faiss_nprobe"])
+        elif selector is not None:
+            params = faiss.SearchParameters()
+        else:
+            return None, keep_alive
+        if selector is not None:
+            params.sel = selector
+        return params, keep_alive
+
+    def _search_index(self, query_embedding: np.ndarray, k: int, selector=None) -> List[int]:
+        """k-nearest row ids from the live index; caller holds _index_lock."""
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+        if self._index_codec in ("pq", "int8"):
+            k *= int(self._index_config["faiss_rerank_factor"])
+        params, _keep_alive = self._search_parameters(self._faiss_tier, self._faiss_search_param, selector)
+        D, I = self.faiss_index.search(query, k, params=params) if params is not None else self.faiss_index.search(query, k)
+        return [int(i) for i in I[0] if i != -1]
+
+    def _tune_index_recall(self, tier: str, index, ids: np.ndarray, vectors: np.ndarray, k: int = 10):
+        """Raise efSearch/nprobe until recall@k against exact search meets faiss_min_recall.
+
+        Returns (recall, search_param); recall below the target means the tier is rejected.
+        """
+        if tier == "flat" or len(ids) == 0:
+            return 1.0, None
+        k = min(k, len(ids))
+        rng = np.random.default_rng(0)
+        queries = vectors[rng.choice(len(vectors), min(256, len(vectors)), replace=False)]
+        _, exact = faiss.knn(queries, vectors, k)
+        exact_ids = ids[exact]
+        if tier == "hnsw":
+            param, limit = int(self._index_config["faiss_hnsw_ef_search"]), 1024
+        else:
+            param, limit = int(self._index_config["faiss_nprobe"]), faiss.downcast_index(index.index).nlist
+        min_recall = float(self._index_config["faiss_min_recall"])
+        recall = 0.0
+        while True:
+            params, _keep_alive = self._search_parameters(tier, param)
+            if tier == "ivfpq":
+                # Measure what queries see: PQ candidates re-ranked with exact distances
+                rerank_k = min(k * int(self._index_config["faiss_rerank_factor"]), len(ids))
+                _, candidates = index.search(queries, rerank_k, params=params)
+                found = np.empty((len(queries), k), dtype=np.int64)
+                for row, (query, cand) in enumerate(zip(queries, candidates)):
+                    cand = cand[cand != -1]
+                    exact_d = np.sum((vectors[np.searchsorted(ids, cand)] - query) ** 2, axis=1)
+                    ranked = cand[np.argsort(exact_d)][:k]
+                    found[row, :len(ranked)] = ranked
+                    found[row, len(ranked):] = -1
+            else:
+                _, found = index.search(queries, k, params=params)
+            recall = float(np.mean([len(set(f) & set(e)) / k for f, e in zip(found, exact_ids)]))
+            if recall >= min_recall or param >= limit:
+                return recall, param
+            param = min(param * 2, limit)
+
+    def _rebuild_index_tier(self, tier: str):
+        """Background build of a new index tier, swapped in only if it passes the recall check."""
+        try:
+            with self._index_lock:
+                self._removed_during_build = set()
+            start_time = time.perf_counter()
+            ids, vectors = self._read_session_vectors()
+            snapshot_max = int(ids[-1]) if len(ids) else 0
+            index = self._build_tier_index(tier, ids, vectors)
+            recall, search_param = self._tune_index_recall(tier, index, ids, vectors)
+            if recall < float(self._index_config["faiss_min_recall"]):
+                # Do not retry until the session has grown substantially
+                self._promotion_blocked_below = 2 * len(ids)
+                self.logger.record_event(
+                    event_type="long_term_memory_index_promotion_rejected",
+                    message=f"{tier} index reached recall {recall:.3f} < {self._index_config['faiss_min_recall']}; keeping {self._faiss_tier}.",
+                    level="warning",
+                    additional_info={"tier": tier, "recall": recall, "rows": len(ids)}
+                )
+                return
+            # Writers insert into SQLite before they take _index_lock, so hold _write_lock
+            # too: otherwise the catch-up read can pick up a row that add_many then adds
+            # to the swapped-in index a second time
+            with self._write_lock, self._index_lock:
+                removed = self._removed_during_build
+                if None in removed:
+                    # The session was cleared while building; the snapshot is obsolete
+                    return
+                new_ids, new_vectors = self._read_session_vectors(snapshot_max)
+                if len(new_ids):
+                    index.add_with_ids(new_vectors, new_ids)
+                tombstones = set()
+                if removed:
+                    if tier == "hnsw":
+                        tombstones = set(removed)
+                    else:
+                        index.remove_ids(np.array(sorted(removed), dtype=np.int64))
+                previous = self._faiss_tier
+                self.faiss_index = index
+                self._faiss_tier = tier
+                self._index_codec = "pq" if tier == "ivfpq" else self._index_codec_for(len(ids))
+                self._faiss_search_param = search_param
+                self._tombstones = tombstones
+                self._save_faiss_index()
             self.logger.record_event(
-                event_type="long_term_memory_clear",
-                message="LongTermMemory cleared.",
-                level=self.logging_level,
-                additional_info={"user_id": user_id}
+                event_type="long_term_memory_index_promoted",
+                message=f"LongTermMemory index moved from {previous} to {tier} ({len(ids)} rows, recall@10 {recall:.3f}).",
+                level="info",
+                additional_info={
+                    "tier": tier,
+                    "previous_tier": previous,
+                    "codec": self._index_codec,
+                    "rows": len(ids),
+                    "recall": recall,
+                    "search_param": search_param,
+                    "build_seconds": time.perf_counter() - start_time
+                }
             )
         except Exception as e:
-            self._cleanup_connection()
-            self.logger.log_error(f"LongTermMemory.clear failed: {e}", error_type="LongTermMemoryError")
-            raise
+            self._promotion_blocked_below = 2 * len(self.message_timestamps)
+            self.logger.log_error(f"LongTermMemory index rebuild to {tier} failed: {e}", error_type="LongTermMemoryError")
+        finally:
+            with self._index_lock:
+                self._removed_during_build = None
 
     def close(self):
         try:
-            if hasattr(self, '_db_conn') and self._db_conn:
+            if hasattr(self, '_write_lock'):
+                self.flush()
+            if hasattr(self, '_index_lock'):
+                self.persist_index()
+            if hasattr(self, '_db_conn') and self._db_conn and self._owns_connection:
                 self._db_conn.close()
+                self._db_conn = None
                 self.logger.record_event(
                     event_type="long_term_memory_closed",
                     message="LongTermMemory database connection closed.",
@@ -547,39 +1419,496 @@ class LongTermMemory:
 
     def remove_by_id(self, memory_id: int):
         """Remove a memory from long-term storage by its database ID."""
+        self.remove_by_ids([memory_id])
+
+    def remove_by_ids(self, memory_ids: list):
+        """Remove multiple memories by their database IDs."""
+        memory_ids = [int(mid) for mid in memory_ids]
+        if not memory_ids:
+            return
         with self._write_lock:
             try:
                 cursor = self._db_conn.cursor()
-                cursor.execute("DELETE FROM conversations WHERE id = ? AND session_id = ?", (memory_id, self.session_id))
-                self._db_conn.commit()
-                # Remove from in-memory indices
-                if memory_id in self.message_ids:
-                    idx = self.message_ids.index(memory_id)
-                    del self.message_ids[idx]
-                    if memory_id in self.message_timestamps:
-                        del self.message_timestamps[memory_id]
-                    # Rebuild FAISS index
-                    self.rebuild_faiss_index()
+                cursor.executemany(
+                    "DELETE FROM conversations WHERE id = ? AND session_id = ?",
+                    [(mid, self.session_id) for mid in memory_ids]
+                )
+                self._commit_writes()
+                with self._index_lock:
+                    removed = self._remove_from_index(memory_ids)
+                    self._note_index_changes(removed)
                 self.logger.record_event(
                     event_type="long_term_memory_remove_by_id",
-                    message=f"Removed memory with id={memory_id} from LongTermMemory.",
+                    message=f"Removed {removed} memories from LongTermMemory.",
                     level=self.logging_level,
-                    additional_info={"memory_id": memory_id}
+                    additional_info={"memory_ids": memory_ids}
                 )
             except Exception as e:
                 self._cleanup_connection()
-                self.logger.log_error(f"LongTermMemory.remove_by_id failed: {e}", error_type="LongTermMemoryError")
+                self.logger.log_error(f"LongTermMemory.remove_by_ids failed: {e}", error_type="LongTermMemoryError")
                 raise
 
-    def remove_by_ids(self, memory_ids: list):
-        """Remove multiple memories by their database IDs."""
-        for mid in memory_ids:
-            self.remove_by_id(mid)
+class MemoryService:
+    """
+    Process-wide owner of long-term memory for one database file.
+
+    Long-term memory is sharded by session: each session_id has exactly one LongTermMemory
+    (and one FAISS index) no matter how many DialogueContextManagers serve it, and all
+    shards share a single SQLite connection. Shards held by a DialogueContextManager stay
+    open; idle ones are kept in an LRU of memory.max_open_sessions and closed (index
+    persisted to disk) when evicted. query_user() recalls across a user's recent sessions.
+    """
+    _instances: Dict[str, "MemoryService"] = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls, db_path: str, embedding_dim: int, logger: Optional[object] = None, config_manager: Optional[object] = None) -> "MemoryService":
+        """Return the service for db_path, creating it on first use."""
+        key = db_path if db_path == ":memory:" else os.path.abspath(db_path)
+        with cls._instances_lock:
+            service = cls._instances.get(key)
+            if service is None or service._closed:
+                service = cls(db_path, embedding_dim, logger=logger, config_manager=config_manager)
+                cls._instances[key] = service
+            elif service.embedding_dim != embedding_dim:
+                raise ConfigurationError(
+                    f"MemoryService for {db_path} uses embedding_dim={service.embedding_dim}, requested {embedding_dim}"
+                )
+            return service
+
+    def __init__(self, db_path: str, embedding_dim: int, logger: Optional[object] = None, config_manager: Optional[object] = None, max_open_sessions: int = 64, cross_session_max_sessions: int = 8):
+        if config_manager is not None:
+            try:
+                max_open_sessions = config_manager.get("memory.max_open_sessions", max_open_sessions)
+                cross_session_max_sessions = config_manager.get("memory.cross_session_max_sessions", cross_session_max_sessions)
+            except Exception as e:
+                if logger:
+                    logger.log_error(f"MemoryService failed to get config values: {e}", error_type="MemoryServiceError")
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+        self.db_path = db_path
+        self.embedding_dim = embedding_dim
+        self.logger = logger or Logger.get_instance()
+        self.config_manager = config_manager
+        self.max_open_sessions = max(1, int(max_open_sessions))
+        self.cross_session_max_sessions = max(1, int(cross_session_max_sessions))
+        self.connection = sqlite3.connect(db_path, check_same_thread=False, timeout=10.0)
+        self._write_lock = threading.Lock()  # shared by every shard's writes on self.connection
+        self._lock = threading.RLock()
+        self._shards: "OrderedDict[str, LongTermMemory]" = OrderedDict()
+        self._refcounts: Dict[str, int] = {}
+        self._closed = False
+        self.logger.record_event(
+            event_type="memory_service_init",
+            message=f"MemoryService opened {db_path}",
+            level="info",
+            additional_info={"max_open_sessions": self.max_open_sessions, "embedding_dim": embedding_dim}
+        )
+
+    def acquire(self, session_id: str, **kwargs) -> LongTermMemory:
+        """
+        Return the session's shard and keep it open until release(). Keyword arguments
+        (retention_days, top_k, logging_level, ...) apply only when the shard is created.
+        """
+        with self._lock:
+            shard = self._shard(session_id, **kwargs)
+            self._refcounts[session_id] = self._refcounts.get(session_id, 0) + 1
+            return shard
+
+    def release(self, session_id: str):
+        """Drop one hold on a shard; its writes are committed and its index persisted."""
+        with self._lock:
+            shard = self._shards.get(session_id)
+            if session_id in self._refcounts:
+                self._refcounts[session_id] -= 1
+                if self._refcounts[session_id] <= 0:
+                    del self._refcounts[session_id]
+            if shard is not None:
+                shard.flush()
+                shard.persist_index()
+            self._evict_idle()
+
+    def session(self, session_id: str, **kwargs) -> LongTermMemory:
+        """Return the session's shard without holding it open."""
+        with self._lock:
+            shard = self._shard(session_id, **kwargs)
+            self._evict_idle()
+            return shard
+
+    def _shard(self, session_id: str, **kwargs) -> LongTermMemory:
+        # Caller holds self._lock
+        if self._closed:
+            raise RuntimeError(f"MemoryService for {self.db_path} is closed")
+        shard = self._shards.get(session_id)
+        if shard is None:
+            shard = LongTermMemory(
+                db_path=self.db_path,
+                embedding_dim=self.embedding_dim,
+                session_id=session_id,
+                logger=self.logger,
+                config_manager=self.config_manager,
+                db_conn=self.connection,
+                write_lock=self._write_lock,
+                **kwargs
+            )
+            self._shards[session_id] = shard
+        self._shards.move_to_end(session_id)
+        return shard
+
+    def _evict_idle(self):
+        # Caller holds self._lock; least recently used shards that nobody holds are closed first
+        excess = len(self._shards) - self.max_open_sessions
+        if excess <= 0:
+            return
+        for session_id in [sid for sid in self._shards if sid not in self._refcounts][:excess]:
+            self._shards.pop(session_id).close()
+            self.logger.record_event(
+                event_type="memory_service_shard_evicted",
+                message=f"Closed idle memory shard for session {session_id}",
+                level="debug",
+                additional_info={"open_shards": len(self._shards)}
+            )
+
+    def user_sessions(self, user_id: str, limit: Optional[int] = None) -> List[str]:
+        """Session ids with rows from user_id, most recently written first."""
+        with self._lock:
+            self.flush()
+            rows = self.connection.execute(
+                "SELECT session_id FROM conversations WHERE user_id = ? GROUP BY session_id ORDER BY MAX(id) DESC LIMIT ?",
+                (user_id, limit or self.cross_session_max_sessions)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def query_user(self, query_embedding: Optional[np.ndarray], user_id: str, top_k: int = 5, min_timestamp_unix: Optional[float] = None, session_ids: Optional[List[str]] = None, query_text: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Cross-session recall: search the user's most recent sessions (memory.cross_session_max_sessions,
+        or the given session_ids) and merge their results by exact distance, or by fused
+        score when query_text makes it a hybrid query.
+        """
+        if session_ids is None:
+            session_ids = self.user_sessions(user_id)
+        results = []
+        for session_id in session_ids:
+            shard = self.session(session_id)
+            if query_text is not None:
+                results.extend(shard.hybrid_query(query_text, query_embedding, user_id=user_id, top_k=top_k, min_timestamp_unix=min_timestamp_unix))
+            else:
+                results.extend(shard.query(query_embedding, user_id=user_id, top_k=top_k, min_timestamp_unix=min_timestamp_unix))
+        if query_text is not None:
+            results.sort(key=lambda r: r["score"], reverse=True)
+        else:
+            results.sort(key=lambda r: r["distance"])
+        return results[:top_k]
+
+    def flush(self):
+        """Commit pending writes of every open shard."""
+        with self._lock:
+            for shard in self._shards.values():
+                shard.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "db_path": self.db_path,
+                "open_shards": len(self._shards),
+                "held_shards": len(self._refcounts),
+                "indexed_vectors": sum(shard.faiss_index.ntotal for shard in self._shards.values()),
+            }
+
+    def close(self):
+        """Close every shard and the shared connection; get_instance() will open a new service."""
+        with self._lock:
+            if self._closed:
+                return
+            for shard in self._shards.values():
+                shard.close()
+            self._shards.clear()
+            self._refcounts.clear()
+            self._closed = True
+            try:
+                self.connection.close()
+            except Exception as e:
+                self.logger.log_error(f"MemoryService failed to close connection: {e}", error_type="MemoryServiceError")
+        with MemoryService._instances_lock:
+            key = self.db_path if self.db_path == ":memory:" else os.path.abspath(self.db_path)
+            if MemoryService._instances.get(key) is self:
+                del MemoryService._instances[key]
 
 class MemoryPressureError(Exception):
     """Raised when a message cannot be added due to high RAM usage, even after cleanup attempts."""
     pass
 
+class EmbeddingService:
+    """
+    Turns message text into fixed-size float32 memory embeddings off the request path.
+
+    Misses are queued to a background worker that groups them into micro-batches (up to
+    batch_size texts, waiting at most max_wait_ms for company) so concurrent writers share
+    one encoder call. Results are kept in an LRU cache keyed by the SHA-256 of the text,
+    and identical texts already in flight share a single pending result.
+
+    Sources (memory.embedding_source):
+        - 'auto': the dedicated encoder if memory.embedding_encoder_model is set, otherwise
+          'base_embeddings'
+        - 'encoder': a small dedicated model (e.g. a sentence-transformers checkpoint) loaded
+          with transformers.AutoModel, mean-pooled over its last hidden state
+        - 'base_embeddings': mean of the base model's input-embedding rows for the tokens;
+          a table lookup, no forward pass
+        - 'base_model': a full base-model forward, mean-pooled over the last hidden state
+        - 'hash': deterministic SHA-256 embedding
+    Vectors are truncated or zero-padded to embedding_dim; anything that fails falls back
+    to the hash embedding.
+    """
+    SOURCES = ("auto", "encoder", "base_embeddings", "base_model", "hash")
+
+    def __init__(
+        self,
+        embedding_dim: int = 128,
+        model_manager: Optional[object] = None,
+        logger: Optional[object] = None,
+        config_manager: Optional[object] = None,
+        source: str = "auto",
+        encoder_model: Optional[str] = None,
+        cache_size: int = 4096,
+        batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        max_length: int = 128
+    ):
+        if config_manager is not None:
+            try:
+                source = config_manager.get("memory.embedding_source", source)
+                encoder_model = config_manager.get("memory.embedding_encoder_model", encoder_model)
+                cache_size = config_manager.get("memory.embedding_cache_size", cache_size)
+                batch_size = config_manager.get("memory.embedding_batch_size", batch_size)
+                max_wait_ms = config_manager.get("memory.embedding_max_wait_ms", max_wait_ms)
+                max_length = config_manager.get("memory.embedding_max_length", max_length)
+            except Exception as e:
+                if logger:
+                    logger.log_error(f"EmbeddingService failed to get config values: {e}", error_type="EmbeddingError")
+        if source not in self.SOURCES:
+            if logger:
+                logger.log_error(f"Unknown embedding_source '{source}', using 'auto'", error_type="EmbeddingError")
+            source = "auto"
+        if source == "auto":
+            source = "encoder" if encoder_model else "base_embeddings"
+        self.embedding_dim = embedding_dim
+        self.model_manager = model_manager
+        self.logger = logger
+        self.source = source
+        self.encoder_model = encoder_model
+        self.cache_size = max(0, int(cache_size))
+        self.batch_size = max(1, int(batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.max_length = max(1, int(max_length))
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._pending: Dict[str, Future] = {}
+        self._lock = Lock()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+        self._encoder = None  # (tokenizer, model) for source == 'encoder', loaded lazily by the worker
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed one text, waiting for the micro-batch that carries it."""
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: List[str]) -> List[np.ndarray]:
+        """Embed several texts; all cache misses are submitted together so they share batches."""
+        keys = [self._cache_key(text) for text in texts]
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        waiting = []
+        with self._lock:
+            for i, (key, text) in enumerate(zip(keys, texts)):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    results[i] = cached.copy()
+                    continue
+                if self.source == "hash" or self._closed:
+                    continue
+                future = self._pending.get(key)
+                if future is None:
+                    future = Future()
+                    self._pending[key] = future
+                    self._queue.put((key, text, future))
+                waiting.append((i, future))
+            if waiting:
+                self._ensure_worker()
+        for i, future in waiting:
+            results[i] = future.result().copy()
+        for i, text in enumerate(texts):
+            if results[i] is None:
+                # 'hash' source or service closed: computed inline, cheap enough to skip the queue
+                results[i] = self.hash_embedding(text, self.embedding_dim)
+                self._cache_put(keys[i], results[i].copy())
+        return results
+
+    @property
+    def semantic(self) -> bool:
+        """False when every embedding would come from the hash fallback (no encoder or base model)."""
+        if self.source == "hash" or self._closed:
+            return False
+        if self.source == "encoder" and (self._encoder is None or self._encoder[1] is not None):
+            return True
+        return getattr(self.model_manager, 'base_model', None) is not None and getattr(self.model_manager, 'base_tokenizer', None) is not None
+
+    def close(self):
+        """Stop the worker after it drains the queue. Later calls embed inline with the hash fallback."""
+        with self._lock:
+            self._closed = True
+            worker = self._worker
+            self._queue.put(None)
+        if worker is not None and worker is not threading.current_thread():
+            worker.join(timeout=5.0)
+
+    @staticmethod
+    def hash_embedding(text: str, embedding_dim: int) -> np.ndarray:
+        hash_bytes = hashlib.sha256(text.encode('utf-8')).digest()
+        needed = embedding_dim * 4  # 4 bytes per float32
+        full_bytes = (hash_bytes * ((needed // len(hash_bytes)) + 1))[:needed]
+        arr = np.frombuffer(full_bytes, dtype=np.uint8).astype(np.float32)
+        arr = arr[:embedding_dim]
+        arr = arr / np.linalg.norm(arr) if np.linalg.norm(arr) > 0 else arr
+        return arr
+
+    @staticmethod
+    def _cache_key(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _cache_put(self, key: str, embedding: np.ndarray):
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            self._cache[key] = embedding
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _ensure_worker(self):
+        # Caller holds self._lock
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="EmbeddingService", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._process_batch(batch)
+
+    def _process_batch(self, batch: List[tuple]):
+        texts = [text for _, text, _ in batch]
+        try:
+            embeddings = self._encode(texts)
+        except Exception as e:
+            if self.logger:
+                self.logger.log_error(f"Batched embedding failed ({self.source}): {e}", error_type="EmbeddingError")
+            embeddings = [None] * len(texts)
+        for (key, text, future), embedding in zip(batch, embeddings):
+            if embedding is None:
+                embedding = self.hash_embedding(text, self.embedding_dim)
+            self._cache_put(key, embedding)
+            with self._lock:
+                self._pending.pop(key, None)
+            future.set_result(embedding)
+
+    def _encode(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Encode a batch; entries left as None fall back to the hash embedding."""
+        if self.source == "encoder":
+            tokenizer, model = self._load_encoder()
+            if model is not None:
+                return self._pooled_hidden_states(tokenizer, model, texts, causal=False)
+        tokenizer = getattr(self.model_manager, 'base_tokenizer', None)
+        model = getattr(self.model_manager, 'base_model', None)
+        if tokenizer is None or model is None or self.source == "hash":
+            return [None] * len(texts)
+        if self.source == "base_model":
+            return self._pooled_hidden_states(tokenizer, model, texts, causal=True)
+        return self._pooled_input_embeddings(tokenizer, model, texts)
+
+    def _load_encoder(self):
+        if self._encoder is None:
+            try:
+                from transformers import AutoModel, AutoTokenizer
+                tokenizer = AutoTokenizer.from_pretrained(self.encoder_model)
+                model = AutoModel.from_pretrained(self.encoder_model).eval()
+                self._encoder = (tokenizer, model)
+                if self.logger:
+                    self.logger.record_event(
+                        event_type="embedding_encoder_loaded",
+                        message=f"Loaded dedicated embedding encoder {self.encoder_model}",
+                        level="info",
+                        additional_info={"hidden_size": getattr(model.config, "hidden_size", None), "embedding_dim": self.embedding_dim}
+                    )
+            except Exception as e:
+                # Don't retry the download on every batch
+                self._encoder = (None, None)
+                self.source = "base_embeddings"
+                if self.logger:
+                    self.logger.log_error(
+                        f"Failed to load embedding encoder {self.encoder_model}, using base model input embeddings: {e}",
+                        error_type="EmbeddingError"
+                    )
+        return self._encoder
+
+    def _tokenize(self, tokenizer, texts: List[str], add_special_tokens: bool) -> List[List[int]]:
+        encoded = tokenizer(list(texts), truncation=True, max_length=self.max_length, add_special_tokens=add_special_tokens)
+        return [list(ids) for ids in encoded['input_ids']]
+
+    def _fit(self, pooled: torch.Tensor, valid: List[bool]) -> List[Optional[np.ndarray]]:
+        pooled = pooled.detach().float().cpu().numpy()
+        if pooled.shape[1] > self.embedding_dim:
+            pooled = pooled[:, :self.embedding_dim]
+        elif pooled.shape[1] < self.embedding_dim:
+            pooled = np.pad(pooled, ((0, 0), (0, self.embedding_dim - pooled.shape[1])))
+        pooled = np.ascontiguousarray(pooled, dtype=np.float32)
+        return [pooled[i].copy() if ok else None for i, ok in enumerate(valid)]
+
+    def _pooled_input_embeddings(self, tokenizer, model, texts: List[str]) -> List[Optional[np.ndarray]]:
+        weight = model.get_input_embeddings().weight
+        ids = self._tokenize(tokenizer, texts, add_special_tokens=False)
+        flat = torch.tensor([t for seq in ids for t in seq], dtype=torch.long, device=weight.device)
+        offsets = torch.tensor([0] + [len(seq) for seq in ids[:-1]], dtype=torch.long, device=weight.device).cumsum(0)
+        with torch.no_grad():
+            pooled = torch.nn.functional.embedding_bag(flat, weight, offsets, mode='mean')
+        return self._fit(pooled, [len(seq) > 0 for seq in ids])
+
+    def _pooled_hidden_states(self, tokenizer, model, texts: List[str], causal: bool) -> List[Optional[np.ndarray]]:
+        ids = self._tokenize(tokenizer, texts, add_special_tokens=not causal)
+        lengths = [len(seq) for seq in ids]
+        longest = max(max(lengths), 1)
+        pad_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else 0
+        device = next(model.parameters()).device
+        # Right padding so real tokens keep their positions; pads are masked out of the mean
+        input_ids = torch.full((len(ids), longest), pad_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(ids), longest), dtype=torch.long)
+        for i, seq in enumerate(ids):
+            input_ids[i, :len(seq)] = torch.tensor(seq, dtype=torch.long)
+            attention_mask[i, :len(seq)] = 1
+        input_ids, attention_mask = input_ids.to(device), attention_mask.to(device)
+        with torch.no_grad():
+            outputs = model(input_ids=input_ids, attention_mask=attention_mask, output_hidden_states=True)
+        hidden = getattr(outputs, 'last_hidden_state', None)
+        if hidden is None:
+            hidden = outputs.hidden_states[-1]
+        mask = attention_mask.unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+        return self._fit(pooled, [length > 0 for length in lengths])
+
 class DialogueContextManager:
     """
     Orchestrates short-term and long-term memory for a session, with optional RAM health checks.
@@ -598,9 +1927,12 @@ class DialogueContextManager:
         long_term_retention_days: Optional[int] = None,
         long_term_top_k: int = 5,
         memory_logging_level: str = "info",
-        model_manager: Optional[object] = None
+        model_manager: Optional[object] = None,
+        memory_service: Optional[MemoryService] = None
     ):
         self.config_manager = config_manager
+        self.cross_session_recall = False
+        self.hybrid_retrieval = True
         # Use config_manager for all memory parameters if provided
         if config_manager is not None:
             try:
@@ -611,6 +1943,8 @@ class DialogueContextManager:
                 long_term_retention_days = config_manager.get("memory.long_term_retention_days", long_term_retention_days)
                 long_term_top_k = config_manager.get("memory.long_term_top_k", long_term_top_k)
                 memory_logging_level = config_manager.get("memory.memory_logging_level", memory_logging_level)
+                self.cross_session_recall = config_manager.get("memory.cross_session_recall", False)
+                self.hybrid_retrieval = config_manager.get("memory.hybrid_retrieval", True)
             except Exception as e:
                 if logger:
                     logger.log_error(f"DialogueContextManager failed to get config values: {e}", error_type="DialogueContextManagerError")
@@ -627,24 +1961,31 @@ class DialogueContextManager:
             expiry_seconds=short_term_expiry_seconds,
             logging_level=memory_logging_level
         )
-        # Shared DB connection for all LongTermMemory instances for this db_path
-        self._db_conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10.0)
-        self.long_term = LongTermMemory(
-            db_path=self.db_path,
-            embedding_dim=self.embedding_dim,
-            session_id=self.session_id,
-            logger=self.logger,
-            config_manager=config_manager,
+        # Long-term memory is a shard of the process-wide service for this db_path: one
+        # connection and one index per session, however many managers serve it
+        self.memory_service = memory_service or MemoryService.get_instance(
+            self.db_path, self.embedding_dim, logger=self.logger, config_manager=config_manager
+        )
+        self._db_conn = self.memory_service.connection
+        self.long_term = self.memory_service.acquire(
+            self.session_id,
             retention_days=long_term_retention_days,
             top_k=long_term_top_k,
-            logging_level=memory_logging_level,
-            db_conn=self._db_conn
+            logging_level=memory_logging_level
         )
+        self._released = False
         self.model_manager = model_manager
+        self.embedding_service = EmbeddingService(
+            embedding_dim=self.embedding_dim,
+            model_manager=model_manager,
+            logger=self.logger,
+            config_manager=config_manager
+        )
+        self._custom_embedding_fn = embedding_fn is not None
         if embedding_fn is not None:
             self.embedding_fn = embedding_fn
         else:
-            self.embedding_fn = self._embedding_from_base_model_with_fallback
+            self.embedding_fn = self.embedding_service.embed
         self.ram_manager = None
         if config_manager is not None and hasattr(RAMManager, 'check_memory_health'):
             try:
@@ -653,42 +1994,12 @@ class DialogueContextManager:
                 self.logger.log_error(f"DialogueContextManager: RAMManager init failed: {e}", error_type="RAMManagerInitError")
 
     def __del__(self):
-        if hasattr(self, '_db_conn') and self._db_conn:
+        if hasattr(self, 'memory_service') and not getattr(self, '_released', True):
             try:
-                self._db_conn.close()
+                self._released = True
+                self.memory_service.release(self.session_id)
             except Exception as e:
-                self.logger.log_error(f"Failed to close database connection: {e}", error_type="DialogueContextManagerError")
-
-    def _embedding_from_base_model_with_fallback(self, text: str) -> np.ndarray:
-        # Try to use base model for embedding, fallback to hash-based if unavailable
-        try:
-            if self.model_manager is not None and hasattr(self.model_manager, 'base_model') and hasattr(self.model_manager, 'base_tokenizer'):
-                tokenizer = self.model_manager.base_tokenizer
-                model = self.model_manager.base_model
-                inputs = tokenizer(text, return_tensors='pt', truncation=True, max_length=128)
-                with torch.no_grad():
-                    outputs = model(**inputs, output_hidden_states=True)
-                last_hidden = outputs.last_hidden_state  # (batch, seq, hidden)
-                pooled = last_hidden.mean(dim=1).squeeze().cpu().numpy()
-                if pooled.shape[0] > self.embedding_dim:
-                    pooled = pooled[:self.embedding_dim]
-                elif pooled.shape[0] < self.embedding_dim:
-                    pooled = np.pad(pooled, (0, self.embedding_dim - pooled.shape[0]))
-                return pooled.astype(np.float32)
-        except Exception as e:
-            if self.logger:
-                self.logger.log_error(f"Base model embedding failed: {e}", error_type="EmbeddingError")
-        # Fallback: hash-based deterministic embedding
-        return self._hash_based_embedding(text)
-
-    def _hash_based_embedding(self, text: str) -> np.ndarray:
-        hash_bytes = hashlib.sha256(text.encode('utf-8')).digest()
-        needed = self.embedding_dim * 4  # 4 bytes per float32
-        full_bytes = (hash_bytes * ((needed // len(hash_bytes)) + 1))[:needed]
-        arr = np.frombuffer(full_bytes, dtype=np.uint8).astype(np.float32)
-        arr = arr[:self.embedding_dim]
-        arr = arr / np.linalg.norm(arr) if np.linalg.norm(arr) > 0 else arr
-        return arr
+                self.logger.log_error(f"Failed to release memory session: {e}", error_type="DialogueContextManagerError")
 
     def _validate_embedding(self, embedding: np.ndarray) -> bool:
         return (
@@ -697,6 +2008,36 @@ class DialogueContextManager:
             and embedding.dtype == np.float32
         )
 
+    def _check_ram_pressure(self):
+        """Prune short-term memory when RAM is nearly exhausted; raises MemoryPressureError if that is not enough."""
+        if self.ram_manager:
+            try:
+                ram_health = self.ram_manager.check_memory_health()
+                if ram_health.get('usage_percentage', 0) > 0.90:
+                    before = len(self.short_term.memory)
+                    self.short_term.clear()  # Attempt to free memory
+                    after = len(self.short_term.memory)
+                    self.logger.record_event(
+                        event_type="ram_usage_high_cleanup",
+                        message=f"RAM usage high, pruned short-term memory from {before} to {after}.",
+                        level="warning"
+                    )
+                    # Re-check RAM
+                    ram_health = self.ram_manager.check_memory_health()
+                    if ram_health.get('usage_percentage', 0) > 0.90:
+                        self.logger.record_event(
+                            event_type="ram_usage_still_high",
+                            message="RAM usage still high after cleanup, skipping message.",
+                            level="error"
+                        )
+                        raise MemoryPressureError("RAM usage critically high, message not added.")
+            except Exception as e:
+                self.logger.record_event(
+                    event_type="ram_health_check_failed",
+                    message=f"RAM health check failed: {e}",
+                    level="warning"
+                )
+
     def add_message(self, role: str, content: str, user_id: str = "default", vibe_profile: Optional[VibeProfile] = None, origin: Optional[str] = None, message_index: Optional[int] = None, parent_message_id: Optional[str] = None, root_message_id: Optional[str] = None):
         """
         Transactionally add a message to both short-term and long-term memory.
@@ -705,33 +2046,7 @@ class DialogueContextManager:
         Optionally stores a VibeProfile with the message for empathic context.
         """
         try:
-            if self.ram_manager:
-                try:
-                    ram_health = self.ram_manager.check_memory_health()
-                    if ram_health.get('usage_percentage', 0) > 0.90:
-                        before = len(self.short_term.memory)
-                        self.short_term.clear()  # Attempt to free memory
-                        after = len(self.short_term.memory)
-                        self.logger.record_event(
-                            event_type="ram_usage_high_cleanup",
-                            message=f"RAM usage high, pruned short-term memory from {before} to {after}.",
-                            level="warning"
-                        )
-                        # Re-check RAM
-                        ram_health = self.ram_manager.check_memory_health()
-                        if ram_health.get('usage_percentage', 0) > 0.90:
-                            self.logger.record_event(
-                                event_type="ram_usage_still_high",
-                                message="RAM usage still high after cleanup, skipping message.",
-                                level="error"
-                            )
-                            raise MemoryPressureError("RAM usage critically high, message not added.")
-                except Exception as e:
-                    self.logger.record_event(
-                        event_type="ram_health_check_failed",
-                        message=f"RAM health check failed: {e}",
-                        level="warning"
-                    )
+            self._check_ram_pressure()
             embedding = self.embedding_fn(content)
             if not self._validate_embedding(embedding):
                 if self.logger:
@@ -778,6 +2093,75 @@ class DialogueContextManager:
             if self.error_manager:
                 self.error_manager.record_error(e, error_type="MemoryConsistencyError")
 
+    def add_messages(self, messages: List[Dict[str, Any]]) -> int:
+        """
+        Bulk variant of add_message for imports and dream/meditation replay. Each item takes
+        add_message's keyword arguments (role and content required). Embeddings are computed
+        in one batch and long-term rows are written with a single add_many; on failure the
+        short-term additions are rolled back. Returns the number of messages stored.
+        """
+        if not messages:
+            return 0
+        added_short_term = 0
+        try:
+            self._check_ram_pressure()
+            contents = [m["content"] for m in messages]
+            if self.embedding_fn == self.embedding_service.embed:
+                embeddings = self.embedding_service.embed_many(contents)
+            else:
+                embeddings = [self.embedding_fn(content) for content in contents]
+            long_term_msgs = []
+            for m, embedding in zip(messages, embeddings):
+                if not self._validate_embedding(embedding):
+                    if self.logger:
+                        self.logger.log_error("Invalid embedding generated. Skipping message.", error_type="EmbeddingError")
+                    continue
+                user_id = m.get("user_id", "default")
+                origin = m.get("origin") if m.get("origin") is not None else "dialogue_manager"
+                vibe_profile = m.get("vibe_profile")
+                msg = {
+                    "role": m["role"],
+                    "content": m["content"],
+                    "embedding": embedding,
+                    "timestamp_unix": time.time(),
+                    "user_id": user_id,
+                    "session_id": self.session_id,
+                    "origin": origin,
+                }
+                if vibe_profile is not None:
+                    msg["vibe_profile"] = vibe_profile.to_dict() if hasattr(vibe_profile, "to_dict") else vibe_profile
+                self.short_term.add_message(
+                    role=m["role"],
+                    content=m["content"],
+                    vibe_profile=vibe_profile,
+                    session_id=self.session_id,
+                    user_id=user_id,
+                    origin=origin,
+                    message_index=m.get("message_index"),
+                    parent_message_id=m.get("parent_message_id"),
+                    root_message_id=m.get("root_message_id"),
+                    embedding=embedding,
+                )
+                added_short_term += 1
+                long_term_msgs.append(msg)
+            try:
+                self.long_term.add_many(long_term_msgs)
+            except Exception as e:
+                for _ in range(added_short_term):
+                    self.short_term.remove_last()
+                if self.logger:
+                    self.logger.log_error(f"LongTermMemory.add_many failed, rolled back ShortTermMemory: {e}", error_type="MemoryConsistencyError")
+                raise
+            return len(long_term_msgs)
+        except MemoryPressureError:
+            raise
+        except Exception as e:
+            if self.logger:
+                self.logger.log_error(f"DialogueContextManager.add_messages failed: {e}", error_type="MemoryConsistencyError")
+            if self.error_manager:
+                self.error_manager.record_error(e, error_type="MemoryConsistencyError")
+            return 0
+
     def get_short_term_context(self, include_embeddings: bool = False) -> List[Dict[str, Any]]:
         """
         Return short-term memory context. If include_embeddings is True, includes embedding field.
@@ -794,14 +2178,36 @@ class DialogueContextManager:
                 self.error_manager.record_error(e, error_type="DialogueContextManagerError")
             return []
 
-    def get_long_term_context(self, user_id: Optional[str] = None, query_embedding: Optional[np.ndarray] = None, top_k: int = 5) -> List[Dict[str, Any]]:
+    def get_long_term_context(self, user_id: Optional[str] = None, query_embedding: Optional[np.ndarray] = None, top_k: int = 5, cross_session: Optional[bool] = None, query_text: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Recall long-term memories similar to query_embedding and/or query_text (default: the
+        latest short-term message). With memory.hybrid_retrieval, text queries are answered
+        by LongTermMemory.hybrid_query; hash-fallback embeddings carry no meaning, so they
+        are left out and recall is lexical. With cross_session (default
+        memory.cross_session_recall) and a user_id, the user's other recent sessions are
+        searched as well.
+        """
         try:
-            if query_embedding is None:
-                stm = self.short_term.get(exclude_fields=[])
-                if stm:
-                    query_embedding = stm[-1]["embedding"]
-                else:
+            if query_embedding is None and query_text is None:
+                latest = self.short_term.latest(exclude_fields=["_timestamp_unix"])
+                if latest is None:
+                    return []
+                query_embedding = latest.get("embedding")
+                query_text = latest.get("content") if self.hybrid_retrieval else None
+                if query_embedding is None and not query_text:
                     return []
+            if cross_session is None:
+                cross_session = self.cross_session_recall
+            if self.hybrid_retrieval and query_text:
+                if not (self._custom_embedding_fn or self.embedding_service.semantic):
+                    query_embedding = None
+                if cross_session and user_id:
+                    return self.memory_service.query_user(query_embedding, user_id=user_id, top_k=top_k, query_text=query_text)
+                return self.long_term.hybrid_query(query_text, query_embedding, user_id=user_id, top_k=top_k)
+            if query_embedding is None:
+                return []
+            if cross_session and user_id:
+                return self.memory_service.query_user(query_embedding, user_id=user_id, top_k=top_k)
             return self.long_term.query(query_embedding, user_id=user_id, top_k=top_k)
         except Exception as e:
             if self.logger:
@@ -831,12 +2237,12 @@ class DialogueContextManager:
     def forward(self, input_message: str, role: str = "user", user_id: str = "default") -> np.ndarray:
         try:
             self.add_message(role, input_message, user_id)
-            stm = self.short_term.get(exclude_fields=[])
+            stm = self.short_term.get(exclude_fields=["_timestamp_unix"])
             # Only use messages with valid embeddings
             valid_stm = [msg for msg in stm if self._validate_embedding(msg.get("embedding"))]
             short_term_emb = np.stack([msg["embedding"] for msg in valid_stm]) if valid_stm else np.empty((0, self.embedding_dim), dtype=np.float32)
             query_emb = short_term_emb[-1] if short_term_emb.shape[0] > 0 else self.embedding_fn(input_message)
-            long_term_msgs = self.get_long_term_context(user_id, query_emb)
+            long_term_msgs = self.get_long_term_context(user_id, query_emb, query_text=input_message)
             valid_ltm = [msg for msg in long_term_msgs if self._validate_embedding(msg.get("embedding"))]
             if len(valid_ltm) < len(long_term_msgs):
                 self.logger.record_event(
@@ -863,11 +2269,14 @@ class DialogueContextManager:
 
     def close(self):
         try:
-            if hasattr(self, '_db_conn') and self._db_conn:
-                self._db_conn.close()
+            if hasattr(self, 'embedding_service') and self.embedding_service:
+                self.embedding_service.close()
+            if hasattr(self, 'memory_service') and not self._released:
+                self._released = True
+                self.memory_service.release(self.session_id)
                 self.logger.record_event(
                     event_type="dialogue_context_manager_closed",
-                    message="DialogueContextManager database connection closed.",
+                    message="DialogueContextManager released its long-term memory session.",
                     level="info"
                 )
         except Exception as e:
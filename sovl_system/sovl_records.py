@@ -4,7 +4,6 @@ import time
 from dataclasses import dataclass, field
 from threading import Lock, RLock
 from sovl_config import ConfigManager
-from sovl_utils import NumericalGuard, synchronized
 
 """
 Module for error record management and bridging, decoupled from other modules to avoid circular dependencies.
@@ -3,6 +3,7 @@ import torch.nn as nn
 import torch.nn.functional as F
 from typing import List, Optional, Tuple, Union, Dict, Any, Callable
 from collections import defaultdict, deque
+from collections.abc import MutableMapping
 import time
 import traceback
 from threading import Lock
@@ -20,10 +21,18 @@ from sovl_utils import check_model_health as util_check_model_health, calculate_
 import queue
 import numpy as np
 import os
-import pickle
+import shutil
 import hashlib
 import json
 
+try:
+    import faiss  # Optional: semantic nearest-token fallback
+except ImportError:
+    faiss = None
+
+# Bump when fallback strategies change so stale token-map indexes are ignored
+TOKEN_MAP_INDEX_VERSION = 2
+
 # Centralized handler for scaffold errors and recovery.
 class ScaffoldErrorManager:
     """Centralized error handling for scaffold operations."""
@@ -94,6 +103,275 @@ def scaffold_operation(operation_name: str):
         return wrapper
     return decorator
 
+# Compact CSR-style storage for base-token -> scaffold-token mappings.
+class CompactTokenMap(MutableMapping):
+    """
+    Token map stored as numpy arrays instead of one Python dict per base token.
+
+    Scaffold ids for base id ``b`` live in ``ids[offsets[b]:offsets[b + 1]]``; confidence,
+    weight and strategy code are per-row arrays. Item access returns a copy of the row as
+    a dict so existing mapping-style callers keep working, while ``lookup`` and
+    ``dense_arrays`` work on the arrays directly. Writes are staged in a small pending dict
+    and folded into the arrays on the next bulk read; ``revision`` changes whenever the
+    folded ids do.
+    """
+
+    STRATEGY_NONE = 0
+
+    def __init__(self, unk_id: int):
+        self.unk_id = unk_id if unk_id is not None else 0
+        self.strategies: List[str] = ['']
+        self._strategy_codes: Dict[str, int] = {'': self.STRATEGY_NONE}
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.confidence = np.zeros(0, dtype=np.float32)
+        self.weight = np.zeros(0, dtype=np.float32)
+        self.strategy = np.zeros(0, dtype=np.uint8)
+        self.present = np.zeros(0, dtype=bool)
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self.revision = 0
+
+    @classmethod
+    def from_dict(cls, mapping: Dict[int, Dict[str, Any]], unk_id: int) -> 'CompactTokenMap':
+        token_map = cls(unk_id)
+        token_map._pending = dict(mapping)
+        token_map.compact()
+        return token_map
+
+    def strategy_code(self, name: str) -> int:
+        code = self._strategy_codes.get(name)
+        if code is None:
+            code = len(self.strategies)
+            self.strategies.append(name)
+            self._strategy_codes[name] = code
+        return code
+
+    def compact(self) -> None:
+        """Fold pending writes into the CSR arrays."""
+        with self._lock:
+            if not self._pending:
+                return
+            pending = {int(b): self._normalise(e) for b, e in self._pending.items() if isinstance(b, (int, np.integer)) and b >= 0}
+            old_size = len(self.present)
+            size = max(old_size, max(pending, default=-1) + 1)
+            old_counts = np.diff(self.offsets)
+            overridden = np.zeros(size, dtype=bool)
+            overridden[list(pending)] = True
+            kept = self.present & ~overridden[:old_size]
+            counts = np.zeros(size, dtype=np.int64)
+            counts[:old_size] = np.where(kept, old_counts, 0)
+            for b, row in pending.items():
+                counts[b] = len(row['ids'])
+            offsets = np.zeros(size + 1, dtype=np.int64)
+            np.cumsum(counts, out=offsets[1:])
+            ids = np.empty(int(offsets[-1]), dtype=np.int64)
+            # Copy surviving rows in one vectorised move, then write the pending rows
+            old_rows = np.repeat(np.arange(old_size), old_counts)
+            moved = kept[old_rows]
+            new_positions = offsets[old_rows] + (np.arange(len(self.ids)) - self.offsets[old_rows])
+            ids[new_positions[moved]] = self.ids[moved]
+            confidence = np.zeros(size, dtype=np.float32)
+            weight = np.ones(size, dtype=np.float32)
+            strategy = np.zeros(size, dtype=np.uint8)
+            present = np.zeros(size, dtype=bool)
+            confidence[:old_size] = self.confidence
+            weight[:old_size] = self.weight
+            strategy[:old_size] = self.strategy
+            present[:old_size] = self.present
+            for b, row in pending.items():
+                ids[offsets[b]:offsets[b + 1]] = row['ids']
+                confidence[b] = row['confidence']
+                weight[b] = row['weight']
+                strategy[b] = self.strategy_code(row['strategy'])
+                present[b] = True
+            self.offsets, self.ids = offsets, ids
+            self.confidence, self.weight, self.strategy, self.present = confidence, weight, strategy, present
+            self._pending = {}
+            self.revision += 1
+
+    def _normalise(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        weight = float(entry.get('weight', 1.0))
+        return {
+            'ids': [int(i) for i in (entry.get('ids') or [self.unk_id])],
+            'weight': weight,
+            'confidence': float(entry.get('confidence', weight)),
+            'strategy': entry.get('strategy') or ''
+        }
+
+    def _row(self, base_id: int) -> Dict[str, Any]:
+        entry = {
+            'ids': self.ids[self.offsets[base_id]:self.offsets[base_id + 1]].tolist(),
+            'weight': float(self.weight[base_id]),
+            'confidence': float(self.confidence[base_id])
+        }
+        if self.strategy[base_id] != self.STRATEGY_NONE:
+            entry['strategy'] = self.strategies[self.strategy[base_id]]
+        return entry
+
+    def lookup(self, base_ids: np.ndarray) -> Dict[str, np.ndarray]:
+        """Map an array of base ids in one pass.
+
+        Returns a dict with the flattened scaffold ids, per-token id counts, confidence,
+        strategy codes and an unk flag. Unknown base ids map to [unk] with zero confidence.
+        """
+        self.compact()
+        base_ids = np.asarray(base_ids, dtype=np.int64)
+        known = (base_ids >= 0) & (base_ids < len(self.present))
+        known[known] = self.present[base_ids[known]]
+        rows = np.where(known, base_ids, 0)
+        starts = np.where(known, self.offsets[rows], 0)
+        counts = np.where(known, self.offsets[np.minimum(rows + 1, len(self.offsets) - 1)] - starts, 1)
+        total = int(counts.sum())
+        token_index = np.repeat(np.arange(len(base_ids)), counts)
+        within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        flat_ids = np.where(
+            known[token_index],
+            self.ids[np.repeat(starts, counts) + within] if total and len(self.ids) else self.unk_id,
+            self.unk_id
+        )
+        first_ids = flat_ids[np.cumsum(counts) - counts] if total else np.zeros(0, dtype=np.int64)
+        return {
+            'ids': flat_ids,
+            'counts': counts,
+            'confidence': np.where(known, self.confidence[rows] if len(self.confidence) else 0.0, 0.0).astype(np.float32),
+            'strategy': np.where(known, self.strategy[rows] if len(self.strategy) else 0, self.STRATEGY_NONE),
+            'unk': (counts == 1) & (first_ids == self.unk_id)
+        }
+
+    def first_ids(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the first scaffold id and id count of every present row."""
+        self.compact()
+        rows = np.flatnonzero(self.present)
+        counts = self.offsets[rows + 1] - self.offsets[rows]
+        first = np.where(counts > 0, self.ids[np.minimum(self.offsets[rows], max(len(self.ids) - 1, 0))] if len(self.ids) else -1, -1)
+        return first, counts
+
+    def dense_arrays(self, unk_id: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (ids, weights) arrays of shape (rows, max_ids) built straight from the CSR arrays.
+
+        Missing rows point at ``unk_id`` with weight 1; a row with several ids weights each
+        id equally.
+        """
+        unk_id = self.unk_id if unk_id is None else unk_id
+        with self._lock:
+            self.compact()
+            counts = np.where(self.present, np.diff(self.offsets), 0)
+            size = max(len(counts), 1)
+            max_ids = max(int(counts.max(initial=0)), 1)
+            dense_ids = np.full((size, max_ids), unk_id, dtype=np.int64)
+            dense_weights = np.zeros((size, max_ids), dtype=np.float32)
+            dense_weights[:, 0] = 1.0
+            rows = np.repeat(np.arange(len(counts)), counts)
+            starts = self.offsets[:-1]
+            columns = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+            dense_ids[rows, columns] = self.ids[np.repeat(starts, counts) + columns]
+            mapped = counts > 0
+            dense_weights[np.flatnonzero(mapped), 0] = 0.0
+            dense_weights[rows, columns] = (1.0 / counts[rows]).astype(np.float32)
+        return dense_ids, dense_weights
+
+    def raise_weights(self, base_ids: np.ndarray, value: float) -> None:
+        """Raise the weight of every known base id to at least ``value``."""
+        with self._lock:
+            self.compact()
+            base_ids = np.asarray(base_ids, dtype=np.int64)
+            base_ids = base_ids[(base_ids >= 0) & (base_ids < len(self.present))]
+            base_ids = base_ids[self.present[base_ids]]
+            np.maximum.at(self.weight, base_ids, np.float32(value))
+
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.offsets, self.ids, self.confidence, self.weight, self.strategy, self.present))
+
+    def __getitem__(self, base_id: int) -> Dict[str, Any]:
+        """Return a copy of the row. Edits to it do not reach the map; assign the entry back."""
+        if not isinstance(base_id, (int, np.integer)):
+            raise KeyError(base_id)
+        with self._lock:
+            if base_id in self._pending:
+                entry = self._normalise(self._pending[base_id])
+                if not entry['strategy']:
+                    del entry['strategy']
+                return entry
+            if 0 <= base_id < len(self.present) and self.present[base_id]:
+                return self._row(base_id)
+        return {'ids': [self.unk_id], 'weight': 1.0, 'confidence': 0.0}
+
+    def __setitem__(self, base_id: int, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._pending[int(base_id)] = entry
+
+    def __delitem__(self, base_id: int) -> None:
+        with self._lock:
+            self.compact()
+            if not (0 <= base_id < len(self.present) and self.present[base_id]):
+                raise KeyError(base_id)
+            self.present[base_id] = False
+            self.revision += 1
+
+    def __contains__(self, base_id: object) -> bool:
+        if not isinstance(base_id, (int, np.integer)):
+            return False
+        with self._lock:
+            return base_id in self._pending or (0 <= base_id < len(self.present) and bool(self.present[base_id]))
+
+    def __iter__(self):
+        self.compact()
+        return iter(np.flatnonzero(self.present).tolist())
+
+    def __len__(self) -> int:
+        self.compact()
+        return int(self.present.sum())
+
+    def clear(self) -> None:
+        with self._lock:
+            revision = self.revision
+            self.__init__(self.unk_id)
+            self.revision = revision + 1
+
+    ARRAY_FIELDS = ('offsets', 'ids', 'confidence', 'weight', 'strategy', 'present')
+    FORMAT_VERSION = 1
+
+    def save(self, path: str) -> None:
+        """Write the arrays as ``.npy`` files plus a small JSON header into directory ``path``.
+
+        The directory is assembled under a temporary name and renamed into place so that
+        concurrent readers never see a partial cache.
+        """
+        with self._lock:
+            self.compact()
+            tmp_path = f"{path}.tmp{os.getpid()}"
+            os.makedirs(tmp_path, exist_ok=True)
+            for name in self.ARRAY_FIELDS:
+                np.save(os.path.join(tmp_path, f"{name}.npy"), getattr(self, name))
+            with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({'version': self.FORMAT_VERSION, 'unk_id': self.unk_id, 'strategies': self.strategies}, f)
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            # Another process published the same cache first; keep theirs
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            if not os.path.isdir(path):
+                raise
+
+    @classmethod
+    def load(cls, path: str) -> 'CompactTokenMap':
+        """Open a cache written by ``save``. Arrays are memory-mapped copy-on-write, so
+        startup only touches the pages that lookups actually read and in-place updates
+        stay private to this process."""
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get('version') != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported token map cache version: {meta.get('version')}")
+        token_map = cls(meta['unk_id'])
+        token_map.strategies = list(meta['strategies'])
+        token_map._strategy_codes = {name: code for code, name in enumerate(token_map.strategies)}
+        for name in cls.ARRAY_FIELDS:
+            setattr(token_map, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode='c'))
+        if len(token_map.offsets) != len(token_map.present) + 1 or token_map.offsets[-1] != len(token_map.ids):
+            raise ValueError(f"Corrupt token map cache: {path}")
+        return token_map
+
 # Builds and maintains mappings from base-token IDs to scaffold-token IDs.
 class ScaffoldTokenMapper:
     """Handles token mapping between base and scaffold tokenizers."""
@@ -120,7 +398,7 @@ class ScaffoldTokenMapper:
         self.max_tokens_per_mapping = config.get('max_tokens_per_mapping', 3) if config else 3
         self.mapping_similarity_threshold = config.get('mapping_similarity_threshold', 0.7) if config else 0.7
         self.conflict_resolution_strategy = config.get('conflict_resolution_strategy', 'keep_highest_conf') if config else 'keep_highest_conf'
-        self.token_map = defaultdict(lambda: {'ids': [scaffold_tokenizer.unk_token_id], 'weight': 1.0})
+        self.token_map = CompactTokenMap(scaffold_tokenizer.unk_token_id)
         self.embedding_available = self._check_embedding_availability()
         self.config = config or {}
         self.ram_manager = ram_manager
@@ -144,6 +422,14 @@ class ScaffoldTokenMapper:
             self.logger.info("Using embedding-based similarity for token mapping.")
         else:
             self.logger.warning("Falling back to character-based similarity for token mapping.")
+        # Fallback strategy pipeline
+        self._fallback_order = (config.get('token_mapping_fallback_order') if config else None) or list(DEFAULT_FALLBACK_ORDER)
+        self._fallback_strategies = create_fallback_strategies(self._fallback_order)
+        self.normalization_level = self.config.get('normalization_level', 'basic')
+        self.token_map_workers = self.config.get('token_map_workers') or os.cpu_count() or 1
+        self.use_semantic_index = self.config.get('fallback_semantic_index', True)
+        self._scaffold_vocab_index = None
+        self._tokenizer_fingerprints: Dict[Tuple[int, int], str] = {}
         self._initialize_token_maps()
         # Metric tracking for runtime monitoring
         self._mapping_confidences = deque(maxlen=500)
@@ -168,27 +454,6 @@ class ScaffoldTokenMapper:
                 additional_info=self.gpu_manager.get_gpu_usage() if hasattr(self.gpu_manager, 'get_gpu_usage') else {}
             )
         
-        # Fallback strategy pipeline
-        fallback_order = (config.get('token_mapping_fallback_order') if config else None) or [
-            'levenshtein', 'subword', 'char', 'split', 'merge', 'nearest', 'unk'
-        ]
-        self._fallback_strategies = []
-        for strat in fallback_order:
-            if strat == 'levenshtein':
-                self._fallback_strategies.append(LevenshteinStrategy())
-            elif strat == 'subword':
-                self._fallback_strategies.append(SubwordStrategy())
-            elif strat == 'char':
-                self._fallback_strategies.append(CharSimilarityStrategy())
-            elif strat == 'split':
-                self._fallback_strategies.append(SplitStrategy())
-            elif strat == 'merge':
-                self._fallback_strategies.append(MergeStrategy())
-            elif strat == 'nearest':
-                self._fallback_strategies.append(NearestStrategy())
-            elif strat == 'unk':
-                self._fallback_strategies.append(UnkStrategy())
-        
         self.provider = provider
         self.min_token_map_confidence = self.config.get('min_token_map_confidence', 0.5)
         self.max_low_conf_ratio = self.config.get('max_low_conf_ratio', 0.2)
@@ -266,7 +531,8 @@ class ScaffoldTokenMapper:
             'base_tokenizer': self.base_tokenizer,
             'scaffold_tokenizer': self.scaffold_tokenizer,
             'max_tokens_per_mapping': self.max_tokens_per_mapping,
-            'base_id': base_id
+            'base_id': base_id,
+            'vocab_index': self._get_scaffold_vocab_index()
         }
         candidates = []
         for strat in self._fallback_strategies:
@@ -297,21 +563,25 @@ class ScaffoldTokenMapper:
         )
         return [self.scaffold_tokenizer.unk_token_id]
         
-    def _get_token_map_cache_key(self):
-        import hashlib, json
-        base_vocab = self.base_tokenizer.get_vocab()
-        scaffold_vocab = self.scaffold_tokenizer.get_vocab()
-        config_str = json.dumps(self.config, sort_keys=True)
-        key_str = json.dumps(base_vocab, sort_keys=True) + json.dumps(scaffold_vocab, sort_keys=True) + config_str
-        return hashlib.md5(key_str.encode()).hexdigest()
+    def _get_token_map_cache_key(self) -> str:
+        """Key the cache on tokenizer fingerprints and the mapping settings, not on full vocab dumps."""
+        key_parts = {
+            'format_version': CompactTokenMap.FORMAT_VERSION,
+            'base': self._tokenizer_fingerprint(self.base_tokenizer),
+            'scaffold': self._tokenizer_fingerprint(self.scaffold_tokenizer),
+            'mapping': self._mapping_config_fingerprint(),
+            'normalization_level': self.normalization_level,
+        }
+        return hashlib.md5(json.dumps(key_parts, sort_keys=True).encode()).hexdigest()
+
+    def _token_map_cache_path(self) -> str:
+        return os.path.join(self._token_map_cache_dir(), f"token_map_{self._get_token_map_cache_key()}")
 
     def _try_load_token_map_cache(self):
-        cache_key = self._get_token_map_cache_key()
-        cache_path = f"token_map_cache_{cache_key}.pkl"
-        if os.path.exists(cache_path):
+        cache_path = self._token_map_cache_path()
+        if os.path.isdir(cache_path):
             try:
-                with open(cache_path, "rb") as f:
-                    self.token_map = pickle.load(f)
+                self.token_map = CompactTokenMap.load(cache_path)
                 self.logger.record_event(
                     event_type="token_map_cache_loaded",
                     message=f"Loaded token_map from cache: {cache_path}",
@@ -327,15 +597,15 @@ class ScaffoldTokenMapper:
         return False
 
     def _save_token_map_cache(self):
-        cache_key = self._get_token_map_cache_key()
-        cache_path = f"token_map_cache_{cache_key}.pkl"
+        cache_path = self._token_map_cache_path()
         try:
-            with open(cache_path, "wb") as f:
-                pickle.dump(dict(self.token_map), f)
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            self.token_map.save(cache_path)
             self.logger.record_event(
                 event_type="token_map_cache_saved",
                 message=f"Saved token_map to cache: {cache_path}",
-                level="info"
+                level="info",
+                additional_info={"nbytes": self.token_map.nbytes()}
             )
         except Exception as e:
             self.logger.record_event(
@@ -344,6 +614,196 @@ class ScaffoldTokenMapper:
                 level="warning"
             )
 
+    def _token_map_cache_dir(self) -> str:
+        """Directory holding token-map caches and the incremental mapping index."""
+        return os.path.abspath(os.path.expanduser(
+            self.config.get('token_map_cache_dir') or os.path.join('~', '.cache', 'sovl', 'token_maps')
+        ))
+
+    def _tokenizer_fingerprint(self, tokenizer: Any) -> str:
+        """Cheap identity for a tokenizer: its vocabulary files' hashes plus size and special ids.
+
+        Hashing the files on disk is much cheaper than serialising the vocab dict. Tokenizers
+        without backing files fall back to hashing the vocabulary itself.
+        """
+        memo_key = (id(tokenizer), len(tokenizer))
+        cached = self._tokenizer_fingerprints.get(memo_key)
+        if cached is not None:
+            return cached
+        parts = [
+            type(tokenizer).__name__,
+            str(len(tokenizer)),
+            str(getattr(tokenizer, 'vocab_size', '')),
+            str([getattr(tokenizer, f"{name}_token_id", None) for name in ('pad', 'eos', 'unk', 'bos')]),
+        ]
+        file_names = getattr(tokenizer, 'vocab_files_names', None) or {}
+        init_kwargs = getattr(tokenizer, 'init_kwargs', None) or {}
+        files = sorted({
+            path for path in (init_kwargs.get(key) for key in file_names)
+            if isinstance(path, str) and os.path.isfile(path)
+        })
+        if files:
+            for path in files:
+                digest = hashlib.md5()
+                with open(path, "rb") as f:
+                    for block in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(block)
+                parts.append(digest.hexdigest())
+            # Tokens added at runtime are not in the files
+            added = getattr(tokenizer, 'get_added_vocab', None)
+            if callable(added):
+                parts.append(json.dumps(sorted(added().items())))
+        else:
+            parts.append(hashlib.md5(json.dumps(sorted(tokenizer.get_vocab().items())).encode()).hexdigest())
+        fingerprint = hashlib.md5("|".join(parts).encode()).hexdigest()
+        self._tokenizer_fingerprints[memo_key] = fingerprint
+        return fingerprint
+
+    def _mapping_config_fingerprint(self) -> str:
+        """Hash of every setting that changes fallback results for a given token string."""
+        relevant = {
+            'index_version': TOKEN_MAP_INDEX_VERSION,
+            'fallback_order': list(self._fallback_order),
+            'max_tokens_per_mapping': self.max_tokens_per_mapping,
+            'semantic_source': self._semantic_source(),
+        }
+        return hashlib.md5(json.dumps(relevant, sort_keys=True).encode()).hexdigest()
+
+    def _semantic_source(self) -> Optional[str]:
+        """Identity of the embeddings behind semantic nearest-token lookups, or None when unused."""
+        if not self.use_semantic_index or faiss is None or self.scaffold_model is None:
+            return None
+        embeddings = self.scaffold_model.get_input_embeddings().weight
+        name = getattr(getattr(self.scaffold_model, 'config', None), '_name_or_path', type(self.scaffold_model).__name__)
+        return f"{name}:{tuple(embeddings.shape)}"
+
+    def _scaffold_embedding_matrix(self) -> Optional[np.ndarray]:
+        """L2-normalised scaffold input embeddings for the semantic index, if available."""
+        if self._semantic_source() is None:
+            return None
+        try:
+            with torch.no_grad():
+                weight = self.scaffold_model.get_input_embeddings().weight.detach().float().cpu()
+                weight = F.normalize(weight, dim=-1)
+            return weight.numpy()
+        except Exception as e:
+            self.logger.record_event(
+                event_type="scaffold_embedding_index_unavailable",
+                message=f"Semantic nearest-token index disabled: {e}",
+                level="warning"
+            )
+            return None
+
+    def _get_scaffold_vocab_index(self) -> 'ScaffoldVocabIndex':
+        """Build the shared fallback candidate index on first use."""
+        if self._scaffold_vocab_index is None:
+            self._scaffold_vocab_index = ScaffoldVocabIndex(self.scaffold_tokenizer, self._scaffold_embedding_matrix())
+        return self._scaffold_vocab_index
+
+    def _token_map_index_path(self, scaffold_fingerprint: str) -> str:
+        return os.path.join(self._token_map_cache_dir(), f"token_map_index_{scaffold_fingerprint[:16]}.json")
+
+    def _load_token_map_index(self, scaffold_fingerprint: str, config_fingerprint: str) -> Dict[str, List[Any]]:
+        """Load fallback results keyed by normalized token, or an empty index if stale or missing."""
+        path = self._token_map_index_path(scaffold_fingerprint)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if (data.get('version') != TOKEN_MAP_INDEX_VERSION
+                    or data.get('scaffold_fingerprint') != scaffold_fingerprint
+                    or data.get('config_fingerprint') != config_fingerprint):
+                self.logger.record_event(
+                    event_type="token_map_index_stale",
+                    message=f"Ignoring token-map index {path}: scaffold vocabulary or mapping config changed",
+                    level="info"
+                )
+                return {}
+            return data.get('entries', {})
+        except Exception as e:
+            self.logger.record_event(
+                event_type="token_map_index_load_failed",
+                message=f"Failed to load token-map index: {e}",
+                level="warning"
+            )
+            return {}
+
+    def _save_token_map_index(self, index: Dict[str, List[Any]], scaffold_fingerprint: str, config_fingerprint: str) -> None:
+        path = self._token_map_index_path(scaffold_fingerprint)
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    'version': TOKEN_MAP_INDEX_VERSION,
+                    'scaffold_fingerprint': scaffold_fingerprint,
+                    'config_fingerprint': config_fingerprint,
+                    'entries': index
+                }, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            self.logger.record_event(
+                event_type="token_map_index_save_failed",
+                message=f"Failed to save token-map index: {e}",
+                level="warning"
+            )
+
+    def _map_fallback_tokens(self, tokens: List[str]) -> Dict[str, Tuple[List[int], float, str]]:
+        """Run the fallback pipeline for unique normalized tokens, across a process pool when worthwhile."""
+        if not tokens:
+            return {}
+        results: Dict[str, Tuple[List[int], float, str]] = {}
+        items = list(enumerate(tokens))
+        workers = max(1, int(self.token_map_workers or 1))
+        if workers > 1 and len(items) >= 2 * workers:
+            chunk_size = max(1, math.ceil(len(items) / (workers * 8)))
+            chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+            try:
+                from concurrent.futures import ProcessPoolExecutor, as_completed
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_token_map_worker,
+                    initargs=(
+                        self.scaffold_tokenizer, self._fallback_order, self.max_tokens_per_mapping,
+                        self._get_scaffold_vocab_index().embeddings
+                    )
+                ) as pool:
+                    futures = [pool.submit(_map_token_chunk, chunk) for chunk in chunks]
+                    for done, future in enumerate(as_completed(futures), 1):
+                        for _, token, ids, conf, strategy in future.result():
+                            results[token] = (ids, conf, strategy)
+                        self.logger.record_event(
+                            event_type="token_map_progress",
+                            message=f"Token mapping progress: {len(results)}/{len(items)} fallback tokens ({done}/{len(chunks)} chunks)",
+                            level="info"
+                        )
+                return results
+            except Exception as e:
+                self.logger.record_event(
+                    event_type="token_map_parallel_failed",
+                    message=f"Parallel token mapping failed, continuing serially: {e}",
+                    level="warning"
+                )
+        context = {
+            'self': self,
+            'base_tokenizer': self.base_tokenizer,
+            'scaffold_tokenizer': self.scaffold_tokenizer,
+            'max_tokens_per_mapping': self.max_tokens_per_mapping,
+            'vocab_index': self._get_scaffold_vocab_index(),
+        }
+        for i, token in items:
+            if token in results:
+                continue
+            results[token] = run_fallback_strategies(token, self._fallback_strategies, dict(context, base_id=None))
+            if (i + 1) % 1000 == 0 or (i + 1) == len(items):
+                self.logger.record_event(
+                    event_type="token_map_progress",
+                    message=f"Token mapping progress: {i+1}/{len(items)} fallback tokens",
+                    level="info"
+                )
+        return results
+
     def _build_token_map(self):
         if self._try_load_token_map_cache():
             return
@@ -352,46 +812,46 @@ class ScaffoldTokenMapper:
             self.base_tokenizer.eos_token_id: self.scaffold_tokenizer.eos_token_id,
             self.base_tokenizer.unk_token_id: self.scaffold_tokenizer.unk_token_id,
         }
+        scaffold_vocab = self._get_scaffold_vocab_index().vocab
+        scaffold_fingerprint = self._tokenizer_fingerprint(self.scaffold_tokenizer)
+        config_fingerprint = self._mapping_config_fingerprint()
+        index = self._load_token_map_index(scaffold_fingerprint, config_fingerprint)
         base_vocab = self.base_tokenizer.get_vocab()
-        total = len(base_vocab)
-        for i, (base_token, base_id) in enumerate(base_vocab.items()):
+        # Special and exact matches are resolved inline; everything else goes through the index or the pool
+        unresolved: Dict[int, str] = {}
+        for base_token, base_id in base_vocab.items():
             if base_id in special_tokens and special_tokens[base_id] is not None:
                 self.token_map[base_id] = {'ids': [special_tokens[base_id]], 'weight': 1.0, 'confidence': 1.0, 'strategy': 'special'}
                 continue
             normalized = self._normalize_token(base_token)
-            if normalized in self.scaffold_tokenizer.get_vocab():
-                scaf_id = self.scaffold_tokenizer.get_vocab()[normalized]
-                self.token_map[base_id] = {'ids': [scaf_id], 'weight': 1.0, 'confidence': 1.0, 'strategy': 'exact'}
+            if normalized in scaffold_vocab:
+                self.token_map[base_id] = {'ids': [scaffold_vocab[normalized]], 'weight': 1.0, 'confidence': 1.0, 'strategy': 'exact'}
                 continue
-            # Use fallback strategy pipeline for all other cases
-            best_conf = 0.0
-            best_ids = [self.scaffold_tokenizer.unk_token_id]
-            best_strategy = 'unk'
-            for strat in self._fallback_strategies:
-                result = strat.try_map(normalized, {
-                    'self': self,
-                    'base_tokenizer': self.base_tokenizer,
-                    'scaffold_tokenizer': self.scaffold_tokenizer,
-                    'max_tokens_per_mapping': self.max_tokens_per_mapping,
-                    'base_id': base_id,
-                })
-                if result and isinstance(result, tuple):
-                    ids, conf, strategy = result
-                elif result:
-                    ids, conf, strategy = result, 0.5, strat.__class__.__name__
-                else:
-                    continue
-                if conf > best_conf:
-                    best_conf = conf
-                    best_ids = ids
-                    best_strategy = strategy
-            self.token_map[base_id] = {'ids': best_ids, 'weight': best_conf, 'confidence': best_conf, 'strategy': best_strategy}
-            if (i + 1) % 1000 == 0 or (i + 1) == total:
-                self.logger.record_event(
-                    event_type="token_map_progress",
-                    message=f"Token mapping progress: {i+1}/{total}",
-                    level="info"
-                )
+            unresolved[base_id] = normalized
+        missing = sorted({token for token in unresolved.values() if token not in index})
+        computed = self._map_fallback_tokens(missing)
+        for token, (ids, conf, strategy) in computed.items():
+            index[token] = [list(ids), conf, strategy]
+        for base_id, token in unresolved.items():
+            ids, conf, strategy = index[token]
+            self.token_map[base_id] = {'ids': list(ids), 'weight': conf, 'confidence': conf, 'strategy': strategy}
+        self.logger.record_event(
+            event_type="token_map_built",
+            message=(
+                f"Token map built for {len(base_vocab)} base tokens: {len(unresolved)} needed fallback mapping, "
+                f"{len(missing)} unique tokens recomputed, the rest reused from the index"
+            ),
+            level="info",
+            additional_info={
+                "base_vocab_size": len(base_vocab),
+                "fallback_tokens": len(unresolved),
+                "recomputed": len(missing),
+                "workers": self.token_map_workers
+            }
+        )
+        self.token_map.compact()
+        if computed:
+            self._save_token_map_index(index, scaffold_fingerprint, config_fingerprint)
         self._save_token_map_cache()
 
     def _resolve_conflict(self, base_id: int, new_mapping: Dict, existing_mapping: Dict) -> Dict:
@@ -450,6 +910,10 @@ class ScaffoldTokenMapper:
         }
         
         for base_id, scaffold_id in special_token_map.items():
+            current = self.token_map[base_id] if base_id in self.token_map else None
+            # Skip no-op writes so a memory-mapped cache is not copied just to restate them
+            if current is not None and current['ids'] == [scaffold_id] and current['weight'] == 1.0:
+                continue
             self.token_map[base_id] = {'ids': [scaffold_id], 'weight': 1.0}
             
     def _validate_token_maps(self) -> bool:
@@ -457,20 +921,24 @@ class ScaffoldTokenMapper:
         if not self.token_map:
             return False
             
+        first_ids, counts = self.token_map.first_ids()
         required_tokens = ['pad_token_id', 'eos_token_id', 'unk_token_id']
         for token in required_tokens:
-            if not any(t['ids'][0] == getattr(self.scaffold_tokenizer, token) 
-                      for t in self.token_map.values()):
+            if not np.any(first_ids == getattr(self.scaffold_tokenizer, token)):
                 return False
                 
-        if not all(t['ids'] for t in self.token_map.values()):
+        if not np.all(counts > 0):
             return False
             
         return True
         
-    def get_token_map(self) -> Dict:
-        """Get the token map."""
-        return dict(self.token_map)
+    def get_token_map(self) -> CompactTokenMap:
+        """Get the token map.
+
+        Returns the live CompactTokenMap rather than a dict copy; use ``lookup`` or
+        ``dense_arrays`` for bulk reads and ``dict(...)`` only when a snapshot is needed.
+        """
+        return self.token_map
         
     def validate_token_maps(self) -> bool:
         """Validate token maps."""
@@ -479,33 +947,36 @@ class ScaffoldTokenMapper:
     def tokenize_and_map(self, prompt: str) -> Tuple[List[int], List[float]]:
         try:
             start = time.time()
-            base_tokens = self.base_tokenizer.encode(prompt, add_special_tokens=False)
-            scaffold_ids = []
-            weights = []
-            low_conf_count = 0
-            unk_count = 0
-            fallback_count = 0
+            base_tokens = np.asarray(self.base_tokenizer.encode(prompt, add_special_tokens=False), dtype=np.int64)
+            mapped = self.token_map.lookup(base_tokens)
+            confidences = mapped['confidence']
+            scaffold_ids = mapped['ids'].tolist()
+            weights = np.repeat(confidences, mapped['counts']).tolist()
+            # Strategies other than special/exact (and unlabelled rows) count as fallbacks
+            non_fallback = [CompactTokenMap.STRATEGY_NONE] + [
+                self.token_map.strategy_code(name) for name in ('special', 'exact')
+            ]
+            fallback_mask = ~np.isin(mapped['strategy'], non_fallback)
+            low_conf_mask = confidences < self.min_token_map_confidence
+            low_conf_count = int(low_conf_mask.sum())
+            unk_count = int(mapped['unk'].sum())
+            fallback_count = int(fallback_mask.sum())
+            with self._metrics_lock:
+                self._mapping_confidences.extend(confidences.tolist())
+                codes, code_counts = np.unique(mapped['strategy'][fallback_mask], return_counts=True)
+                for code, count in zip(codes.tolist(), code_counts.tolist()):
+                    self._fallback_counts[self.token_map.strategies[code]] += count
             failed_tokens = []
-            for idx, base_id in enumerate(base_tokens):
+            for idx in np.flatnonzero(low_conf_mask).tolist():
+                base_id = int(base_tokens[idx])
                 mapping = self.token_map[base_id]
-                scaffold_ids.extend(mapping['ids'])
-                weights.extend([mapping['confidence']] * len(mapping['ids']))
-                with self._metrics_lock:
-                    self._mapping_confidences.append(mapping['confidence'])
-                    if mapping.get('strategy') and mapping['strategy'] not in ('special', 'exact'):
-                        self._fallback_counts[mapping['strategy']] += 1
-                        fallback_count += 1
-                if mapping['confidence'] < self.min_token_map_confidence:
-                    low_conf_count += 1
-                    failed_tokens.append({
-                        'base_token': self.base_tokenizer.decode([base_id]) if hasattr(self.base_tokenizer, 'decode') else str(base_id),
-                        'scaffold_token': self.scaffold_tokenizer.decode(mapping['ids']) if hasattr(self.scaffold_tokenizer, 'decode') else str(mapping['ids']),
-                        'confidence': mapping['confidence'],
-                        'strategy': mapping.get('strategy', 'unknown')
-                    })
-                if mapping['ids'] == [self.scaffold_tokenizer.unk_token_id]:
-                    unk_count += 1
-            total = len(base_tokens) if base_tokens else 1
+                failed_tokens.append({
+                    'base_token': self.base_tokenizer.decode([base_id]) if hasattr(self.base_tokenizer, 'decode') else str(base_id),
+                    'scaffold_token': self.scaffold_tokenizer.decode(mapping['ids']) if hasattr(self.scaffold_tokenizer, 'decode') else str(mapping['ids']),
+                    'confidence': mapping['confidence'],
+                    'strategy': mapping.get('strategy', 'unknown')
+                })
+            total = len(base_tokens) if len(base_tokens) else 1
             low_conf_ratio = low_conf_count / total
             unk_ratio = unk_count / total
             fallback_ratio = fallback_count / total
@@ -574,12 +1045,7 @@ class ScaffoldTokenMapper:
         try:
             confidence = calculate_token_map_confidence(logits, source=source, logger=self.logger)
             base_tokens = self.base_tokenizer.encode(prompt, add_special_tokens=False)
-            for base_id in base_tokens:
-                if base_id in self.token_map:
-                    self.token_map[base_id]['weight'] = max(
-                        self.token_map[base_id]['weight'],
-                        confidence
-                    )
+            self.token_map.raise_weights(np.asarray(base_tokens, dtype=np.int64), confidence)
             # Synchronize with provider
             if self.provider is not None:
                 self.provider.update_token_map(self.get_token_map(), source="mapper")
@@ -856,6 +1322,23 @@ class CrossAttentionLayer(nn.Module):
         )
         self._attention_chunk_size = self._config.get('attention_chunk_size', 128)
         self._gpu_memory_threshold = self._config.get('gpu_memory_threshold', 0.85)
+        self._attention_backend = self._resolve_attention_backend(self._config.get('attention_backend', 'auto'))
+
+    def _resolve_attention_backend(self, backend: str) -> str:
+        """Map the configured backend ('auto', 'sdpa' or 'chunked') to the one actually used."""
+        has_sdpa = hasattr(F, 'scaled_dot_product_attention')
+        if backend == 'auto':
+            return 'sdpa' if has_sdpa else 'chunked'
+        if backend not in ('sdpa', 'chunked'):
+            raise ValueError(f"Unknown attention backend: {backend}")
+        if backend == 'sdpa' and not has_sdpa:
+            self._logger.record_event(
+                event_type="attention_backend_unavailable",
+                message="scaled_dot_product_attention is not available in this torch build, using chunked attention",
+                level="warning"
+            )
+            return 'chunked'
+        return backend
         
     def _initialize_parameters(self, hidden_size: Optional[int], num_heads: Optional[int]) -> None:
         """Initialize configuration parameters."""
@@ -951,20 +1434,75 @@ class CrossAttentionLayer(nn.Module):
         batch_size: int,
         chunk_size: Optional[int] = None
     ) -> torch.Tensor:
-        """Compute attention scores with dynamic weighting and memory-aware chunking."""
-        chunk_size = chunk_size or self._attention_chunk_size
+        """Compute attention with the configured backend and apply dynamic weighting.
+
+        The SDPA backend runs one fused kernel per call; the chunked backend is used when
+        configured, and as a fallback when the fused call runs out of memory.
+        """
         q = q.view(batch_size, seq_len, self._num_heads, self._head_dim).transpose(1, 2)
-        k = k.view(batch_size, seq_len, self._num_heads, self._head_dim).transpose(1, 2)
-        v = v.view(batch_size, seq_len, self._num_heads, self._head_dim).transpose(1, 2)
+        k = k.view(batch_size, -1, self._num_heads, self._head_dim).transpose(1, 2)
+        v = v.view(batch_size, -1, self._num_heads, self._head_dim).transpose(1, 2)
+        if self._attention_backend == 'sdpa':
+            try:
+                attn_output = self._sdpa_attention(q, k, v, attention_mask)
+            except RuntimeError as e:
+                if 'out of memory' not in str(e).lower():
+                    raise
+                self._logger.record_event(
+                    event_type="cross_attention_sdpa_oom",
+                    message="Fused attention ran out of memory, retrying with memory-aware chunking",
+                    level="warning",
+                    additional_info={"seq_len": seq_len, "batch_size": batch_size}
+                )
+                if torch.cuda.is_available():
+                    torch.cuda.empty_cache()
+                attn_output = self._chunked_attention(q, k, v, attention_mask, seq_len, chunk_size)
+        else:
+            attn_output = self._chunked_attention(q, k, v, attention_mask, seq_len, chunk_size)
+        attn_output = attn_output.transpose(1, 2).contiguous()
+        attn_output = attn_output.view(batch_size, seq_len, self._hidden_size)
+        return attn_output * (self._gate * self._base_weight + self._gate_bias)
+
+    def _combined_attention_mask(self, attention_mask: Optional[torch.Tensor]) -> Optional[torch.Tensor]:
+        """Merge the attention and sparse masks into one boolean keep-mask (True = attend)."""
+        masks = [mask != 0 for mask in (attention_mask, self._sparse_mask) if mask is not None]
+        if not masks:
+            return None
+        return masks[0] if len(masks) == 1 else masks[0] & masks[1]
+
+    def _sdpa_attention(
+        self,
+        q: torch.Tensor,
+        k: torch.Tensor,
+        v: torch.Tensor,
+        attention_mask: Optional[torch.Tensor]
+    ) -> torch.Tensor:
+        """Fused attention over (batch, heads, seq, head_dim) tensors."""
+        # Fold the learned temperature into q so gradients still reach _dynamic_scale
+        q = q * (1.0 / (self._scale * self._dynamic_scale)).to(q.dtype)
+        return F.scaled_dot_product_attention(
+            q, k, v, attn_mask=self._combined_attention_mask(attention_mask), scale=1.0
+        )
+
+    def _chunked_attention(
+        self,
+        q: torch.Tensor,
+        k: torch.Tensor,
+        v: torch.Tensor,
+        attention_mask: Optional[torch.Tensor],
+        seq_len: int,
+        chunk_size: Optional[int] = None
+    ) -> torch.Tensor:
+        """Attention over query chunks with memory-aware chunk sizing."""
+        chunk_size = chunk_size or self._attention_chunk_size
+        keep_mask = self._combined_attention_mask(attention_mask)
         attn_output = torch.zeros_like(q)
         for i in range(0, seq_len, chunk_size):
             end = min(i + chunk_size, seq_len)
             q_chunk = q[:, :, i:end]
             scores = torch.matmul(q_chunk, k.transpose(-2, -1)) / (self._scale * self._dynamic_scale)
-            if attention_mask is not None:
-                scores = scores.masked_fill(attention_mask[:, :, i:end] == 0, float('-inf'))
-            if self._sparse_mask is not None:
-                scores = scores.masked_fill(self._sparse_mask[:, :, i:end] == 0, float('-inf'))
+            if keep_mask is not None:
+                scores = scores.masked_fill(~keep_mask[..., i:end, :], float('-inf'))
             attn_weights = F.softmax(scores, dim=-1)
             attn_output[:, :, i:end] = torch.matmul(attn_weights, v)
             # Memory check and adaptive chunking
@@ -978,28 +1516,44 @@ class CrossAttentionLayer(nn.Module):
                         additional_info={"usage": usage, "threshold": self._gpu_memory_threshold, "old_chunk_size": chunk_size}
                     )
                     chunk_size = max(chunk_size // 2, 32)
-        attn_output = attn_output.transpose(1, 2).contiguous()
-        attn_output = attn_output.view(batch_size, seq_len, self._hidden_size)
-        return attn_output * (self._gate * self._base_weight + self._gate_bias)
+        return attn_output
         
     def _forward(
         self,
         hidden_states: torch.Tensor,
-        cross_states: torch.Tensor,
+        cross_states: Optional[torch.Tensor],
         attention_mask: Optional[torch.Tensor] = None,
         memory_tensors: Optional[torch.Tensor] = None,
         memory_weight: float = 0.0,
         dynamic_factor: Optional[torch.Tensor] = None,
-        use_cache: bool = False
+        use_cache: bool = False,
+        kv_cache: Optional[Dict[str, Any]] = None
     ) -> torch.Tensor:
-        """Forward pass implementation."""
+        """Forward pass implementation.
+
+        With use_cache=True and no cross_states, the scaffold keys/values projected for the
+        prompt are reused so only the new query positions are computed during decoding.
+        kv_cache is the caller's cache for this batch; without it the layer's own cache is used.
+        """
         batch_size, seq_len, _ = hidden_states.shape
+        cache = self._cache if kv_cache is None else kv_cache
         
         hidden_states = self._layer_norm(hidden_states)
         
         q = self._q_proj(hidden_states)
-        k = self._k_proj(cross_states)
-        v = self._v_proj(cross_states)
+        cached_k = cache.get('k')
+        if use_cache and cross_states is None and cached_k is not None and cached_k.size(0) == batch_size:
+            k = cached_k
+            v = cache['v']
+        else:
+            if cross_states is None:
+                raise ValueError("cross_states is required when no cached keys/values are available")
+            k = self._k_proj(cross_states)
+            v = self._v_proj(cross_states)
+            if use_cache:
+                cache['k'] = k
+                cache['v'] = v
+                cache['attention_mask'] = attention_mask
         
         if memory_tensors is not None and memory_weight > 0:
             k = k + memory_tensors[0] * memory_weight
@@ -1012,28 +1566,24 @@ class CrossAttentionLayer(nn.Module):
         if dynamic_factor is not None:
             attn_output = attn_output * dynamic_factor
             
-        if use_cache:
-            self._cache['k'] = k
-            self._cache['v'] = v
-            self._cache['attention_mask'] = attention_mask
-            
         return attn_output
         
     def forward(
         self,
         hidden_states: torch.Tensor,
-        cross_states: torch.Tensor,
+        cross_states: Optional[torch.Tensor],
         attention_mask: Optional[torch.Tensor] = None,
         memory_tensors: Optional[torch.Tensor] = None,
         memory_weight: float = 0.0,
         dynamic_factor: Optional[torch.Tensor] = None,
-        use_cache: bool = False
+        use_cache: bool = False,
+        kv_cache: Optional[Dict[str, Any]] = None
     ) -> torch.Tensor:
         """Forward pass with error handling."""
         try:
             return self._forward(
                 hidden_states, cross_states, attention_mask,
-                memory_tensors, memory_weight, dynamic_factor, use_cache
+                memory_tensors, memory_weight, dynamic_factor, use_cache, kv_cache
             )
         except Exception as e:
             self._logger.record_event(
@@ -1071,6 +1621,9 @@ class CrossAttentionInjector:
         self.allow_lora_post_injection = config_manager.get('controls_config.allow_lora_post_injection', False)
         self.provider = provider
         self.current_map_version = -1
+        # Per-thread state for the base forward in flight; wrapped layers share its scaffold outputs
+        self._forward_state = threading.local()
+        self._forward_hooks: Dict[int, Any] = {}
         self._validate_config()
         # Injection strategy pipeline
         strategy_order = config_manager.get('controls_config.injection_strategy_order', ['sequential', 'parallel', 'replace'])
@@ -1174,15 +1727,26 @@ class CrossAttentionInjector:
                 raise ValueError("Could not determine scaffold model hidden dimension")
             scaffold_output = torch.zeros(batch_size, seq_len, scaffold_dim, device=device)
             if token_map is not None and hasattr(scaffold_model, 'get_input_embeddings'):
-                mapping = token_map.get('base_to_scaffold', {})
                 scaffold_embeddings = scaffold_model.get_input_embeddings()
-                for token_id, scaffold_ids in mapping.items():
-                    if isinstance(scaffold_ids, list) and len(scaffold_ids) > 0:
-                        scaffold_id = scaffold_ids[0]
-                        token_embedding = scaffold_embeddings(
-                            torch.tensor([scaffold_id], device=device)
-                        )
-                        scaffold_output[:, :, :] = token_embedding
+                dense_ids, dense_weights = self._get_dense_token_map(token_map, device)
+                input_ids = getattr(self._forward_state, 'input_ids', None)
+                if input_ids is not None and tuple(input_ids.shape) == (batch_size, seq_len):
+                    base_ids = input_ids.to(device=device, dtype=torch.long)
+                    # Base ids outside the map have no row; they go to the scaffold unk id with weight 1
+                    valid = ((base_ids >= 0) & (base_ids < dense_ids.size(0))).unsqueeze(-1)
+                    rows = torch.where(valid.squeeze(-1), base_ids, torch.zeros_like(base_ids))
+                    unk_ids = torch.full_like(dense_ids[0], self._scaffold_unk_id)
+                    unk_weights = torch.zeros_like(dense_weights[0])
+                    unk_weights[0] = 1.0
+                    # One gather of (batch, seq, max_ids) scaffold ids, one embedding lookup, weighted sum over ids
+                    scaffold_ids = torch.where(valid, dense_ids[rows], unk_ids)
+                    weights = torch.where(valid, dense_weights[rows], unk_weights).unsqueeze(-1)
+                    token_embeddings = F.embedding(scaffold_ids, scaffold_embeddings.weight)
+                    scaffold_output = (token_embeddings * weights.to(token_embeddings.dtype)).sum(dim=-2)
+                else:
+                    # No usable base ids: every position gets the scaffold unk embedding
+                    unk_ids = torch.full((batch_size, seq_len), self._scaffold_unk_id, dtype=torch.long, device=device)
+                    scaffold_output = F.embedding(unk_ids, scaffold_embeddings.weight)
             else:
                 default_input_ids = torch.full(
                     (batch_size, seq_len), 
@@ -1257,6 +1821,150 @@ class CrossAttentionInjector:
                 return torch.zeros_like(base_hidden_states)
             raise
 
+    def _get_dense_token_map(self, token_map: Dict, device: torch.device) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Return (ids, weights) tensors of shape (base_vocab, max_ids) for a base->scaffold token map.
+
+        Accepts either {'base_to_scaffold': {base_id: [ids]}} or the mapper format
+        {base_id: {'ids': [...], 'weights': [...]}}. Unmapped rows point at the scaffold
+        unk id; multi-id mappings are averaged unless explicit per-id weights are given.
+        A CompactTokenMap is expanded directly from its CSR arrays. The tensors are rebuilt
+        only when the map object, its revision or the provider version changes.
+        """
+        if isinstance(token_map, CompactTokenMap):
+            token_map.compact()
+        key = (id(token_map), getattr(token_map, 'revision', None), self.current_map_version, device)
+        cached = getattr(self, '_dense_token_map', None)
+        if cached is not None and cached[0] == key:
+            return cached[1], cached[2]
+        if isinstance(token_map, CompactTokenMap):
+            dense_ids, dense_weights = token_map.dense_arrays(self._scaffold_unk_id)
+            dense_ids = torch.from_numpy(dense_ids).to(device)
+            dense_weights = torch.from_numpy(dense_weights).to(device)
+            self._dense_token_map = (key, dense_ids, dense_weights)
+            return dense_ids, dense_weights
+        mapping = token_map.get('base_to_scaffold', token_map)
+        entries = {}
+        for base_id, entry in mapping.items():
+            if not isinstance(base_id, int):
+                continue
+            ids = entry.get('ids', []) if isinstance(entry, dict) else entry
+            if not isinstance(ids, (list, tuple)) or not ids:
+                continue
+            weights = entry.get('weights') if isinstance(entry, dict) else None
+            if not isinstance(weights, (list, tuple)) or len(weights) != len(ids):
+                weights = [1.0 / len(ids)] * len(ids)
+            entries[base_id] = (list(ids), list(weights))
+        vocab_size = max(entries, default=0) + 1
+        max_ids = max((len(ids) for ids, _ in entries.values()), default=1)
+        dense_ids = np.full((vocab_size, max_ids), self._scaffold_unk_id, dtype=np.int64)
+        dense_weights = np.zeros((vocab_size, max_ids), dtype=np.float32)
+        dense_weights[:, 0] = 1.0
+        for base_id, (ids, weights) in entries.items():
+            dense_ids[base_id, :len(ids)] = ids
+            dense_weights[base_id, 0] = 0.0
+            dense_weights[base_id, :len(weights)] = weights
+        dense_ids = torch.from_numpy(dense_ids).to(device)
+        dense_weights = torch.from_numpy(dense_weights).to(device)
+        self._dense_token_map = (key, dense_ids, dense_weights)
+        return dense_ids, dense_weights
+
+    def _install_forward_hook(self, model: nn.Module) -> None:
+        """Register a forward pre-hook on the base model that starts a fresh scaffold cache per forward."""
+        if id(model) in self._forward_hooks:
+            return
+        self._forward_hooks[id(model)] = (
+            model.register_forward_pre_hook(self._on_base_forward, with_kwargs=True),
+            model.register_forward_hook(self._on_base_forward_end)
+        )
+
+    def _on_base_forward(self, module: nn.Module, args: tuple, kwargs: dict) -> None:
+        """Reset the shared scaffold output cache at the start of each base model forward.
+
+        Cross-attention keys/values live in this thread's forward state. A forward without a
+        populated base KV cache starts a new batch and clears them. A decode step only reuses
+        them when it continues the previous forward on this thread, with the same batch size and
+        a past length equal to the previous past plus its new tokens. Any other change in batch
+        composition (rows retired, trimmed or merged) turns reuse off until the next prefill.
+        """
+        state = self._forward_state
+        state.scaffold_outputs = {}
+        input_ids = kwargs.get('input_ids')
+        if input_ids is None and args and isinstance(args[0], torch.Tensor):
+            input_ids = args[0]
+        state.input_ids = input_ids
+        inputs = input_ids if input_ids is not None else kwargs.get('inputs_embeds')
+        past = kwargs.get('past_key_values')
+        if past is not None and hasattr(past, 'get_seq_length'):
+            past_len = past.get_seq_length()
+        elif past:
+            past_len = past[0][0].size(-2)
+        else:
+            past_len = 0
+        decoding = past_len > 0
+        state.decoding = decoding
+        if not decoding:
+            self.reset_cross_attention_caches()
+            # Training forwards never decode; caching their keys/values would pin the graph
+            state.kv_active = inputs is not None and not torch.is_grad_enabled()
+        elif getattr(state, 'kv_active', False):
+            continues = (
+                inputs is not None
+                and inputs.size(0) == getattr(state, 'kv_batch_size', None)
+                and past_len == getattr(state, 'kv_next_len', None)
+            )
+            if not continues:
+                self.reset_cross_attention_caches()
+                state.kv_active = False
+        if state.kv_active:
+            state.kv_batch_size = inputs.size(0)
+            state.kv_next_len = past_len + inputs.size(1)
+
+    def is_decoding(self) -> bool:
+        """Return True if the base forward in flight on this thread extends a cached prompt."""
+        return getattr(self._forward_state, 'decoding', False)
+
+    def reset_cross_attention_caches(self) -> None:
+        """Clear this thread's cached scaffold keys/values for every injected cross-attention layer."""
+        self._forward_state.kv_caches = {}
+        self._forward_state.kv_active = False
+
+    def _cross_attention_kv_cache(self, layer: 'CrossAttentionLayer') -> Optional[Dict[str, Any]]:
+        """Return this thread's key/value cache for a layer, or None if reuse is off for this forward.
+
+        On a prefill the returned dict is empty and the layer fills it. On a decode step it is
+        only returned if the prefill filled it.
+        """
+        state = self._forward_state
+        if not getattr(state, 'kv_active', False):
+            return None
+        caches = getattr(state, 'kv_caches', None)
+        if caches is None:
+            caches = state.kv_caches = {}
+        cache = caches.get(id(layer))
+        if cache is None:
+            if state.decoding:
+                return None
+            cache = caches[id(layer)] = {}
+        return cache
+
+    def _on_base_forward_end(self, module: nn.Module, args: tuple, output: Any) -> None:
+        """Release cached scaffold outputs once the base forward has finished."""
+        self._forward_state.scaffold_outputs = None
+        self._forward_state.input_ids = None
+        self._forward_state.decoding = False
+
+    def _get_shared_scaffold_output(self, scaffold_model: nn.Module, token_map: Optional[Dict], base_hidden_states: torch.Tensor) -> torch.Tensor:
+        """Return scaffold hidden states computed once per base forward and shared by every wrapped layer."""
+        cache = getattr(self._forward_state, 'scaffold_outputs', None)
+        if cache is None:
+            return self._get_scaffold_output(scaffold_model, token_map, base_hidden_states)
+        key = (id(scaffold_model), id(token_map), tuple(base_hidden_states.shape), base_hidden_states.device)
+        scaffold_output = cache.get(key)
+        if scaffold_output is None:
+            scaffold_output = self._get_scaffold_output(scaffold_model, token_map, base_hidden_states)
+            cache[key] = scaffold_output
+        return scaffold_output
+
     def inject(
         self,
         base_model: nn.Module,
@@ -1361,6 +2069,19 @@ class CrossAttentionInjector:
             )
             return base_model  # Return original model on failure
 
+    # Attention settings the layer reads that are declared under scaffold_config, not core_config
+    _SCAFFOLD_ATTENTION_KEYS = ("attention_backend", "attention_chunk_size", "gpu_memory_threshold")
+
+    def _cross_attention_config(self) -> Dict[str, Any]:
+        """Config for a CrossAttentionLayer: core_config (sizes, heads) plus the scaffold_config attention keys."""
+        section = self._config_manager.get_section("core_config")
+        config = dict(section) if isinstance(section, dict) else {}
+        for key in self._SCAFFOLD_ATTENTION_KEYS:
+            value = self._config_manager.get(f"scaffold_config.{key}", None)
+            if value is not None:
+                config[key] = value
+        return config
+
     def _inject_single_layer(
         self,
         model: nn.Module,
@@ -1373,8 +2094,9 @@ class CrossAttentionInjector:
         try:
             layers, _ = self.find_model_layers(model)
             layer = layers[layer_idx]
+            self._install_forward_hook(model)
             cross_attn_layer = CrossAttentionLayer(
-                config=self._config_manager.get_section("core_config"),
+                config=self._cross_attention_config(),
                 logger=self._logger,
                 device=model.device
             )
@@ -1470,16 +2192,21 @@ class CrossAttentionInjector:
                 output = original_forward(*args, **kwargs)
                 hidden_states = output[0] if isinstance(output, tuple) else output
                 try:
-                    scaffold_output = injector._get_scaffold_output(
-                        scaffold_model=scaffold_model,
-                        token_map=token_mapper,
-                        base_hidden_states=hidden_states
-                    )
-                    # Apply per-layer projection if needed
-                    if self.proj is not None:
-                        scaffold_output = self.proj(scaffold_output)
-                        if self.proj_norm is not None:
-                            scaffold_output = self.proj_norm(scaffold_output)
+                    # During decoding the prompt's scaffold keys/values are already cached
+                    kv_cache = injector._cross_attention_kv_cache(self.cross_attn_layer)
+                    use_cached_kv = kv_cache is not None and kv_cache.get('k') is not None
+                    scaffold_output = None
+                    if not use_cached_kv:
+                        scaffold_output = injector._get_shared_scaffold_output(
+                            scaffold_model=scaffold_model,
+                            token_map=token_mapper,
+                            base_hidden_states=hidden_states
+                        )
+                        # Apply per-layer projection if needed
+                        if self.proj is not None:
+                            scaffold_output = self.proj(scaffold_output)
+                            if self.proj_norm is not None:
+                                scaffold_output = self.proj_norm(scaffold_output)
                     # Create dynamic factor based on strategy if needed
                     dynamic_factor = None
                     if strategy == "progressive":
@@ -1493,7 +2220,8 @@ class CrossAttentionInjector:
                         memory_tensors=None,
                         memory_weight=0.0,
                         dynamic_factor=dynamic_factor,
-                        use_cache=False
+                        use_cache=kv_cache is not None,
+                        kv_cache=kv_cache
                     )
                     if isinstance(output, tuple):
                         return (output_with_cross_attn,) + output[1:]
@@ -2100,6 +2828,12 @@ class MergeStrategy(TokenMappingStrategy):
         # Example: Use character overlap as a simple similarity metric
         scaffold_tokenizer = context['scaffold_tokenizer']
         max_tokens = context.get('max_tokens_per_mapping', 3)
+        vocab_index = context.get('vocab_index')
+        if vocab_index is not None:
+            positions, scores = vocab_index.char_similarity_scores(token)
+            order = np.lexsort((positions, -scores))[:max_tokens]
+            results = [{'ids': [int(vocab_index.token_ids[positions[i]])], 'score': float(scores[i])} for i in order]
+            return results or None
         results = []
         for scaf_token, scaf_id in scaffold_tokenizer.get_vocab().items():
             # Simple similarity: number of shared characters
@@ -2122,25 +2856,16 @@ class NearestStrategy(TokenMappingStrategy):
     def find_nearest_token(token, context):
         # Example: Use minimum edit distance (Levenshtein) as a proxy for 'nearest'
         scaffold_tokenizer = context['scaffold_tokenizer']
-        def levenshtein(s1, s2):
-            if len(s1) < len(s2):
-                return levenshtein(s2, s1)
-            if len(s2) == 0:
-                return len(s1)
-            previous_row = range(len(s2) + 1)
-            for i, c1 in enumerate(s1):
-                current_row = [i + 1]
-                for j, c2 in enumerate(s2):
-                    insertions = previous_row[j + 1] + 1
-                    deletions = current_row[j] + 1
-                    substitutions = previous_row[j] + (c1 != c2)
-                    current_row.append(min(insertions, deletions, substitutions))
-                previous_row = current_row
-            return previous_row[-1]
+        vocab_index = context.get('vocab_index')
+        if vocab_index is not None:
+            semantic = vocab_index.semantic_nearest(token)
+            if semantic is not None:
+                return semantic[0]
+            return vocab_index.nearest_by_edit_distance(token)
         min_dist = float('inf')
         best_id = None
         for scaf_token, scaf_id in scaffold_tokenizer.get_vocab().items():
-            dist = levenshtein(token, scaf_token)
+            dist = levenshtein_distance(token, scaf_token)
             if dist < min_dist:
                 min_dist = dist
                 best_id = scaf_id
@@ -2161,16 +2886,22 @@ class LevenshteinStrategy(TokenMappingStrategy):
     _bk_tree_vocab = None
     def try_map(self, token, context):
         scaffold_tokenizer = context['scaffold_tokenizer']
-        vocab_keys = list(scaffold_tokenizer.get_vocab().keys())
-        if (LevenshteinStrategy._bk_tree is None or LevenshteinStrategy._bk_tree_vocab != vocab_keys):
-            LevenshteinStrategy._bk_tree = BKTree(levenshtein_distance, vocab_keys)
-            LevenshteinStrategy._bk_tree_vocab = vocab_keys
-        matches = LevenshteinStrategy._bk_tree.find(token, max_dist=2)
+        vocab_index = context.get('vocab_index')
+        if vocab_index is not None:
+            vocab = vocab_index.vocab
+            matches = vocab_index.within_edit_distance(token, max_dist=2)
+        else:
+            vocab = scaffold_tokenizer.get_vocab()
+            vocab_keys = list(vocab.keys())
+            if (LevenshteinStrategy._bk_tree is None or LevenshteinStrategy._bk_tree_vocab != vocab_keys):
+                LevenshteinStrategy._bk_tree = BKTree(levenshtein_distance, vocab_keys)
+                LevenshteinStrategy._bk_tree_vocab = vocab_keys
+            matches = LevenshteinStrategy._bk_tree.find(token, max_dist=2)
         if matches:
             best = min(matches, key=lambda x: (x[0]/max(len(token), len(x[1]), 1), x[0]))
             norm_dist = best[0] / max(len(token), len(best[1]), 1)
             if norm_dist <= 0.3:
-                scaf_id = scaffold_tokenizer.get_vocab()[best[1]]
+                scaf_id = vocab[best[1]]
                 confidence = 1.0 - norm_dist
                 return ([scaf_id], confidence, 'levenshtein')
         return None
@@ -2178,6 +2909,12 @@ class LevenshteinStrategy(TokenMappingStrategy):
 class SubwordStrategy(TokenMappingStrategy):
     def try_map(self, token, context):
         scaffold_tokenizer = context['scaffold_tokenizer']
+        vocab_index = context.get('vocab_index')
+        if vocab_index is not None:
+            scaf_token = vocab_index.first_affix(token)
+            if scaf_token is None:
+                return None
+            return ([vocab_index.vocab[scaf_token]], len(scaf_token) / max(len(token), 1), 'subword')
         for scaf_token, scaf_id in scaffold_tokenizer.get_vocab().items():
             if token.startswith(scaf_token) or token.endswith(scaf_token):
                 # Confidence: ratio of subword length to token length
@@ -2197,15 +2934,239 @@ class CharSimilarityStrategy(TokenMappingStrategy):
     def try_map(self, token, context):
         best_score = 0.0
         best_id = None
-        for scaf_token, scaf_id in context['scaffold_tokenizer'].get_vocab().items():
-            score = CharSimilarityStrategy.char_similarity(token, scaf_token)
-            if score > best_score:
-                best_score = score
-                best_id = scaf_id
+        vocab_index = context.get('vocab_index')
+        if vocab_index is not None:
+            positions, scores = vocab_index.char_similarity_scores(token)
+            if len(scores):
+                best = int(np.argmax(scores))
+                best_score = float(scores[best])
+                best_id = int(vocab_index.token_ids[positions[best]])
+        else:
+            for scaf_token, scaf_id in context['scaffold_tokenizer'].get_vocab().items():
+                score = CharSimilarityStrategy.char_similarity(token, scaf_token)
+                if score > best_score:
+                    best_score = score
+                    best_id = scaf_id
         if best_score > 0.0:
             return ([best_id], best_score, 'char')
         return None
 
+DEFAULT_FALLBACK_ORDER = ('levenshtein', 'subword', 'char', 'split', 'merge', 'nearest', 'unk')
+
+def create_fallback_strategies(fallback_order: List[str]) -> List[TokenMappingStrategy]:
+    """Instantiate the fallback strategy pipeline in the configured order."""
+    strategy_classes = {
+        'levenshtein': LevenshteinStrategy,
+        'subword': SubwordStrategy,
+        'char': CharSimilarityStrategy,
+        'split': SplitStrategy,
+        'merge': MergeStrategy,
+        'nearest': NearestStrategy,
+        'unk': UnkStrategy,
+    }
+    return [strategy_classes[name]() for name in fallback_order if name in strategy_classes]
+
+# Candidate index over the scaffold vocabulary shared by every fallback strategy.
+class ScaffoldVocabIndex:
+    """
+    Prebuilt candidate index over the scaffold vocabulary.
+
+    Edit-distance, affix and character-overlap queries go through inverted indexes
+    (padded character bigrams and character sets), so each query only scores the
+    vocabulary entries that share material with it instead of scanning the whole
+    vocabulary in Python. When scaffold input embeddings are supplied and FAISS is
+    installed, an HNSW index answers semantic nearest-token queries.
+    """
+
+    NGRAM = 2
+    NEAREST_CANDIDATES = 64
+
+    def __init__(self, scaffold_tokenizer: Any, embeddings: Optional[np.ndarray] = None):
+        self.scaffold_tokenizer = scaffold_tokenizer
+        self.vocab: Dict[str, int] = dict(scaffold_tokenizer.get_vocab())
+        self.items: List[Tuple[str, int]] = list(self.vocab.items())
+        self.tokens: List[str] = [token for token, _ in self.items]
+        self.token_ids = np.array([token_id for _, token_id in self.items], dtype=np.int64)
+        self.lengths = np.array([len(token) for token in self.tokens], dtype=np.int64)
+        self.positions: Dict[str, int] = {token: pos for pos, token in enumerate(self.tokens)}
+        self.embeddings = embeddings
+        self._ngram_postings: Optional[Dict[str, np.ndarray]] = None
+        self._char_postings: Optional[Dict[str, np.ndarray]] = None
+        self._char_set_sizes: Optional[np.ndarray] = None
+        self._semantic_index = None
+        self._semantic_index_built = False
+
+    @classmethod
+    def _ngrams(cls, token: str) -> List[str]:
+        padded = f"\x02{token}\x03"
+        return [padded[i:i + cls.NGRAM] for i in range(len(padded) - cls.NGRAM + 1)]
+
+    @staticmethod
+    def _freeze_postings(postings: Dict[str, List[int]]) -> Dict[str, np.ndarray]:
+        return {key: np.array(rows, dtype=np.int64) for key, rows in postings.items()}
+
+    @property
+    def ngram_postings(self) -> Dict[str, np.ndarray]:
+        # One posting per gram occurrence, so hit counts bound the multiset overlap from above
+        if self._ngram_postings is None:
+            postings: Dict[str, List[int]] = defaultdict(list)
+            for pos, token in enumerate(self.tokens):
+                for gram in self._ngrams(token):
+                    postings[gram].append(pos)
+            self._ngram_postings = self._freeze_postings(postings)
+        return self._ngram_postings
+
+    @property
+    def char_postings(self) -> Dict[str, np.ndarray]:
+        if self._char_postings is None:
+            postings: Dict[str, List[int]] = defaultdict(list)
+            for pos, token in enumerate(self.tokens):
+                for char in set(token):
+                    postings[char].append(pos)
+            self._char_postings = self._freeze_postings(postings)
+            self._char_set_sizes = np.array([len(set(token)) for token in self.tokens], dtype=np.int64)
+        return self._char_postings
+
+    def _ngram_hits(self, token: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (positions, shared bigram counts) of every entry sharing a bigram with ``token``."""
+        postings = self.ngram_postings
+        hits = [postings[gram] for gram in self._ngrams(token) if gram in postings]
+        if not hits:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(hits), return_counts=True)
+
+    def within_edit_distance(self, token: str, max_dist: int) -> List[Tuple[int, str]]:
+        """Exact ``(distance, word)`` pairs for every vocabulary entry within ``max_dist`` edits.
+
+        Candidates are filtered with the q-gram lemma (strings within k edits share at least
+        ``max(len) + 1 - q*k`` padded bigrams) and a length window before the exact distance
+        is computed, so only a small slice of the vocabulary is ever scored.
+        """
+        length = len(token)
+        positions, counts = self._ngram_hits(token)
+        cand_lengths = self.lengths[positions]
+        required = np.maximum(cand_lengths, length) + 1 - self.NGRAM * max_dist
+        keep = (np.abs(cand_lengths - length) <= max_dist) & (counts >= required)
+        candidates = positions[keep]
+        if length + 1 - self.NGRAM * max_dist <= 0:
+            # Very short strings may be within range while sharing no bigram at all
+            short = np.flatnonzero(
+                (self.lengths >= max(length - max_dist, 0))
+                & (self.lengths <= length + max_dist)
+                & (self.lengths + 1 - self.NGRAM * max_dist <= 0)
+            )
+            candidates = np.union1d(candidates, short)
+        results = []
+        for pos in candidates.tolist():
+            word = self.tokens[pos]
+            dist = levenshtein_distance(token, word)
+            if dist <= max_dist:
+                results.append((dist, word))
+        return results
+
+    def nearest_by_edit_distance(self, token: str) -> Optional[int]:
+        """Approximate nearest scaffold id by edit distance, scoring only the entries with the most shared bigrams."""
+        positions, counts = self._ngram_hits(token)
+        if len(positions) == 0:
+            positions = np.flatnonzero(self.lengths == len(token))
+            if len(positions) == 0:
+                return None
+            counts = np.zeros(len(positions), dtype=np.int64)
+        top = positions[np.lexsort((positions, -counts))[:self.NEAREST_CANDIDATES]]
+        best = min(top.tolist(), key=lambda pos: (levenshtein_distance(token, self.tokens[pos]), pos))
+        return int(self.token_ids[best])
+
+    def first_affix(self, token: str) -> Optional[str]:
+        """Earliest vocabulary entry (in vocab order) that is a prefix or suffix of ``token``."""
+        best = None
+        for i in range(len(token) + 1):
+            for affix in (token[:i], token[i:]):
+                pos = self.positions.get(affix)
+                if pos is not None and (best is None or pos < best):
+                    best = pos
+        return self.tokens[best] if best is not None else None
+
+    def char_similarity_scores(self, token: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Jaccard similarity of character sets for every entry sharing a character with ``token``."""
+        chars = set(token)
+        postings = self.char_postings
+        hits = [postings[char] for char in chars if char in postings]
+        if not hits:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+        positions, shared = np.unique(np.concatenate(hits), return_counts=True)
+        union = len(chars) + self._char_set_sizes[positions] - shared
+        return positions, shared / np.maximum(union, 1)
+
+    @property
+    def semantic_index(self):
+        if not self._semantic_index_built:
+            self._semantic_index_built = True
+            if self.embeddings is not None and faiss is not None:
+                embeddings = np.ascontiguousarray(self.embeddings, dtype=np.float32)
+                index = faiss.IndexHNSWFlat(embeddings.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+                index.add(embeddings)
+                self._semantic_index = index
+        return self._semantic_index
+
+    def semantic_nearest(self, token: str) -> Optional[Tuple[int, float]]:
+        """Nearest scaffold id to the mean embedding of ``token``'s scaffold pieces, with its cosine score."""
+        index = self.semantic_index
+        if index is None:
+            return None
+        piece_ids = [i for i in self.scaffold_tokenizer.encode(token, add_special_tokens=False) if 0 <= i < len(self.embeddings)]
+        if not piece_ids:
+            return None
+        query = self.embeddings[piece_ids].mean(axis=0, keepdims=True).astype(np.float32)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+        scores, labels = index.search(query, 1)
+        if labels[0, 0] < 0:
+            return None
+        return int(labels[0, 0]), float(scores[0, 0])
+
+def run_fallback_strategies(token: str, strategies: List[TokenMappingStrategy], context: Dict[str, Any]) -> Tuple[List[int], float, str]:
+    """Run the fallback pipeline for one token and return (ids, confidence, strategy) of the best result."""
+    best_conf = 0.0
+    best_ids = [context['scaffold_tokenizer'].unk_token_id]
+    best_strategy = 'unk'
+    for strat in strategies:
+        result = strat.try_map(token, context)
+        if result and isinstance(result, tuple):
+            ids, conf, strategy = result
+        elif result:
+            ids, conf, strategy = result, 0.5, strat.__class__.__name__
+        else:
+            continue
+        if conf > best_conf:
+            best_conf = conf
+            best_ids = ids
+            best_strategy = strategy
+    return best_ids, best_conf, best_strategy
+
+# Per-process state for parallel token-map builds (set once by the pool initializer)
+_token_map_worker_state: Dict[str, Any] = {}
+
+def _init_token_map_worker(
+    scaffold_tokenizer: Any,
+    fallback_order: List[str],
+    max_tokens_per_mapping: int,
+    embeddings: Optional[np.ndarray] = None
+) -> None:
+    _token_map_worker_state['strategies'] = create_fallback_strategies(fallback_order)
+    _token_map_worker_state['context'] = {
+        'scaffold_tokenizer': scaffold_tokenizer,
+        'max_tokens_per_mapping': max_tokens_per_mapping,
+        'vocab_index': ScaffoldVocabIndex(scaffold_tokenizer, embeddings),
+    }
+
+def _map_token_chunk(chunk: List[Tuple[int, str]]) -> List[Tuple[int, str, List[int], float, str]]:
+    strategies = _token_map_worker_state['strategies']
+    context = _token_map_worker_state['context']
+    results = []
+    for base_id, token in chunk:
+        ids, conf, strategy = run_fallback_strategies(token, strategies, dict(context, base_id=base_id))
+        results.append((base_id, token, list(ids), float(conf), strategy))
+    return results
+
 class InjectionStrategy:
     def inject(self, model, scaffold_model, layer_idx, token_map, injector):
         raise NotImplementedError
@@ -87,7 +87,7 @@ class MetadataProcessorConfig:
 # Used by: ScribeIngestionProcessor, memory/journal processing
 class ScribedConfig:
     output_path: str = "scribe/sovl_scribe.jsonl"  # Path to scribe journal file
-    max_file_size_mb: int = 50  # Max file size in MB before rotation
+    max_file_size_mb: int = 50  # Max head size in MB before it is sealed into a journal segment
     buffer_size: int = 10  # Buffer size for scribe writes
 
 # Used by: ScribeIngestionProcessor, event weighting
@@ -211,8 +211,11 @@ class IOConfig:
 # Used by: JsonlWriter (sovl_io.py)
 class ScribedConfig:
     log_path: str = "logs/sovl_scribed.jsonl"  # Path to scribe JSONL log file
-    max_file_size_mb: int = 50  # Max file size in MB before rotation
+    max_file_size_mb: int = 50  # Max head size in MB before it is sealed into a journal segment
     buffer_size: int = 10  # Number of entries to buffer before writing
+    durability: str = "flush"  # none | flush | fsync (per group) | fsync_interval
+    fsync_interval_ms: int = 1000  # Minimum time between fsyncs with durability "fsync_interval"
+    max_backups: int = 5  # Pruned journal segments kept in scribe_backups; older backups are deleted permanently (0 keeps all)
 
 # Used by: load_and_split_data (sovl_io.py), and possibly elsewhere
 class CoreConfig:
@@ -241,6 +244,7 @@ class GenerationConfig:
     max_batch_size: int = 8  # Maximum batch size for generation
     default_batch_size: int = 1  # Default batch size for generation
     mem_per_sample_mb: int = 100  # Estimated memory per sample in MB
+    continuous_batching: bool = True  # Share one decode loop across concurrent generate_text requests
 
 class TrainingConfig:
     max_seq_length: int = 1024  # Maximum sequence length for training
@@ -258,9 +262,12 @@ class CuriosityConfig:
     embedding_cache_backup_enabled: bool = False  # Enable backup of pruned embeddings
     embedding_cache_backup_path: str = "embedding_cache_backup.jsonl"  # Path for embedding cache backup
     background_pruning_enabled: bool = True  # Enable background pruning of embedding cache
-    similarity_early_exit_threshold: float = 0.99  # Early exit threshold for similarity checks
+    similarity_early_exit_threshold: float = 0.99  # Stop the novelty scan once a stored memory is this similar (numpy backend)
     adaptive_batch_min: int = 8  # Minimum adaptive batch size
     adaptive_batch_max: int = 128  # Maximum adaptive batch size
+    novelty_store_path: str = ""  # Memory-mapped novelty embedding matrix, e.g. "data/novelty_store.f32"; one path per process ("" keeps it in memory)
+    novelty_store_max_rows: int = 100000  # Rows kept before the oldest are overwritten
+    novelty_index_backend: str = "auto"  # auto, numpy or faiss (inner-product search)
 
     # Curiosity pressure system
     base_pressure: float = 0.5  # Base pressure value
@@ -503,6 +510,10 @@ class ScaffoldConfig:
     token_mapping_fallback_order: list = field(default_factory=lambda: [
         "levenshtein", "subword", "char", "split", "merge", "nearest", "unk"
     ])  # Order of fallback strategies for token mapping
+    token_map_workers: Optional[int] = None  # Worker processes for token-map construction (None = CPU count)
+    token_map_cache_dir: str = "~/.cache/sovl/token_maps"  # Directory for token-map caches and the incremental mapping index
+    fallback_semantic_index: bool = True  # Use a FAISS index over scaffold embeddings for nearest-token fallback
+    attention_backend: str = "auto"  # Cross-attention backend: "auto", "sdpa" (fused) or "chunked"
     attention_chunk_size: int = 128  # Chunk size for attention computation
     gpu_memory_threshold: float = 0.85  # GPU memory usage threshold
     token_mapping: dict = field(default_factory=dict)  # Populated at runtime
@@ -537,7 +548,36 @@ class MemoryConfig:
     long_term_top_k: int = 5  # Top-K results for long-term memory queries
     memory_logging_level: str = "info"  # Logging level for memory operations
     long_term_max_records: int = 10000  # Max records in long-term memory
-    faiss_rebuild_threshold: int = 100  # How often to rebuild FAISS index (num new records)
+    faiss_persist_interval: int = 1000  # Index changes between saves of the on-disk FAISS index
+    faiss_index_type: str = "auto"  # "auto" (promote by size), "flat", "hnsw" or "ivfpq"
+    faiss_hnsw_threshold: int = 50000  # Rows at which "auto" promotes the flat index to HNSW
+    faiss_ivfpq_threshold: int = 1000000  # Rows at which "auto" promotes to IVF-PQ
+    faiss_min_recall: float = 0.95  # Minimum recall@10 vs exact search before an ANN index is used
+    faiss_hnsw_m: int = 32  # HNSW graph degree
+    faiss_hnsw_ef_search: int = 64  # Initial HNSW efSearch (raised automatically to meet recall)
+    faiss_pq_m: int = 16  # IVF-PQ sub-quantizers (largest divisor of embedding_dim not above this)
+    faiss_nprobe: int = 16  # Initial IVF nprobe (raised automatically to meet recall)
+    faiss_rerank_factor: int = 4  # IVF-PQ candidates per result, re-ranked with exact distances
+    faiss_exact_window_rows: int = 2048  # Time-filtered queries over at most this many rows scan them exactly on ANN tiers
+    sqlite_journal_mode: str = "WAL"  # SQLite journal_mode for the long-term memory DB
+    sqlite_synchronous: str = "NORMAL"  # SQLite synchronous level ("NORMAL" is durable across app crashes in WAL mode)
+    write_batch_size: int = 64  # Long-term inserts per group commit
+    commit_interval_ms: float = 50.0  # Max time an insert waits for its group commit (0 = commit every insert)
+    embedding_storage: str = "float32"  # Stored/indexed vector precision: "float32", "float16" or "int8" (migrate with migrate_memory_storage.py)
+    max_open_sessions: int = 64  # Idle per-session long-term shards kept open by the shared MemoryService
+    cross_session_recall: bool = False  # Long-term recall also searches the user's other recent sessions
+    cross_session_max_sessions: int = 8  # Most recent sessions searched by cross-session recall
+    fts_enabled: bool = True  # SQLite FTS5 full-text index over long-term message content
+    hybrid_retrieval: bool = True  # Fuse BM25 and vector rankings for text queries (lexical-only without semantic embeddings)
+    hybrid_rrf_k: int = 60  # Reciprocal rank fusion constant
+    hybrid_lexical_weight: float = 0.5  # BM25 share of the fused score (vector gets the rest)
+    hybrid_candidate_factor: int = 4  # Candidates per result fetched from each ranking before fusion
+    embedding_source: str = "auto"  # "auto", "encoder", "base_embeddings" (no forward pass), "base_model" or "hash"
+    embedding_encoder_model: Optional[str] = None  # Small dedicated encoder (HF model name/path) used by "auto"/"encoder"
+    embedding_cache_size: int = 4096  # LRU entries of text-hash -> embedding
+    embedding_batch_size: int = 32  # Max texts per embedding micro-batch
+    embedding_max_wait_ms: float = 5.0  # Max time a micro-batch waits to fill
+    embedding_max_length: int = 128  # Token truncation length for embedding inputs
     default_origin: str = "dialogue_manager"  # Default origin for messages
     default_session_id: str = "default"  # Default session ID
     default_user_id: str = "default"  # Default user ID
@@ -648,6 +688,16 @@ class LoggingConfig:
     logging_enabled: bool = True  # Universal on/off switch for all logging
     error_cooldown: float = 1.0  # Time in seconds before an error is no longer considered recent
     max_recent_errors: int = 100  # Maximum number of recent errors to track
+    async_enabled: bool = True  # Queue events for a background writer instead of writing on the caller's thread
+    async_buffer_size: int = 10000  # Entries held in memory awaiting the writer
+    async_batch_size: int = 256  # Max entries per batched write
+    async_flush_interval_ms: float = 200.0  # Max time an entry waits before being written
+    async_overflow_policy: str = "drop_oldest"  # Full buffer: "drop_oldest", "drop_new" or "block" (backpressure)
+    async_block_timeout_ms: float = 100.0  # How long "block" waits for space before dropping the entry
+    event_sampling: dict = field(default_factory=dict)  # event_type (or fnmatch pattern) -> fraction of events kept
+    event_rate_limits: dict = field(default_factory=dict)  # event_type (or fnmatch pattern) -> max events per second
+    max_field_chars: int = 4096  # Longer strings in a log entry are truncated
+    max_list_items: int = 100  # Longer lists/dicts in a log entry are truncated
     error_handling_config: dict = field(default_factory=lambda: {
         "max_history_per_error": 10,
         "critical_threshold": 5,
@@ -114,10 +114,10 @@ class Scriber:
         """Initialize the JSONL writer if not already initialized."""
         if self.jsonl_writer is None:
             self.jsonl_writer = JsonlWriter(
-                self.scribe_path,
                 config_manager=self.config_manager,
                 error_manager=self.error_manager,
-                logger=self.logger
+                logger=self.logger,
+                file_path=self.scribe_path
             )
             self.logger.info(f"JSONL writer initialized for: {self.scribe_path}")
     
@@ -276,10 +276,8 @@ class Scriber:
                         self._batch_buffer.append(formatted_scribe_string)
                         now = time.time()
                         if len(self._batch_buffer) >= self.scribe_batch_size or (now - self._last_flush_time) >= self.scribe_flush_interval:
-                            with self.jsonl_writer.lock:
-                                self.jsonl_writer._buffer.extend(self._batch_buffer)
-                                self._batch_buffer = []
-                                self.jsonl_writer._flush_buffer()
+                            self.jsonl_writer.write_many(self._batch_buffer)
+                            self._batch_buffer = []
                             self._last_flush_time = now
 
                 except Exception as processing_error:
@@ -306,10 +304,8 @@ class Scriber:
                 with self._batch_lock:
                     now = time.time()
                     if self._batch_buffer and (now - self._last_flush_time) >= self.scribe_flush_interval:
-                        with self.jsonl_writer.lock:
-                            self.jsonl_writer._buffer.extend(self._batch_buffer)
-                            self._batch_buffer = []
-                            self.jsonl_writer._flush_buffer()
+                        self.jsonl_writer.write_many(self._batch_buffer)
+                        self._batch_buffer = []
                         self._last_flush_time = now
                 continue
 
@@ -364,10 +360,8 @@ class Scriber:
                         self._batch_buffer.append(formatted_scribe_string)
                         now = time.time()
                         if len(self._batch_buffer) >= self.scribe_batch_size or (now - self._last_flush_time) >= self.scribe_flush_interval:
-                            with self.jsonl_writer.lock:
-                                self.jsonl_writer._buffer.extend(self._batch_buffer)
-                                self._batch_buffer = []
-                                self.jsonl_writer._flush_buffer()
+                            self.jsonl_writer.write_many(self._batch_buffer)
+                            self._batch_buffer = []
                             self._last_flush_time = now
 
                 except Exception as processing_error:
@@ -398,10 +392,8 @@ class Scriber:
         # Flush any remaining batch buffer
         with self._batch_lock:
             if self._batch_buffer:
-                with self.jsonl_writer.lock:
-                    self.jsonl_writer._buffer.extend(self._batch_buffer)
-                    self._batch_buffer = []
-                    self.jsonl_writer._flush_buffer()
+                self.jsonl_writer.write_many(self._batch_buffer)
+                self._batch_buffer = []
 
         self.logger.info("Scriber writer thread finished.")
 
@@ -415,8 +407,8 @@ class Scriber:
         # Forced flush and retry before join
         for attempt in range(3):
             try:
-                with self.jsonl_writer.lock:
-                    self.jsonl_writer._flush_buffer()
+                if not self.jsonl_writer.flush():
+                    raise IOError(f"Failed to flush scribe file: {self.jsonl_writer.scribe_file_path}")
                 break
             except Exception as e:
                 self.fallback_logger.error(f"Flush retry {attempt+1} failed: {e}")
@@ -620,11 +620,15 @@ class SOVLTrainer:
     def train_on_scribe_journal(self, scribe_path: str, batch_size: int = 32, default_weight: float = 1.0, epochs: int = 1):
         """
         Train on batches from the scribe journal, tracking all 'memory' fields used for training.
+        The journal head is sealed first and only segments not yet trained on are read; they
+        are marked trained afterwards so prune_scribe_journal can drop them.
         Returns the set of trained memory strings.
         """
-        from sovl_io import ScribeJSONLBatchLoader
+        from sovl_io import ScribeJSONLBatchLoader, ScribeJournal
         trained_memories = set()
-        loader = ScribeJSONLBatchLoader(scribe_path, batch_size, default_weight)
+        journal = ScribeJournal.get_instance(scribe_path)
+        segment_paths = journal.seal_for_training()
+        loader = ScribeJSONLBatchLoader(segment_paths, batch_size, default_weight)
         self.model.train()
         optimizer = torch.optim.AdamW(self.model.parameters(), lr=self.config.optimizer.learning_rate)
         for epoch in range(epochs):
@@ -661,6 +665,7 @@ class SOVLTrainer:
                     loss = losses
                 loss.backward()
                 optimizer.step()
+        journal.mark_trained(segment_paths)
         return trained_memories
 
 @dataclass
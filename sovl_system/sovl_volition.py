@@ -209,9 +209,7 @@ class AutonomyManager:
                 )
             # Error rate with smoothing
             try:
-                recent_logs = self.logger.read(limit=max(1, self.autonomy_config["hysteresis_window"]))
-                error_count = sum(1 for log in recent_logs if "error" in log.get("event", "").lower())
-                metrics["error_rate"] = error_count / max(1, len(recent_logs))
+                metrics["error_rate"] = self.logger.error_rate(last_n=max(1, self.autonomy_config["hysteresis_window"]))
             except Exception as e:
                 self.logger.record_event(
                     event_type="error_rate_calc_error",
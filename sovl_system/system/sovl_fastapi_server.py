@@ -1,5 +1,5 @@
 from fastapi import FastAPI, HTTPException, Request, Body
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 import uvicorn
 import os
 import json
@@ -81,6 +81,39 @@ def handle_sovl_request(request: SOVLRequest):
         raise HTTPException(status_code=500, detail=f"Error processing prompt: {str(e)}")
 
 
+# API endpoint to stream the SOVL response as server-sent events
+@app.post("/api/sovl/stream")
+def stream_sovl_request(request: SOVLRequest):
+    try:
+        chunks = sovl_api.stream_output(
+            request.prompt,
+            max_new_tokens=request.max_new_tokens,
+            temperature=request.temperature,
+            top_k=request.top_k,
+            do_sample=request.do_sample
+        )
+    except ValueError as e:
+        # Rejected prompt or generation parameters, raised before anything is streamed
+        raise HTTPException(status_code=400, detail=f"Invalid prompt: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing prompt: {str(e)}")
+
+    def event_stream():
+        try:
+            for chunk in chunks:
+                yield f"data: {json.dumps({'token': chunk})}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+        finally:
+            # On client disconnect this cancels the generation behind the stream
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 # Endpoint to tune curiosity parameters
 @app.post("/api/sovl/tune-curiosity")
 def tune_curiosity(params: dict = Body(...)):
@@ -0,0 +1,39 @@
+"""
+Shared setup for the unit tests.
+
+The sovl_* modules import each other in cycles, so test modules import the module under
+test through _bootstrap.import_isolated (the helper the benchmarks use), with the
+framework modules they do not exercise replaced by inert stand-ins.
+
+Run from sovl_system/:
+    python -m pytest tests
+"""
+import os
+import sys
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+if BENCHMARKS_DIR not in sys.path:
+    sys.path.insert(0, BENCHMARKS_DIR)
+
+
+class QuietLogger:
+    """Logger stand-in that accepts every logging call and records nothing."""
+
+    def record_event(self, *args, **kwargs):
+        pass
+
+    def log_error(self, *args, **kwargs):
+        pass
+
+    def log_warning(self, *args, **kwargs):
+        pass
+
+
+class SectionConfig:
+    """Minimal ConfigManager.get over a flat dict of keys within one section."""
+
+    def __init__(self, values):
+        self._values = values
+
+    def get(self, key, default=None):
+        return self._values.get(key.split(".", 1)[-1], default)
@@ -0,0 +1,116 @@
+"""Tests for CompactTokenMap's dense arrays and how the injector routes ids outside them."""
+import threading
+
+import numpy as np
+import pytest
+import torch
+import torch.nn as nn
+
+from _bootstrap import import_isolated
+from conftest import QuietLogger
+
+sovl_scaffold = import_isolated("sovl_scaffold", stand_ins=("sovl_error", "sovl_memory", "sovl_engram"))
+CompactTokenMap = sovl_scaffold.CompactTokenMap
+
+UNK = 1
+SCAFFOLD_VOCAB = 32
+HIDDEN = 8
+
+
+@pytest.fixture
+def token_map():
+    # Row 2 is never mapped, row 3 maps to two ids and row 4 is deleted after compaction
+    token_map = CompactTokenMap.from_dict({
+        0: {"ids": [10]},
+        1: {"ids": [11], "weight": 0.5},
+        3: {"ids": [12, 13]},
+        4: {"ids": [14]},
+    }, unk_id=UNK)
+    del token_map[4]
+    token_map[5] = {"ids": [15]}  # pending until the next bulk read
+    return token_map
+
+
+def test_dense_arrays_expand_rows(token_map):
+    dense_ids, dense_weights = token_map.dense_arrays()
+
+    assert dense_ids.shape == dense_weights.shape == (6, 2)
+    assert dense_ids[:, 0].tolist() == [10, 11, UNK, 12, UNK, 15]
+    assert dense_ids[3].tolist() == [12, 13]
+    np.testing.assert_allclose(dense_weights[3], [0.5, 0.5])
+    # Every row sums to 1: per-row weights are not applied, missing rows get unk alone
+    np.testing.assert_allclose(dense_weights.sum(axis=1), np.ones(6))
+    np.testing.assert_allclose(dense_weights[[2, 4], 0], [1.0, 1.0])
+    assert dense_ids[2, 1] == UNK and dense_weights[2, 1] == 0.0
+
+
+def test_dense_arrays_unk_override(token_map):
+    dense_ids, _ = token_map.dense_arrays(unk_id=7)
+
+    assert dense_ids[2, 0] == 7
+    assert dense_ids[0, 1] == 7
+    assert token_map.unk_id == UNK
+
+
+def test_empty_map_has_one_unk_row():
+    dense_ids, dense_weights = CompactTokenMap(UNK).dense_arrays()
+
+    assert dense_ids.tolist() == [[UNK]]
+    assert dense_weights.tolist() == [[1.0]]
+
+
+@pytest.mark.parametrize("base_id", [-1, 6, 1000])
+def test_out_of_range_ids_read_as_unknown(token_map, base_id):
+    assert base_id not in token_map
+    assert token_map[base_id] == {"ids": [UNK], "weight": 1.0, "confidence": 0.0}
+    with pytest.raises(KeyError):
+        del token_map[base_id]
+    looked_up = token_map.lookup(np.array([0, base_id]))
+    assert looked_up["ids"].tolist() == [10, UNK]
+    assert looked_up["unk"].tolist() == [False, True]
+
+
+class _Scaffold(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.config = type("Config", (), {"hidden_size": HIDDEN})()
+        self.embeddings = nn.Embedding(SCAFFOLD_VOCAB, HIDDEN)
+
+    def get_input_embeddings(self):
+        return self.embeddings
+
+
+def _injector():
+    injector = object.__new__(sovl_scaffold.CrossAttentionInjector)
+    injector._logger = QuietLogger()
+    injector.provider = None
+    injector.current_map_version = -1
+    injector._scaffold_unk_id = UNK
+    injector._forward_state = threading.local()
+    return injector
+
+
+def test_injector_routes_out_of_range_ids_to_unk(token_map):
+    torch.manual_seed(0)
+    scaffold = _Scaffold()
+    embeddings = scaffold.embeddings.weight
+    injector = _injector()
+    injector._forward_state.input_ids = torch.tensor([[0, 3, 2, 6, 1000, -1]])
+
+    with torch.no_grad():
+        output = injector._get_scaffold_output(scaffold, token_map, torch.zeros(1, 6, HIDDEN))
+
+    torch.testing.assert_close(output[0, 0], embeddings[10])
+    torch.testing.assert_close(output[0, 1], (embeddings[12] + embeddings[13]) / 2)
+    for position in (2, 3, 4, 5):
+        torch.testing.assert_close(output[0, position], embeddings[UNK])
+
+
+def test_injector_without_input_ids_uses_unk_embedding(token_map):
+    scaffold = _Scaffold()
+    injector = _injector()
+
+    with torch.no_grad():
+        output = injector._get_scaffold_output(scaffold, token_map, torch.zeros(2, 3, HIDDEN))
+
+    torch.testing.assert_close(output, scaffold.embeddings.weight[UNK].expand(2, 3, HIDDEN))
@@ -0,0 +1,140 @@
+"""Tests for LogIndex offsets, the sidecar and counters across log rotation."""
+import json
+import logging
+import os
+
+import pytest
+
+from _bootstrap import import_isolated
+
+sovl_logger = import_isolated("sovl_logger")
+LogIndex = sovl_logger.LogIndex
+
+
+def _line(event_type, level="info", **fields):
+    entry = {"timestamp": "2025-01-01T00:00:00", "event_type": event_type, "level": level, **fields}
+    return (json.dumps(entry) + "\n").encode("utf-8")
+
+
+def _append(path, *lines):
+    with open(path, "ab") as f:
+        for line in lines:
+            f.write(line)
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    return str(tmp_path / "sovl_logs.jsonl")
+
+
+@pytest.fixture
+def open_index(log_file):
+    indexes = []
+
+    def _open():
+        index = LogIndex(log_file, logging.getLogger("test_log_index"))
+        indexes.append(index)
+        return index
+
+    yield _open
+    for index in indexes:
+        index.close()
+
+
+def _offsets(path):
+    offsets, offset = [], 0
+    with open(path, "rb") as f:
+        for line in f:
+            offsets.append(offset)
+            offset += len(line)
+    return offsets
+
+
+def test_offsets_point_at_each_line(log_file, open_index):
+    _append(log_file, _line("a"), _line("b", "error"), _line("c"))
+    index = open_index()
+
+    assert list(index._offsets) == _offsets(log_file)
+    assert [entry["event_type"] for entry in index.read()] == ["a", "b", "c"]
+    assert index.counts()["by_level"] == {"info": 2, "error": 1}
+
+
+def test_refresh_indexes_appended_lines_and_waits_for_partial_ones(log_file, open_index):
+    _append(log_file, _line("a"))
+    index = open_index()
+    partial = _line("c")
+    _append(log_file, _line("b"), partial[:10])
+
+    assert [entry["event_type"] for entry in index.read()] == ["a", "b"]
+    _append(log_file, partial[10:])
+    assert index.read(limit=1) == [json.loads(partial)]
+    assert list(index._offsets) == _offsets(log_file)
+
+
+def test_note_written_indexes_writer_lines(log_file, open_index):
+    _append(log_file, _line("a"))
+    index = open_index()
+    lines = [_line("b"), _line("c", "warning")]
+    start = os.path.getsize(log_file)
+    _append(log_file, *lines)
+
+    with index.lock:
+        index.note_written(start, lines, [json.loads(line) for line in lines], os.stat(log_file).st_ino)
+
+    assert list(index._offsets) == _offsets(log_file)
+    assert index.read(level="warning") == [json.loads(lines[1])]
+
+
+def test_rotation_restarts_offsets_and_keeps_running_counters(log_file, open_index):
+    _append(log_file, _line("a"), _line("b", "error"))
+    index = open_index()
+    checkpoint = index.checkpoint()
+    _append(log_file, _line("c"))
+    # Rotate the way _FileHandler.rotate_if_needed does, then keep logging to a new file
+    os.rename(log_file, f"{log_file}.20250101_000000")
+    _append(log_file, _line("d", "error"), _line("e"))
+
+    index.refresh()
+
+    assert list(index._offsets) == _offsets(log_file)
+    assert [entry["event_type"] for entry in index.read()] == ["d", "e"]
+    assert index.counts()["total"] == 2
+    # Process-lifetime counters include the rotated-away file; "c" was never seen before rotation
+    assert index.count_since(checkpoint) == 2
+    assert index.count_since(checkpoint, level="error") == 1
+    assert index.count_since(None) == 4
+
+
+def test_note_written_for_a_rotated_file_is_ignored(log_file, open_index):
+    _append(log_file, _line("a"))
+    index = open_index()
+    old_inode = os.stat(log_file).st_ino
+    os.rename(log_file, f"{log_file}.1")
+    _append(log_file, _line("b"))
+    stale = [_line("late")]
+
+    with index.lock:
+        index.note_written(len(_line("a")), stale, [json.loads(stale[0])], old_inode)
+
+    assert [entry["event_type"] for entry in index.read()] == ["b"]
+    assert list(index._offsets) == _offsets(log_file)
+
+
+def test_sidecar_is_reused_for_the_same_file_and_rebuilt_after_rotation(log_file, open_index):
+    _append(log_file, _line("a"), _line("b"))
+    first = open_index()
+    first.close()
+    _append(log_file, _line("c"))
+
+    reopened = open_index()
+
+    assert list(reopened._offsets) == _offsets(log_file)
+    assert reopened.counts()["by_event_type"] == {"a": 1, "b": 1, "c": 1}
+    reopened.close()
+
+    os.rename(log_file, f"{log_file}.1")
+    _append(log_file, _line("z"))
+    rotated = open_index()
+
+    assert list(rotated._offsets) == [0]
+    assert rotated.counts()["by_event_type"] == {"z": 1}
@@ -0,0 +1,164 @@
+"""Tests for LongTermMemory's persisted FAISS index, HNSW tombstones and tier promotion."""
+import sqlite3
+
+import numpy as np
+import pytest
+
+from _bootstrap import import_isolated
+from conftest import QuietLogger, SectionConfig
+
+sovl_recaller = import_isolated("sovl_recaller", stand_ins=("sovl_error", "sovl_memory", "sovl_viber"))
+LongTermMemory = sovl_recaller.LongTermMemory
+
+DIM = 16
+
+
+def _memory(db_path, **config):
+    values = {"faiss_index_type": "flat", "faiss_persist_interval": 1000, "commit_interval_ms": 0}
+    values.update(config)
+    return LongTermMemory(db_path, DIM, "session", logger=QuietLogger(), config_manager=SectionConfig(values))
+
+
+def _vectors(count, seed=0):
+    return np.random.default_rng(seed).standard_normal((count, DIM)).astype(np.float32)
+
+
+def _add(memory, vectors, start=0):
+    return memory.add_many([
+        {"role": "user", "content": f"message {start + i}", "embedding": vector,
+         "timestamp_unix": float(start + i), "user_id": "user"}
+        for i, vector in enumerate(vectors)
+    ])
+
+
+def _wait_for_promotion(memory):
+    thread = memory._promotion_thread
+    if thread is not None:
+        thread.join(timeout=60)
+        assert not thread.is_alive()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "memory.db")
+
+
+@pytest.fixture
+def no_rebuild(monkeypatch):
+    """Fail the test if the index is rebuilt from SQLite instead of loaded."""
+    def rebuild(self):
+        raise AssertionError("index was rebuilt")
+    monkeypatch.setattr(LongTermMemory, "rebuild_faiss_index", rebuild)
+
+
+def test_persisted_index_is_loaded_and_catches_up(db_path, request):
+    vectors = _vectors(60)
+    memory = _memory(db_path)
+    _add(memory, vectors[:50])
+    memory.persist_index()
+    # Written after the last save; the process then goes away without close()
+    ids = _add(memory, vectors[50:], start=50)
+    memory.flush()
+    memory._db_conn.close()
+
+    request.getfixturevalue("no_rebuild")
+    reopened = _memory(db_path)
+
+    assert reopened.faiss_index.ntotal == 60
+    assert reopened._faiss_pending_changes == 10
+    assert reopened.query(vectors[55], top_k=1)[0]["id"] == ids[5]
+    reopened.close()
+
+
+def test_stale_index_is_rebuilt(db_path):
+    vectors = _vectors(30)
+    memory = _memory(db_path)
+    ids = _add(memory, vectors)
+    memory.close()
+    # Rows deleted behind the index's back make the saved index stale
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DELETE FROM conversations WHERE id IN (?, ?)", (ids[0], ids[1]))
+
+    reopened = _memory(db_path)
+
+    assert reopened.faiss_index.ntotal == 28
+    assert ids[0] not in reopened._search_index(vectors[0], 5)
+    reopened.close()
+
+
+def test_index_is_rebuilt_when_storage_type_changes(db_path):
+    memory = _memory(db_path)
+    _add(memory, _vectors(20))
+    memory.close()
+
+    reopened = _memory(db_path, embedding_storage="float16")
+
+    assert reopened._index_codec == "float16"
+    assert reopened.faiss_index.ntotal == 20
+    reopened.close()
+
+
+def test_promotes_to_hnsw_past_threshold(db_path):
+    vectors = _vectors(300)
+    memory = _memory(db_path, faiss_index_type="auto", faiss_hnsw_threshold=200, faiss_min_recall=0.5)
+
+    ids = _add(memory, vectors)
+    _wait_for_promotion(memory)
+
+    assert memory._faiss_tier == "hnsw"
+    assert memory.faiss_index.ntotal == 300
+    assert memory.query(vectors[123], top_k=1)[0]["id"] == ids[123]
+    memory.close()
+
+
+def test_rejected_promotion_backs_off(db_path):
+    memory = _memory(db_path, faiss_index_type="auto", faiss_hnsw_threshold=200, faiss_min_recall=1.01)
+
+    _add(memory, _vectors(300))
+    _wait_for_promotion(memory)
+
+    assert memory._faiss_tier == "flat"
+    assert memory._promotion_blocked_below == 600
+    rejected = memory._promotion_thread
+    _add(memory, _vectors(10, seed=1), start=300)
+    assert memory._promotion_thread is rejected  # no new rebuild until the session doubles
+    memory.close()
+
+
+def test_hnsw_removals_are_tombstoned_and_persisted(db_path):
+    vectors = _vectors(100)
+    memory = _memory(db_path, faiss_index_type="hnsw", faiss_min_recall=0.5)
+    ids = _add(memory, vectors)
+    _wait_for_promotion(memory)
+    assert memory._faiss_tier == "hnsw"
+
+    memory.remove_by_ids(ids[:3])
+
+    assert memory._tombstones == set(ids[:3])
+    assert memory.faiss_index.ntotal == 100  # HNSW cannot drop nodes
+    assert not set(ids[:3]) & set(memory._search_index(vectors[0], 10))
+    memory.close()
+
+    reopened = _memory(db_path, faiss_index_type="hnsw", faiss_min_recall=0.5)
+
+    assert reopened._faiss_tier == "hnsw"
+    assert reopened._tombstones == set(ids[:3])
+    assert not set(ids[:3]) & set(reopened._search_index(vectors[1], 10))
+    assert reopened.query(vectors[50], top_k=1)[0]["id"] == ids[50]
+    reopened.close()
+
+
+def test_flat_removals_are_applied_in_place(db_path, request):
+    vectors = _vectors(20)
+    memory = _memory(db_path)
+    ids = _add(memory, vectors)
+
+    memory.remove_by_ids(ids[:2])
+
+    assert memory._tombstones == set()
+    assert memory.faiss_index.ntotal == 18
+    memory.close()
+    request.getfixturevalue("no_rebuild")
+    reopened = _memory(db_path)
+    assert reopened.faiss_index.ntotal == 18
+    reopened.close()
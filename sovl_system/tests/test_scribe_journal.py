@@ -0,0 +1,192 @@
+"""Tests for ScribeJournal sealing, training marks, pruning and backup retention."""
+import json
+import os
+
+import pytest
+
+from _bootstrap import import_isolated
+from conftest import SectionConfig
+
+sovl_io = import_isolated("sovl_io", stand_ins=("sovl_error",))
+ScribeJournal = sovl_io.ScribeJournal
+
+
+class _QuietErrors:
+    def handle_error(self, *args, **kwargs):
+        pass
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "scribe" / "journal.jsonl")
+
+
+def _writer(path, **overrides):
+    values = {"durability": "flush", "buffer_size": 4, "max_file_size_mb": 50}
+    values.update(overrides)
+    return sovl_io.JsonlWriter(SectionConfig(values), _QuietErrors(), None, file_path=path)
+
+
+def _write(writer, entries):
+    assert writer.write_many([json.dumps(entry) for entry in entries])
+
+
+def _train(journal, trained_memories, **prune_kwargs):
+    """What a gestation cycle does: seal, train on the untrained segments, mark and prune them."""
+    segments = journal.seal_for_training()
+    journal.mark_trained(segments)
+    return journal.prune(trained_memories, **prune_kwargs)
+
+
+def test_seal_moves_head_into_a_segment(journal_path):
+    writer = _writer(journal_path)
+    _write(writer, [{"memory": "a"}, {"event_type": "wake"}, {"memory": "b"}])
+    journal = ScribeJournal.get_instance(journal_path)
+    generation = journal.generation
+
+    segment_path = journal.seal()
+
+    assert os.path.exists(segment_path)
+    assert not os.path.exists(journal_path)
+    assert journal.generation == generation + 1
+    [segment] = journal.segments()
+    assert segment["entries"] == 3
+    assert segment["bytes"] == os.path.getsize(segment_path)
+    assert segment["trained"] is False
+    assert journal.seal() is None  # empty head
+    # The writer follows the seal into a fresh head
+    _write(writer, [{"memory": "c"}])
+    writer.close()
+    assert journal.count() == 4
+    assert [entry.get("memory") for entry in journal.iter_entries()] == ["a", None, "b", "c"]
+
+
+def test_counts_survive_reopening_the_journal(journal_path):
+    writer = _writer(journal_path)
+    _write(writer, [{"memory": str(i)} for i in range(10)])
+    ScribeJournal.get_instance(journal_path).seal()
+    _write(writer, [{"memory": "head"}, {"event_type": "wake"}, {"memory": "after"}])
+    writer.close()
+
+    reopened = ScribeJournal(journal_path)
+
+    assert reopened.count() == 13
+    assert reopened.read_since_last_wake() == [{"memory": "after"}]
+    assert reopened.tail(2) == [{"event_type": "wake"}, {"memory": "after"}]
+
+
+def test_mark_trained_only_flags_given_segments(journal_path):
+    writer = _writer(journal_path)
+    journal = ScribeJournal.get_instance(journal_path)
+    _write(writer, [{"memory": "a"}])
+    first = journal.seal()
+    _write(writer, [{"memory": "b"}])
+    journal.seal()
+    writer.close()
+
+    journal.mark_trained([first])
+
+    assert [segment["trained"] for segment in journal.segments()] == [True, False]
+    assert journal.seal_for_training() == [os.path.join(journal.directory, journal.segments()[1]["name"])]
+
+
+def test_prune_removes_trained_entries_and_keeps_everything_else(journal_path, tmp_path):
+    writer = _writer(journal_path)
+    journal = ScribeJournal.get_instance(journal_path)
+    _write(writer, [{"memory": "a"}, {"event_type": "wake"}, {"memory": "b"}, {"memory": "untrained"}])
+    with open(journal_path, "a", encoding="utf-8") as f:
+        f.write("not json\n")
+    segments = journal.seal_for_training()
+    journal.mark_trained(segments)
+    # Written after training started: kept even though its memory text matches
+    _write(writer, [{"memory": "a"}])
+    writer.close()
+
+    removed = journal.prune({"a", "b"}, backup_dir=str(tmp_path / "backups"))
+
+    assert removed == 2
+    [segment] = journal.segments()
+    assert segment["entries"] == 3
+    assert segment["trained"] is False  # "untrained" still has to be trained on
+    assert list(journal.iter_entries()) == [{"event_type": "wake"}, {"memory": "untrained"}, {"memory": "a"}]
+    assert journal.read_since_last_wake() == [{"memory": "untrained"}, {"memory": "a"}]
+    assert journal.count() == 4  # three kept lines (one malformed, skipped by readers) and the head
+
+
+def test_prune_marks_segments_left_with_events_only(journal_path, tmp_path):
+    writer = _writer(journal_path)
+    journal = ScribeJournal.get_instance(journal_path)
+    _write(writer, [{"memory": "a"}, {"event_type": "wake"}])
+    writer.close()
+
+    assert _train(journal, {"a"}, backup_dir=str(tmp_path / "backups")) == 1
+    [segment] = journal.segments()
+    assert segment["trained"] is True and segment["pruned"] is True
+    # Pruned segments are not read again
+    assert journal.prune({"a"}, backup_dir=str(tmp_path / "backups")) == 0
+    assert journal.read_since_last_wake() == []
+
+
+def test_prune_drops_emptied_segments_and_skips_untrained_ones(journal_path, tmp_path):
+    writer = _writer(journal_path)
+    journal = ScribeJournal.get_instance(journal_path)
+    _write(writer, [{"memory": "a"}, {"memory": "b"}])
+    trained = journal.seal_for_training()
+    journal.mark_trained(trained)
+    _write(writer, [{"memory": "a"}])
+    journal.seal()
+    writer.close()
+
+    removed = journal.prune({"a", "b"}, backup=False)
+
+    assert removed == 2
+    assert not os.path.exists(trained[0])
+    assert [segment["trained"] for segment in journal.segments()] == [False]
+    assert list(journal.iter_entries()) == [{"memory": "a"}]
+
+
+def test_prune_backs_up_each_segment_as_first_pruned(journal_path, tmp_path):
+    backup_dir = tmp_path / "backups"
+    writer = _writer(journal_path)
+    journal = ScribeJournal.get_instance(journal_path)
+    _write(writer, [{"memory": "a"}, {"memory": "b"}, {"event_type": "wake"}])
+    writer.close()
+
+    _train(journal, {"a"}, backup_dir=str(backup_dir))
+    _train(journal, {"b"}, backup_dir=str(backup_dir))
+
+    [name] = os.listdir(backup_dir)
+    with open(backup_dir / name, encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == [{"memory": "a"}, {"memory": "b"}, {"event_type": "wake"}]
+    assert list(journal.iter_entries()) == [{"event_type": "wake"}]
+
+
+@pytest.mark.parametrize("max_backups, expected", [(2, 2), (0, 4)])
+def test_prune_backup_retention(journal_path, tmp_path, max_backups, expected):
+    backup_dir = tmp_path / "backups"
+    writer = _writer(journal_path)
+    journal = ScribeJournal.get_instance(journal_path)
+    for i in range(4):
+        _write(writer, [{"memory": f"m{i}"}])
+        _train(journal, {f"m{i}"}, backup_dir=str(backup_dir), max_backups=max_backups)
+    writer.close()
+
+    backups = sorted(os.listdir(backup_dir))
+
+    assert len(backups) == expected
+    assert backups[-1] == journal._segment_prefix + "000004" + journal._segment_suffix  # newest kept
+    assert journal.segments() == []
+
+
+def test_prune_scribe_journal_uses_trained_memories(journal_path, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    writer = _writer(journal_path)
+    journal = ScribeJournal.get_instance(journal_path)
+    _write(writer, [{"memory": "a"}, {"event_type": "wake"}, {"memory": "b"}])
+    writer.close()
+    journal.mark_trained(journal.seal_for_training())
+
+    assert sovl_io.prune_scribe_journal(set(), journal_path) == 0
+    assert sovl_io.prune_scribe_journal({"a"}, journal_path) == 1
+    assert os.listdir(tmp_path / sovl_io.BACKUP_DIR)
+    assert list(journal.iter_entries()) == [{"event_type": "wake"}, {"memory": "b"}]